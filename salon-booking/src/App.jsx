@@ -26,7 +26,7 @@ import Register from './pages/Register'
 import MyAppointments from './pages/MyAppointments'
 import AuthChoice from './pages/AuthChoice'
 import { employeesAPI, salonAPI } from './services/api'
-import { getMediaUrl } from '@/utils/media'
+import { getMediaUrl, getSrcSet } from '@/utils/media'
 
 // Composant de protection des routes admin
 function ProtectedRoute({ children }) {
@@ -92,7 +92,9 @@ function HomePage() {
   const galleryItems = (useFallback ? fallbackGallery : galleryImages).map((item, index) => ({
     id: item.id ?? `gallery-${index}`,
     title: item.title,
-    src: item.isLocal || useFallback ? item.image_url : getMediaUrl(item.image_url)
+    src: item.isLocal || useFallback ? item.image_url : getMediaUrl(item.image_url),
+    srcSet: item.isLocal || useFallback ? undefined : getSrcSet(item.variants?.jpeg),
+    webpSrcSet: item.isLocal || useFallback ? undefined : getSrcSet(item.variants?.webp)
   }))
 
   return (
@@ -293,14 +295,23 @@ function HomePage() {
           <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
             {galleryItems.map((item, index) => (
               <div key={item.id || index} className="relative overflow-hidden rounded-lg group cursor-pointer h-64">
-                <img
-                  src={item.src}
-                  alt={item.title || `Galerie ${index + 1}`}
-                  className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
-                  onError={(e) => {
-                    e.currentTarget.src = [salonInterior1, salonInterior2, salonInterior3][index % 3]
-                  }}
-                />
+                <picture className="block w-full h-full">
+                  {item.webpSrcSet && (
+                    <source type="image/webp" srcSet={item.webpSrcSet} sizes="(min-width: 768px) 33vw, 100vw" />
+                  )}
+                  <img
+                    src={item.src}
+                    srcSet={item.srcSet}
+                    sizes="(min-width: 768px) 33vw, 100vw"
+                    loading="lazy"
+                    alt={item.title || `Galerie ${index + 1}`}
+                    className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
+                    onError={(e) => {
+                      e.currentTarget.srcset = ''
+                      e.currentTarget.src = [salonInterior1, salonInterior2, salonInterior3][index % 3]
+                    }}
+                  />
+                </picture>
                 {item.title && (
                   <div className="absolute bottom-0 left-0 right-0 bg-black/50 text-white text-sm px-3 py-2 opacity-0 group-hover:opacity-100 transition-opacity">
                     {item.title}
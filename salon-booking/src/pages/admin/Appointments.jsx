@@ -1,6 +1,8 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Calendar, Filter, Search, Trash2 } from 'lucide-react';
 import { adminAppointmentsAPI } from '../../services/api';
+import { fetchChangesSince, applyChanges, getChangeCursor } from '@/utils/changes';
+import { subscribeToAppointmentEvents } from '@/utils/events';
 import AdminLayout from '../../components/AdminLayout';
 import { Button } from '../../components/ui/button';
 import {
@@ -24,13 +26,20 @@ export default function Appointments() {
     employee_id: '',
   });
 
+  const cursorRef = useRef(null);
+
   useEffect(() => {
     loadAppointments();
   }, [filters]);
 
+  // Les réservations en ligne et les modifications des autres postes arrivent en direct
+  const syncRef = useRef(null);
+  useEffect(() => subscribeToAppointmentEvents(() => syncRef.current?.()), []);
+
   const loadAppointments = async () => {
     try {
       const response = await adminAppointmentsAPI.getAll(filters);
+      cursorRef.current = getChangeCursor(response);
       setAppointments(response.data);
     } catch (error) {
       console.error('Erreur lors du chargement des rendez-vous:', error);
@@ -39,20 +48,52 @@ export default function Appointments() {
     }
   };
 
+  const matchesFilters = (apt) =>
+    (!filters.date || apt.appointment_date === filters.date) &&
+    (!filters.status || apt.status === filters.status) &&
+    (!filters.employee_id || String(apt.employee_id) === String(filters.employee_id));
+
+  const compareAppointments = (a, b) =>
+    b.appointment_date.localeCompare(a.appointment_date) || b.start_time.localeCompare(a.start_time);
+
+  // Ne récupère que les rendez-vous modifiés depuis le dernier chargement
+  const syncAppointments = async () => {
+    const result = await fetchChangesSince(cursorRef.current, 'appointments');
+    if (!result) {
+      return loadAppointments();
+    }
+    cursorRef.current = result.cursor;
+    setAppointments(prev => applyChanges(prev, result.changes, { accept: matchesFilters, compare: compareAppointments }));
+  };
+  syncRef.current = syncAppointments;
+
   const handleStatusChange = async (appointmentId, newStatus) => {
     try {
       await adminAppointmentsAPI.updateStatus(appointmentId, newStatus);
-      loadAppointments();
+      await syncAppointments();
     } catch (error) {
       console.error('Erreur lors de la mise à jour du statut:', error);
       alert('Erreur lors de la mise à jour du statut');
     }
   };
 
+  // Fin de journée : un seul appel pour tous les rendez-vous affichés encore ouverts
+  const openAppointments = appointments.filter(apt => apt.status === 'pending' || apt.status === 'confirmed');
+
+  const handleCompleteAll = async () => {
+    try {
+      await adminAppointmentsAPI.batchUpdateStatus({ ids: openAppointments.map(apt => apt.id) }, 'completed');
+      await syncAppointments();
+    } catch (error) {
+      console.error('Erreur lors de la mise à jour groupée des statuts:', error);
+      alert('Erreur lors de la mise à jour des statuts');
+    }
+  };
+
   const handleDeleteAppointment = async (appointmentId) => {
     try {
       await adminAppointmentsAPI.delete(appointmentId);
-      loadAppointments();
+      await syncAppointments();
     } catch (error) {
       console.error('Erreur lors de la suppression du rendez-vous:', error);
       alert('Erreur lors de la suppression du rendez-vous');
@@ -139,10 +180,33 @@ export default function Appointments() {
 
         {/* Liste des rendez-vous */}
         <div className="bg-white rounded-lg shadow overflow-hidden">
-          <div className="p-6 border-b border-gray-200">
+          <div className="p-6 border-b border-gray-200 flex items-center justify-between">
             <h2 className="text-xl font-semibold text-gray-900">
               Rendez-vous ({appointments.length})
             </h2>
+            {openAppointments.length > 0 && (
+              <AlertDialog>
+                <AlertDialogTrigger asChild>
+                  <Button variant="outline">
+                    Marquer terminés ({openAppointments.length})
+                  </Button>
+                </AlertDialogTrigger>
+                <AlertDialogContent>
+                  <AlertDialogHeader>
+                    <AlertDialogTitle>Marquer les rendez-vous comme terminés ?</AlertDialogTitle>
+                    <AlertDialogDescription>
+                      Les {openAppointments.length} rendez-vous en attente ou confirmés affichés passeront au statut « Terminé ».
+                    </AlertDialogDescription>
+                  </AlertDialogHeader>
+                  <AlertDialogFooter>
+                    <AlertDialogCancel>Annuler</AlertDialogCancel>
+                    <AlertDialogAction onClick={handleCompleteAll}>
+                      Confirmer
+                    </AlertDialogAction>
+                  </AlertDialogFooter>
+                </AlertDialogContent>
+              </AlertDialog>
+            )}
           </div>
           
           {appointments.length === 0 ? (
@@ -1,81 +1,70 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import AdminLayout from '../../components/AdminLayout';
 import { Calendar as CalendarIcon, ChevronLeft, ChevronRight } from 'lucide-react';
 import { Button } from '../../components/ui/button';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '../../components/ui/select';
-import { adminAppointmentsAPI, adminEmployeesAPI, employeesAPI } from '../../services/api';
-import { format, startOfWeek, endOfWeek, addDays, subDays, isSameDay, parseISO, addMinutes, setHours, setMinutes } from 'date-fns';
+import { adminAppointmentsAPI } from '../../services/api';
+import { subscribeToAppointmentEvents } from '@/utils/events';
+import { format, startOfWeek, endOfWeek, addDays, subDays, parseISO, addMinutes, setHours, setMinutes } from 'date-fns';
 import { fr } from 'date-fns/locale';
 import AddAppointmentModal from '../../components/AddAppointmentModal';
 
 export default function CalendarView() {
   const [currentWeekStart, setCurrentWeekStart] = useState(startOfWeek(new Date(), { locale: fr, weekStartsOn: 1 }));
-  const [employees, setEmployees] = useState([]);
+  const [calendar, setCalendar] = useState(null);
   const [selectedEmployeeId, setSelectedEmployeeId] = useState('');
-  const [appointments, setAppointments] = useState([]);
   const [loading, setLoading] = useState(true);
   const [isModalOpen, setIsModalOpen] = useState(false);
-  const [employeeWorkingHours, setEmployeeWorkingHours] = useState([]);
-  const [employeeAvailability, setEmployeeAvailability] = useState([]);
   const daysOfWeek = Array.from({ length: 7 }, (_, i) => addDays(currentWeekStart, i));
 
+  // Une seule requête par semaine : changer d'employé ne recharge rien
   useEffect(() => {
-    loadEmployees();
-  }, []);
-
-  useEffect(() => {
-    if (selectedEmployeeId) {
-      loadAppointments();
-      loadEmployeeData(selectedEmployeeId);
-    } else {
-      setAppointments([]);
-      setEmployeeWorkingHours([]);
-      setEmployeeAvailability([]);
-      setLoading(false);
+    loadCalendar();
+  }, [currentWeekStart]);
+
+  // Recharger la semaine affichée lorsqu'un rendez-vous y est créé ou modifié
+  const weekRef = useRef(null);
+  useEffect(() => subscribeToAppointmentEvents((events) => {
+    const { start, end, reload } = weekRef.current ?? {};
+    if (!reload) {
+      return;
     }
-  }, [currentWeekStart, selectedEmployeeId]);
-
-  const loadEmployees = async () => {
-    try {
-      const response = await employeesAPI.getAll();
-      setEmployees(response.data);
-      if (response.data.length > 0) {
-        setSelectedEmployeeId(response.data[0].id.toString());
-      }
-    } catch (error) {
-      console.error('Erreur lors du chargement des employés:', error);
+    if (events === null || events.some(event => event.appointment_date >= start && event.appointment_date <= end)) {
+      reload(false);
     }
-  };
+  }), []);
 
-  const loadEmployeeData = async (employeeId) => {
-    try {
-      const [hoursResponse, availabilityResponse] = await Promise.all([
-        adminEmployeesAPI.getEmployeeHours(employeeId),
-        adminEmployeesAPI.getEmployeeAvailability(employeeId)
-      ]);
-      setEmployeeWorkingHours(hoursResponse.data);
-      setEmployeeAvailability(availabilityResponse.data);
-    } catch (error) {
-      console.error('Erreur lors du chargement des données de l\'employé:', error);
-      setEmployeeWorkingHours([]);
-      setEmployeeAvailability([]);
-    }
-  };
+  const employees = calendar?.employees ?? [];
+  const selectedEmployee = employees.find(emp => emp.id.toString() === selectedEmployeeId);
+  const employeeWorkingHours = selectedEmployee?.working_hours ?? [];
+
+  const weekStartDate = format(currentWeekStart, 'yyyy-MM-dd');
+  const weekEndDate = format(endOfWeek(currentWeekStart, { locale: fr, weekStartsOn: 1 }), 'yyyy-MM-dd');
 
-  const loadAppointments = async () => {
-    setLoading(true);
+  const loadCalendar = async (showLoading = true) => {
+    if (showLoading) {
+      setLoading(true);
+    }
     try {
-      const startDate = format(currentWeekStart, 'yyyy-MM-dd');
-      const endDate = format(endOfWeek(currentWeekStart, { locale: fr, weekStartsOn: 1 }), 'yyyy-MM-dd');
-      const response = await adminAppointmentsAPI.getEmployeeAppointments(selectedEmployeeId, startDate, endDate);
-      setAppointments(response.data);
+      const startDate = weekStartDate;
+      const endDate = weekEndDate;
+      const response = await adminAppointmentsAPI.getCalendar(startDate, endDate);
+      setCalendar(response.data);
+      if (!selectedEmployeeId && response.data.employees.length > 0) {
+        setSelectedEmployeeId(response.data.employees[0].id.toString());
+      }
     } catch (error) {
-      console.error('Erreur lors du chargement des rendez-vous:', error);
+      console.error('Erreur lors du chargement de l\'agenda:', error);
+      setCalendar(null);
     } finally {
       setLoading(false);
     }
   };
 
+  weekRef.current = { start: weekStartDate, end: weekEndDate, reload: loadCalendar };
+
+  const getDayData = (day) => selectedEmployee?.days[format(day, 'yyyy-MM-dd')];
+
   const goToPreviousWeek = () => {
     setCurrentWeekStart(subDays(currentWeekStart, 7));
   };
@@ -85,15 +74,13 @@ export default function CalendarView() {
   };
 
   const getAppointmentsForDay = (day) => {
-    return appointments.filter(apt => isSameDay(parseISO(apt.appointment_date), day))
-                       .sort((a, b) => a.start_time.localeCompare(b.start_time));
- };
+    return [...(getDayData(day)?.appointments ?? [])]
+      .sort((a, b) => a.start_time.localeCompare(b.start_time));
+  };
 
- const isEmployeeUnavailable = (day) => {
-   return employeeAvailability.some(avail =>
-     isSameDay(parseISO(avail.date), day) && !avail.is_available
-   );
- };
+  const isEmployeeUnavailable = (day) => {
+    return (getDayData(day)?.unavailabilities ?? []).some(avail => !avail.is_available);
+  };
 
   return (
     <AdminLayout>
@@ -235,7 +222,7 @@ export default function CalendarView() {
       <AddAppointmentModal
         isOpen={isModalOpen}
         onClose={() => setIsModalOpen(false)}
-        onAppointmentAdded={loadAppointments}
+        onAppointmentAdded={loadCalendar}
       />
     </AdminLayout>
   );
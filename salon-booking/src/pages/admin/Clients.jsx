@@ -6,7 +6,10 @@ import { Input } from '../../components/ui/input';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger, DialogFooter } from '../../components/ui/dialog';
 import { Label } from '../../components/ui/label';
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '../../components/ui/table';
-import { Pencil, Trash2, PlusCircle, User as UserIcon } from 'lucide-react';
+import { Pencil, Trash2, PlusCircle, Search, User as UserIcon } from 'lucide-react';
+
+const PAGE_SIZE = 50;
+const SEARCH_DELAY = 300;
 
 export default function Clients() {
   const [clients, setClients] = useState([]);
@@ -22,15 +25,30 @@ export default function Clients() {
   });
   const [error, setError] = useState('');
 
+  const [search, setSearch] = useState('');
+  const [query, setQuery] = useState('');
+  const [page, setPage] = useState(1);
+  const [total, setTotal] = useState(0);
+
+  // Attendre une pause dans la saisie avant d'interroger le serveur
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      setQuery(search.trim());
+      setPage(1);
+    }, SEARCH_DELAY);
+    return () => clearTimeout(timer);
+  }, [search]);
+
   useEffect(() => {
     loadClients();
-  }, []);
+  }, [query, page]);
 
+  // Seule la page affichée est chargée : la recherche se fait côté serveur
   const loadClients = async () => {
-    setLoading(true);
     try {
-      const response = await adminClientsAPI.getAll();
+      const response = await adminClientsAPI.search({ q: query || undefined, page, per_page: PAGE_SIZE });
       setClients(response.data);
+      setTotal(Number(response.headers['x-total-count'] ?? response.data.length));
     } catch (error) {
       console.error('Erreur lors du chargement des clients:', error);
       setError('Erreur lors du chargement des clients.');
@@ -39,6 +57,8 @@ export default function Clients() {
     }
   };
 
+  const pageCount = Math.max(1, Math.ceil(total / PAGE_SIZE));
+
   const handleInputChange = (e) => {
     const { id, value } = e.target;
     setFormData(prev => ({ ...prev, [id]: value }));
@@ -83,7 +103,7 @@ export default function Clients() {
         await adminClientsAPI.create(formData);
       }
       setIsModalOpen(false);
-      loadClients();
+      await loadClients();
     } catch (error) {
       console.error('Erreur lors de la soumission du client:', error);
       setError(error.response?.data?.error || 'Une erreur est survenue.');
@@ -94,7 +114,7 @@ export default function Clients() {
     if (window.confirm('Êtes-vous sûr de vouloir supprimer ce client ?')) {
       try {
         await adminClientsAPI.delete(clientId);
-        loadClients();
+        await loadClients();
       } catch (error) {
         console.error('Erreur lors de la suppression du client:', error);
         setError('Erreur lors de la suppression du client.');
@@ -129,6 +149,16 @@ export default function Clients() {
           </div>
         )}
 
+        <div className="relative">
+          <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-gray-400" />
+          <Input
+            value={search}
+            onChange={(e) => setSearch(e.target.value)}
+            placeholder="Rechercher par nom, email ou téléphone"
+            className="pl-9"
+          />
+        </div>
+
         <div className="bg-white rounded-lg shadow overflow-hidden">
           {clients.length === 0 ? (
             <div className="p-12 text-center">
@@ -164,6 +194,19 @@ export default function Clients() {
               </TableBody>
             </Table>
           )}
+          {total > PAGE_SIZE && (
+            <div className="flex items-center justify-between p-4 border-t border-gray-200 text-sm text-gray-600">
+              <span>{total} clients — page {page} sur {pageCount}</span>
+              <div className="flex gap-2">
+                <Button variant="outline" size="sm" disabled={page <= 1} onClick={() => setPage(page - 1)}>
+                  Précédent
+                </Button>
+                <Button variant="outline" size="sm" disabled={page >= pageCount} onClick={() => setPage(page + 1)}>
+                  Suivant
+                </Button>
+              </div>
+            </div>
+          )}
         </div>
 
         <Dialog open={isModalOpen} onOpenChange={setIsModalOpen}>
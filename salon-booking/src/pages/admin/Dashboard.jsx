@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { Calendar, Users, DollarSign, TrendingUp } from 'lucide-react';
 import { adminStatsAPI, adminAppointmentsAPI } from '../../services/api';
 import AdminLayout from '../../components/AdminLayout';
+import { subscribeToAppointmentEvents } from '@/utils/events';
 
 export default function Dashboard() {
   const [stats, setStats] = useState(null);
@@ -10,6 +11,8 @@ export default function Dashboard() {
 
   useEffect(() => {
     loadData();
+    // Les statistiques et la liste du jour se mettent à jour à chaque réservation
+    return subscribeToAppointmentEvents(() => loadData());
   }, []);
 
   const loadData = async () => {
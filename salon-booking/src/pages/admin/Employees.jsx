@@ -4,6 +4,9 @@ import { Button } from '@/components/ui/button';
 import AdminLayout from '../../components/AdminLayout';
 import { adminEmployeesAPI, adminServicesAPI } from '../../services/api';
 
+// Seules les indisponibilités à venir sont utiles à l'édition (format local YYYY-MM-DD)
+const upcomingOnly = () => ({ start: new Date().toLocaleDateString('sv-SE') });
+
 export default function Employees() {
   const [employees, setEmployees] = useState([]);
   const [services, setServices] = useState([]);
@@ -53,7 +56,7 @@ export default function Employees() {
 
       const employeesWithDetails = await Promise.all(employeesData.map(async (employee) => {
         const hoursResponse = await adminEmployeesAPI.getEmployeeHours(employee.id);
-        const availabilityResponse = await adminEmployeesAPI.getEmployeeAvailability(employee.id);
+        const availabilityResponse = await adminEmployeesAPI.getEmployeeAvailability(employee.id, upcomingOnly());
         return { 
           ...employee, 
           working_hours: hoursResponse.data,
@@ -151,7 +154,7 @@ export default function Employees() {
     });
 
     try {
-      const response = await adminEmployeesAPI.getEmployeeAvailability(employee.id);
+      const response = await adminEmployeesAPI.getEmployeeAvailability(employee.id, upcomingOnly());
       setAvailability(response.data);
     } catch (error) {
       console.error("Erreur lors de la récupération des disponibilités:", error);
@@ -198,7 +201,7 @@ export default function Employees() {
     if (!editingEmployee || !newAvailability.date) return;
     try {
       await adminEmployeesAPI.addEmployeeAvailability(editingEmployee.id, newAvailability);
-      const response = await adminEmployeesAPI.getEmployeeAvailability(editingEmployee.id);
+      const response = await adminEmployeesAPI.getEmployeeAvailability(editingEmployee.id, upcomingOnly());
       setAvailability(response.data);
       setNewAvailability({ date: '', start_time: '', end_time: '', reason: '', is_available: false });
     } catch (error) {
@@ -210,7 +213,7 @@ export default function Employees() {
     if (!editingEmployee) return;
     try {
       await adminEmployeesAPI.deleteEmployeeAvailability(availabilityId);
-      const response = await adminEmployeesAPI.getEmployeeAvailability(editingEmployee.id);
+      const response = await adminEmployeesAPI.getEmployeeAvailability(editingEmployee.id, upcomingOnly());
       setAvailability(response.data);
     } catch (error) {
       console.error("Erreur lors de la suppression de l'indisponibilité:", error);
@@ -3,7 +3,7 @@ import { Plus, Trash2, Image as ImageIcon } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import AdminLayout from '../../components/AdminLayout';
 import { adminGalleryAPI } from '../../services/api';
-import { getMediaUrl } from '@/utils/media';
+import { getMediaUrl, getSrcSet } from '@/utils/media';
 
 export default function Gallery() {
   const [images, setImages] = useState([]);
@@ -120,6 +120,8 @@ export default function Gallery() {
               <div className="relative aspect-square">
                 <img
                   src={getMediaUrl(image.image_url)}
+                  srcSet={getSrcSet(image.variants?.jpeg)}
+                  sizes="(min-width: 1280px) 25vw, (min-width: 768px) 50vw, 100vw"
                   alt={image.title || 'Image galerie'}
                   className="w-full h-full object-cover"
                   onError={(e) => {
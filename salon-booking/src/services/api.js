@@ -103,7 +103,8 @@ export const adminEmployeesAPI = {
   delete: (id) => api.delete(`/admin/employees/${id}`),
   getEmployeeHours: (employeeId) => api.get(`/admin/employees/${employeeId}/hours`),
   updateEmployeeHours: (employeeId, hoursData) => api.put(`/admin/employees/${employeeId}/hours`, hoursData),
- getEmployeeAvailability: (employeeId) => api.get(`/admin/employees/${employeeId}/availability`),
+  batchUpdateHours: (payload) => api.put('/admin/employees/hours/batch', payload),
+ getEmployeeAvailability: (employeeId, params) => api.get(`/admin/employees/${employeeId}/availability`, { params }),
  addEmployeeAvailability: (employeeId, availabilityData) => api.post(`/admin/employees/${employeeId}/availability`, availabilityData),
  deleteEmployeeAvailability: (availabilityId) => api.delete(`/admin/availability/${availabilityId}`),
  uploadEmployeePhoto: (employeeId, photoFile) => {
@@ -121,6 +122,8 @@ export const adminEmployeesAPI = {
 
 export const adminClientsAPI = {
   getAll: () => api.get('/admin/clients'),
+  // Recherche côté serveur (nom, e-mail, téléphone) avec pagination : { q, page, per_page }
+  search: (params) => api.get('/admin/clients', { params }),
   create: (clientData) => api.post('/admin/clients', clientData),
   update: (id, clientData) => api.put(`/admin/clients/${id}`, clientData),
   delete: (id) => api.delete(`/admin/clients/${id}`),
@@ -133,8 +136,12 @@ export const adminAppointmentsAPI = {
   create: (appointmentData) => api.post('/admin/appointments', appointmentData), // Nouvelle fonction pour l'admin
   updateStatus: (id, status) => api.put(`/admin/appointments/${id}/status`, { status }),
   delete: (id) => api.delete(`/admin/appointments/${id}`), // Nouvelle fonction de suppression
+  // Opérations groupées : { ids: [...] } ou { filter: { date, employee_id, status } }
+  batchUpdateStatus: (target, status) => api.post('/admin/appointments/batch/status', { ...target, status }),
+  batchDelete: (target) => api.post('/admin/appointments/batch/delete', target),
   getEmployeeAppointments: (employeeId, startDate, endDate) =>
     api.get(`/admin/employee-appointments/${employeeId}`, { params: { start_date: startDate, end_date: endDate } }),
+  getCalendar: (start, end) => api.get('/admin/calendar', { params: { start, end } }),
   getAvailability: (serviceId, employeeId, date) =>
     api.get('/admin/appointments/availability', {
       params: { service_id: serviceId, employee_id: employeeId, date }
@@ -166,6 +173,16 @@ export const adminGalleryAPI = {
   },
 };
 
+// ===== ADMIN - SYNCHRONISATION =====
+
+export const adminChangesAPI = {
+  since: (cursor) => api.get('/admin/changes', { params: { since: cursor } }),
+};
+
+export const adminEventsAPI = {
+  getTicket: () => api.post('/admin/events/ticket'),
+};
+
 // ===== ADMIN - STATISTIQUES =====
 
 export const adminStatsAPI = {
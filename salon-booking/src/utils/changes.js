@@ -0,0 +1,66 @@
+import { adminChangesAPI } from '@/services/api';
+
+// Récupère toutes les modifications depuis un curseur, ou null si un rechargement complet est nécessaire
+export async function fetchChangesSince(cursor, entity) {
+  if (cursor === null || cursor === undefined) {
+    return null;
+  }
+
+  const merged = { upserted: [], deleted: [] };
+  let current = cursor;
+
+  try {
+    for (;;) {
+      const { data } = await adminChangesAPI.since(current);
+      const changes = data.changes?.[entity] ?? { upserted: [], deleted: [] };
+      merged.upserted.push(...changes.upserted);
+      merged.deleted.push(...changes.deleted);
+      current = data.cursor;
+      if (!data.has_more) {
+        break;
+      }
+    }
+  } catch (error) {
+    if (error.response?.status === 410) {
+      return null;
+    }
+    throw error;
+  }
+
+  return { cursor: current, changes: merged };
+}
+
+// Applique des modifications (upserted / deleted) à une liste locale indexée par id
+export function applyChanges(items, { upserted = [], deleted = [] }, { accept = () => true, compare } = {}) {
+  const removed = new Set(deleted);
+  const updates = new Map(upserted.map((item) => [item.id, item]));
+  const next = [];
+
+  for (const item of items) {
+    if (removed.has(item.id)) {
+      continue;
+    }
+    if (updates.has(item.id)) {
+      const updated = updates.get(item.id);
+      updates.delete(item.id);
+      if (accept(updated)) {
+        next.push(updated);
+      }
+      continue;
+    }
+    next.push(item);
+  }
+
+  for (const item of updates.values()) {
+    if (!removed.has(item.id) && accept(item)) {
+      next.push(item);
+    }
+  }
+
+  return compare ? next.sort(compare) : next;
+}
+
+export function getChangeCursor(response) {
+  const value = response?.headers?.['x-change-cursor'];
+  return value === undefined ? null : Number(value);
+}
@@ -0,0 +1,86 @@
+import { adminEventsAPI } from '@/services/api';
+
+const RECONNECT_DELAY = 5000;
+const BATCH_DELAY = 300;
+
+// S'abonne aux événements de rendez-vous poussés par le serveur (Server-Sent Events).
+// `onChange(events)` est appelé au plus une fois par rafale ; `events` vaut null
+// lorsque des événements ont pu être manqués (reconnexion, client en retard) :
+// l'appelant doit alors se resynchroniser. Retourne la fonction de désabonnement.
+export function subscribeToAppointmentEvents(onChange) {
+  let source = null;
+  let closed = false;
+  let connectedOnce = false;
+  let reconnectTimer = null;
+  let batchTimer = null;
+  let pending = [];
+
+  const flush = () => {
+    batchTimer = null;
+    const events = pending;
+    pending = [];
+    onChange(events);
+  };
+
+  const push = (event) => {
+    if (pending !== null) {
+      pending.push(event);
+    }
+    if (!batchTimer) {
+      batchTimer = setTimeout(flush, BATCH_DELAY);
+    }
+  };
+
+  const resync = () => {
+    pending = null;
+    if (!batchTimer) {
+      batchTimer = setTimeout(flush, BATCH_DELAY);
+    }
+  };
+
+  const scheduleReconnect = () => {
+    if (!closed && !reconnectTimer) {
+      reconnectTimer = setTimeout(() => {
+        reconnectTimer = null;
+        connect();
+      }, RECONNECT_DELAY);
+    }
+  };
+
+  const connect = async () => {
+    try {
+      // EventSource ne peut pas envoyer l'en-tête Authorization : jeton de courte durée
+      const { data } = await adminEventsAPI.getTicket();
+      if (closed) {
+        return;
+      }
+      source = new EventSource(`/api/admin/events?ticket=${encodeURIComponent(data.ticket)}`);
+      source.onopen = () => {
+        if (connectedOnce) {
+          resync();
+        }
+        connectedOnce = true;
+      };
+      source.addEventListener('appointment', (message) => push(JSON.parse(message.data)));
+      source.addEventListener('resync', resync);
+      // Le jeton a expiré entre-temps : on en redemande un plutôt que de laisser le navigateur réessayer
+      source.onerror = () => {
+        source.close();
+        scheduleReconnect();
+      };
+    } catch (error) {
+      scheduleReconnect();
+    }
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(reconnectTimer);
+    clearTimeout(batchTimer);
+    if (source) {
+      source.close();
+    }
+  };
+}
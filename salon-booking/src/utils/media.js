@@ -17,3 +17,11 @@ export function getMediaUrl(path) {
 
   return baseUrl ? `${baseUrl}${normalizedPath}` : normalizedPath;
 }
+
+export function getSrcSet(variants) {
+  if (!Array.isArray(variants) || variants.length === 0) {
+    return undefined;
+  }
+
+  return variants.map((variant) => `${getMediaUrl(variant.url)} ${variant.width}w`).join(', ');
+}
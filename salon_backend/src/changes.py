@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, event, func, select, text
+from sqlalchemy.orm import Session
+
+from src.models.models import db, Appointment, ChangeLog, Employee, User
+
+# Entités suivies : nom dans le journal -> (modèle, clé de la réponse /changes)
+TRACKED_ENTITIES = {
+    'appointment': (Appointment, 'appointments'),
+    'client': (User, 'clients'),
+    'employee': (Employee, 'employees'),
+}
+
+
+def record_changes(connection, entity, ids, operation):
+    """
+    Ajouter des entrées au journal dans la transaction en cours.
+    À appeler explicitement pour les UPDATE/DELETE groupés qui ne passent pas par l'ORM.
+    """
+    ids = [i for i in ids if i is not None]
+    if not ids:
+        return
+    now = datetime.utcnow()
+    connection.execute(
+        ChangeLog.__table__.insert(),
+        [{'entity': entity, 'entity_id': i, 'operation': operation, 'changed_at': now} for i in ids]
+    )
+
+
+def _collect(session, instances, operation, changes):
+    for obj in instances:
+        if isinstance(obj, Appointment):
+            changes.append(('appointment', obj.id, operation))
+        elif isinstance(obj, Employee):
+            changes.append(('employee', obj.id, operation))
+        elif isinstance(obj, User):
+            if obj.role == 'client':
+                changes.append(('client', obj.id, operation))
+            elif obj.role == 'employee' and operation == 'update':
+                # Le nom et les coordonnées de l'employé sont portés par son utilisateur
+                employee_ids = session.connection().execute(
+                    select(Employee.id).where(Employee.user_id == obj.id)
+                ).scalars()
+                changes.extend(('employee', employee_id, 'update') for employee_id in employee_ids)
+
+
+def _after_flush(session, flush_context):
+    changes = []
+    _collect(session, session.new, 'insert', changes)
+    # Les collections ne comptent que pour l'employé (services, horaires)
+    dirty = [obj for obj in session.dirty if session.is_modified(obj, include_collections=isinstance(obj, Employee))]
+    _collect(session, dirty, 'update', changes)
+    _collect(session, session.deleted, 'delete', changes)
+
+    if changes:
+        now = datetime.utcnow()
+        session.connection().execute(
+            ChangeLog.__table__.insert(),
+            [{'entity': e, 'entity_id': i, 'operation': op, 'changed_at': now} for e, i, op in changes]
+        )
+
+
+def init_change_tracking():
+    """Journaliser les écritures ORM sur les rendez-vous, clients et employés"""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+
+
+def current_cursor():
+    """
+    Dernier curseur attribué (0 si le journal n'a jamais servi). Lu dans
+    sqlite_sequence : reste valable quand une purge a vidé le journal.
+    """
+    return db.session.execute(text(
+        "SELECT coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'change_log'),"
+        " (SELECT max(id) FROM change_log), 0)"
+    )).scalar()
+
+
+def pruned_cursor():
+    """
+    Dernier curseur purgé (0 sans purge) : un client dont le curseur est
+    inférieur a perdu des modifications. La purge supprime toujours un préfixe
+    du journal, tout ce qui précède la plus ancienne entrée restante est donc purgé.
+    """
+    oldest = db.session.execute(select(func.min(ChangeLog.id))).scalar()
+    return oldest - 1 if oldest is not None else current_cursor()
+
+
+def load_changes(since, limit=1000):
+    """
+    Modifications postérieures au curseur `since`, regroupées par entité.
+    Pour chaque ligne, seule la dernière opération compte : les lignes encore
+    présentes sont renvoyées en entier, les autres sont listées comme supprimées.
+    """
+    entries = ChangeLog.query.filter(ChangeLog.id > since).order_by(ChangeLog.id).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for entry in entries:
+        latest[(entry.entity, entry.entity_id)] = entry.operation
+
+    result = {key: {'upserted': [], 'deleted': []} for _, key in TRACKED_ENTITIES.values()}
+    for entity, (model, key) in TRACKED_ENTITIES.items():
+        ids = [entity_id for (e, entity_id), op in latest.items() if e == entity and op != 'delete']
+        deleted = {entity_id for (e, entity_id), op in latest.items() if e == entity and op == 'delete'}
+
+        if ids:
+            query = model.query.filter(model.id.in_(ids))
+            if model is Appointment:
+                query = query.options(
+                    db.joinedload(Appointment.client),
+                    db.joinedload(Appointment.employee).joinedload(Employee.user),
+                    db.joinedload(Appointment.service)
+                )
+            elif model is Employee:
+                query = query.options(db.joinedload(Employee.user))
+            elif model is User:
+                query = query.filter(User.role == 'client')
+            rows = query.all()
+            result[key]['upserted'] = [row.to_dict() for row in rows]
+            # Ligne disparue depuis (ou client devenu employé) : supprimée côté client
+            deleted |= set(ids) - {row.id for row in rows}
+
+        result[key]['deleted'] = sorted(deleted)
+
+    return {
+        'cursor': entries[-1].id if entries else since,
+        'has_more': has_more,
+        'changes': result
+    }
+
+
+def prune_changes(older_than):
+    """
+    Supprimer les entrées du journal plus anciennes que `older_than`. La coupure
+    se fait par id (préfixe du journal), même si les dates ne sont pas monotones.
+    """
+    last = db.session.execute(select(func.max(ChangeLog.id)).where(ChangeLog.changed_at < older_than)).scalar()
+    if last is None:
+        return 0
+    result = db.session.execute(delete(ChangeLog).where(ChangeLog.id <= last))
+    db.session.commit()
+    return result.rowcount
+
+
+@click.command('prune-changes')
+@click.option('--days', default=30, help="Conserver les N derniers jours du journal")
+@with_appcontext
+def prune_changes_command(days):
+    """Purger le journal des modifications"""
+    count = prune_changes(datetime.utcnow() - timedelta(days=days))
+    click.echo(f'{count} entrée(s) du journal supprimée(s)')
@@ -0,0 +1,110 @@
+import gzip
+import os
+
+import click
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli est optionnel, gzip est toujours disponible
+    brotli = None
+
+# Extensions textuelles qui gagnent à être pré-compressées (les images le sont déjà)
+COMPRESSIBLE_EXTENSIONS = {'.js', '.css', '.html', '.svg', '.json', '.map', '.txt', '.ico', '.xml'}
+
+
+def accepted_encodings():
+    """Encodages acceptés par le client pour la requête courante, par ordre de préférence"""
+    accept = request.accept_encodings
+    encodings = []
+    if brotli is not None and accept['br']:
+        encodings.append('br')
+    if accept['gzip']:
+        encodings.append('gzip')
+    return encodings
+
+
+def _compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def init_compression(app):
+    """Compresser à la volée les réponses JSON au-delà d'une taille minimale"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+    app.config.setdefault('COMPRESS_MIMETYPES', ['application/json'])
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encodings = accepted_encodings()
+        if not encodings:
+            return response
+
+        encoding = encodings[0]
+        level = app.config['COMPRESS_BR_LEVEL'] if encoding == 'br' else app.config['COMPRESS_GZIP_LEVEL']
+        response.set_data(_compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @app.cli.command('precompress-static')
+    @click.option('--min-size', default=512, help='Taille minimale (octets) des fichiers à compresser')
+    def precompress_static_command(min_size):
+        """Générer les fichiers .gz/.br à côté des ressources statiques"""
+        written = precompress_directory(app.static_folder, min_size=min_size)
+        click.echo(f'{written} fichier(s) compressé(s) écrit(s)')
+
+
+def precompress_directory(root, min_size=512):
+    """
+    Écrire les variantes .gz (et .br si brotli est installé) des fichiers
+    textuels d'un dossier. Les variantes à jour ne sont pas régénérées.
+    """
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in COMPRESSIBLE_EXTENSIONS:
+                continue
+
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            if stat.st_size < min_size:
+                continue
+
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            variants = [('.gz', 'gzip', 9)]
+            if brotli is not None:
+                variants.append(('.br', 'br', 11))
+
+            for suffix, encoding, level in variants:
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= stat.st_mtime:
+                    continue
+                compressed = _compress(data, encoding, level)
+                # Inutile de servir une variante qui n'est pas plus petite
+                if len(compressed) >= stat.st_size:
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    return written
@@ -0,0 +1,114 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, text
+
+from src.models.models import db, Counter
+
+# Compteurs maintenus par SQLite dans la transaction de chaque écriture,
+# y compris les UPDATE/DELETE groupés qui ne passent pas par l'ORM :
+#   users.<rôle>          nombre d'utilisateurs par rôle (users.client...)
+#   employees             nombre de profils employés
+#   appointments          nombre total de rendez-vous
+#   appointments.<statut> rendez-vous par statut (appointments.pending...)
+
+
+def _bump(name_sql, delta):
+    return (
+        f"INSERT INTO counters(name, value) VALUES ({name_sql}, {delta}) "
+        f"ON CONFLICT(name) DO UPDATE SET value = value + ({delta});"
+    )
+
+
+COUNTER_TRIGGERS = {
+    'counters_users_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_users_insert AFTER INSERT ON users
+        BEGIN {_bump("'users.' || coalesce(new.role, 'none')", 1)} END
+    """,
+    'counters_users_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_users_delete AFTER DELETE ON users
+        BEGIN {_bump("'users.' || coalesce(old.role, 'none')", -1)} END
+    """,
+    'counters_users_role': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_users_role AFTER UPDATE OF role ON users
+        WHEN coalesce(old.role, '') IS NOT coalesce(new.role, '')
+        BEGIN
+            {_bump("'users.' || coalesce(old.role, 'none')", -1)}
+            {_bump("'users.' || coalesce(new.role, 'none')", 1)}
+        END
+    """,
+    'counters_employees_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_employees_insert AFTER INSERT ON employees
+        BEGIN {_bump("'employees'", 1)} END
+    """,
+    'counters_employees_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_employees_delete AFTER DELETE ON employees
+        BEGIN {_bump("'employees'", -1)} END
+    """,
+    'counters_appointments_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_appointments_insert AFTER INSERT ON appointments
+        BEGIN
+            {_bump("'appointments'", 1)}
+            {_bump("'appointments.' || coalesce(new.status, 'none')", 1)}
+        END
+    """,
+    'counters_appointments_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_appointments_delete AFTER DELETE ON appointments
+        BEGIN
+            {_bump("'appointments'", -1)}
+            {_bump("'appointments.' || coalesce(old.status, 'none')", -1)}
+        END
+    """,
+    'counters_appointments_status': f"""
+        CREATE TRIGGER IF NOT EXISTS counters_appointments_status AFTER UPDATE OF status ON appointments
+        WHEN coalesce(old.status, '') IS NOT coalesce(new.status, '')
+        BEGIN
+            {_bump("'appointments.' || coalesce(old.status, 'none')", -1)}
+            {_bump("'appointments.' || coalesce(new.status, 'none')", 1)}
+        END
+    """,
+}
+
+
+def rebuild_counters(conn):
+    """Recalculer tous les compteurs à partir des tables (création ou correction d'une dérive)"""
+    conn.execute(text("DELETE FROM counters"))
+    conn.execute(text("""
+        INSERT INTO counters(name, value)
+        SELECT 'users.' || coalesce(role, 'none'), count(*) FROM users GROUP BY role
+        UNION ALL SELECT 'employees', count(*) FROM employees
+        UNION ALL SELECT 'appointments', count(*) FROM appointments
+        UNION ALL SELECT 'appointments.' || coalesce(status, 'none'), count(*) FROM appointments GROUP BY status
+    """))
+
+
+def init_counters(db):
+    """Installer les triggers manquants ; recalculer les compteurs si l'un d'eux vient d'être créé"""
+    with db.engine.begin() as conn:
+        existing = set(conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'counters_%'"
+        )).scalars())
+        missing = [name for name in COUNTER_TRIGGERS if name not in existing]
+        for name in missing:
+            conn.execute(text(COUNTER_TRIGGERS[name]))
+        if missing:
+            rebuild_counters(conn)
+        return bool(missing)
+
+
+def get_counters(*names):
+    """Lire des compteurs par clé primaire (0 pour un compteur absent)"""
+    values = dict(db.session.execute(select(Counter.name, Counter.value).where(Counter.name.in_(names))).all())
+    return {name: values.get(name, 0) for name in names}
+
+
+def get_counter(name):
+    return get_counters(name)[name]
+
+
+@click.command('rebuild-counters')
+@with_appcontext
+def rebuild_counters_command():
+    """Recalculer les compteurs du tableau de bord"""
+    with db.engine.begin() as conn:
+        rebuild_counters(conn)
+    click.echo('Compteurs recalculés')
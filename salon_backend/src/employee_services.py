@@ -0,0 +1,59 @@
+from sqlalchemy import delete, insert, select
+
+from src.cache import cache
+from src.changes import record_changes
+from src.models.models import db, Service, employee_services
+
+# Clé du cache de la liste publique des services actifs (qui contient les ids des employés)
+SERVICES_LIST_CACHE_KEY = 'services:active'
+
+
+def employees_by_service_cache_key(service_id):
+    return f'employees-by-service:{service_id}'
+
+
+def assigned_service_ids(employee_id):
+    return set(db.session.execute(
+        select(employee_services.c.service_id).where(employee_services.c.employee_id == employee_id)
+    ).scalars())
+
+
+def sync_employee_services(employee_id, service_ids, is_new=False):
+    """
+    Aligner les services d'un employé sur `service_ids` : une requête IN pour
+    valider les ids (les ids inconnus sont ignorés), puis un INSERT groupé des
+    ajouts et un DELETE des retraits, directement sur employee_services.
+    Retourne les ids des services dont l'affectation a changé.
+    """
+    requested = {int(service_id) for service_id in service_ids}
+    valid = set(db.session.execute(select(Service.id).where(Service.id.in_(requested))).scalars()) if requested else set()
+    current = set() if is_new else assigned_service_ids(employee_id)
+
+    added, removed = valid - current, current - valid
+    if added:
+        db.session.execute(
+            insert(employee_services),
+            [{'employee_id': employee_id, 'service_id': service_id} for service_id in sorted(added)]
+        )
+    if removed:
+        db.session.execute(
+            delete(employee_services).where(
+                employee_services.c.employee_id == employee_id,
+                employee_services.c.service_id.in_(removed)
+            )
+        )
+
+    changed = added | removed
+    if changed and not is_new:
+        # Écriture hors ORM : journaliser la modification de l'employé
+        record_changes(db.session.connection(), 'employee', [employee_id], 'update')
+    return changed
+
+
+def invalidate_service_caches(service_ids):
+    """Invalider uniquement les listes d'employés des services concernés"""
+    if not service_ids:
+        return
+    # Une clé à la fois : delete_many de Flask-Caching s'arrête à la première clé absente du cache
+    for key in [SERVICES_LIST_CACHE_KEY] + [employees_by_service_cache_key(i) for i in sorted(service_ids)]:
+        cache.delete(key)
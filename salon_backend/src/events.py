@@ -0,0 +1,229 @@
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+try:
+    import redis
+except ImportError:  # Diffusion multi-processus facultative
+    redis = None
+
+# Taille maximale de la file d'un abonné : au-delà, il est déclaré en retard
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Commentaire envoyé périodiquement pour garder la connexion ouverte
+KEEPALIVE_INTERVAL = 15
+
+# Reconnexion à Redis après une coupure : attente doublée à chaque échec, plafonnée
+REDIS_RECONNECT_DELAY = 0.5
+REDIS_RECONNECT_MAX_DELAY = 30
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    Abonné au flux d'événements. Sa file est bornée : un client trop lent
+    ne reçoit plus les événements mais un unique `resync`, qui lui demande
+    de se resynchroniser (via /api/admin/changes) une fois rattrapé.
+    """
+
+    def __init__(self, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def put(self, message):
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """Prochain message formaté, ou None à l'expiration du délai"""
+        if self.overflowed:
+            # Les messages en attente sont périmés : le client rechargera ses données
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.overflowed = False
+            return format_event('resync', {})
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalBackend:
+    """Diffusion dans le seul processus courant (serveur à un processus)"""
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, message):
+        self._deliver(message)
+
+
+class RedisBackend:
+    """
+    Diffusion entre processus via Redis pub/sub : chaque processus publie
+    sur le canal et relaie ce qu'il y lit à ses propres abonnés.
+    """
+
+    def __init__(self, url, channel='salon-events'):
+        if redis is None:
+            raise RuntimeError('Le paquet redis est requis pour EVENTS_BACKEND=redis')
+        self._client = redis.Redis.from_url(url)
+        self.channel = channel
+
+    def start(self, deliver):
+        threading.Thread(target=self._listen, args=(deliver,), name='events-redis', daemon=True).start()
+
+    def _listen(self, deliver):
+        """Relayer le canal ; en cas de coupure, se réabonner avec une attente croissante"""
+        delay = REDIS_RECONNECT_DELAY
+        while True:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                delay = REDIS_RECONNECT_DELAY
+                for item in pubsub.listen():
+                    deliver(item['data'].decode('utf-8'))
+            except Exception:
+                logger.warning('Écoute Redis interrompue, nouvel essai dans %.1f s', delay, exc_info=True)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            time.sleep(delay)
+            delay = min(delay * 2, REDIS_RECONNECT_MAX_DELAY)
+
+    def publish(self, message):
+        self._client.publish(self.channel, message)
+
+
+class EventBroker:
+    """Pub/sub en mémoire : les messages sont formatés une fois puis copiés dans la file de chaque abonné"""
+
+    def __init__(self, backend=None):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.backend = backend or LocalBackend()
+        self.backend.start(self._deliver)
+
+    def subscribe(self, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        subscriber = Subscriber(maxsize)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event_type, data):
+        self.backend.publish(format_event(event_type, data, next(self._ids)))
+
+    def _deliver(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+
+def format_event(event_type, data, event_id=None):
+    """Trame Server-Sent Events"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+broker = EventBroker()
+
+
+def init_events(app):
+    """Choisir le backend de diffusion selon la configuration (EVENTS_BACKEND)"""
+    global broker
+    if app.config.get('EVENTS_BACKEND') == 'redis':
+        broker = EventBroker(RedisBackend(app.config['EVENTS_REDIS_URL']))
+    return broker
+
+
+def get_broker():
+    return broker
+
+
+def appointment_event_data(action, appointment):
+    """Contenu de l'événement : de quoi savoir quelle journée recharger"""
+    return {
+        'action': action,
+        'id': appointment.id,
+        'employee_id': appointment.employee_id,
+        'appointment_date': appointment.appointment_date.isoformat() if appointment.appointment_date else None,
+        'status': appointment.status,
+    }
+
+
+def publish_event(event_type, data):
+    """Publier un événement après validation de la transaction"""
+    try:
+        get_broker().publish(event_type, data)
+    except Exception:
+        # La notification en direct ne doit jamais faire échouer l'écriture
+        logger.warning("Publication de l'événement %s impossible", event_type, exc_info=True)
+
+
+def publish_appointment_event(action, appointment):
+    """Publier la création, l'annulation ou le changement de statut d'un rendez-vous"""
+    publish_event('appointment', appointment_event_data(action, appointment))
+
+
+def _ticket_serializer():
+    # Sel propre au flux : la signature ne vaut pour aucun autre usage de SECRET_KEY
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='admin-events-ticket')
+
+
+def issue_events_ticket(user_id):
+    """
+    Ticket signé et daté pour ouvrir /api/admin/events (EventSource ne peut pas
+    envoyer d'en-tête Authorization). Ce n'est pas un JWT : aucune route
+    @jwt_required ne l'accepte.
+    """
+    return _ticket_serializer().dumps({'user_id': int(user_id)})
+
+
+def read_events_ticket(ticket, max_age):
+    """Id de l'utilisateur du ticket, ou None s'il est invalide ou expiré"""
+    try:
+        return int(_ticket_serializer().loads(ticket, max_age=max_age)['user_id'])
+    except (BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+def stream_events(subscriber, keepalive=KEEPALIVE_INTERVAL):
+    """Générateur de la réponse text/event-stream ; se désabonne à la déconnexion"""
+    try:
+        # Délai de reconnexion conseillé au navigateur
+        yield 'retry: 3000\n\n'
+        while True:
+            message = subscriber.get(timeout=keepalive)
+            yield message if message is not None else ': keepalive\n\n'
+    finally:
+        get_broker().unsubscribe(subscriber)
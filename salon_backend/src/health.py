@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import select, text
+
+from src.models.models import db, Employee, Service
+from src.utils.migrations import pending_migrations
+
+# Pages publiques mises en cache au démarrage de chaque worker (cache par processus)
+WARMUP_PATHS = [
+    '/api/services/',
+    '/api/services/categories',
+    '/api/salon/info',
+    '/api/salon/hours',
+    '/api/salon/gallery',
+    '/api/booking-data',
+    '/api/employees/',
+]
+
+# Index parcourus au démarrage pour charger leurs pages (cache du système et de SQLite)
+HOT_INDEXES = [
+    ('appointments', 'ix_appointments_appointment_date'),
+    ('appointments', 'ix_appointments_employee_id'),
+    ('appointments', 'ix_appointments_status'),
+    ('employee_availability', 'ix_employee_availability_employee_date'),
+    ('employee_hours', 'ix_employee_hours_employee_id'),
+    ('users', 'ix_users_role'),
+]
+
+
+class Readiness:
+    """État de préparation du processus courant : migrations vérifiées, caches préchauffés"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.status = 'pending'  # pending, running, done, failed
+        self.error = None
+        self.duration_ms = None
+        self.migrations_ok = False
+
+    def ensure_warm_up(self, app, wait=False):
+        """
+        Lancer le préchauffage une fois par processus (après le fork d'un worker),
+        ou le relancer après un échec. `wait` : dans le thread courant (benchmarks).
+        """
+        with self.lock:
+            if self.pid == os.getpid() and self.status != 'failed':
+                return
+            self.pid = os.getpid()
+            self.status, self.error = 'running', None
+        if wait:
+            self._run(app)
+        else:
+            threading.Thread(target=self._run, args=(app,), name='warm-up', daemon=True).start()
+
+    def _run(self, app):
+        started = time.perf_counter()
+        try:
+            warm_up(app)
+        except Exception as e:
+            app.logger.exception('Échec du préchauffage')
+            self.status, self.error = 'failed', str(e)
+        else:
+            self.status = 'done'
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        if self.status == 'done':
+            app.logger.info('Préchauffage terminé en %.0f ms', self.duration_ms)
+
+
+def touch_hot_indexes():
+    """Parcourir les index des requêtes critiques et les rendez-vous des semaines autour d'aujourd'hui"""
+    existing = set(db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    for table, index in HOT_INDEXES:
+        if index in existing:
+            db.session.execute(text(f'SELECT count(*) FROM {table} INDEXED BY {index}'))
+    today = date.today()
+    db.session.execute(
+        text('SELECT count(*), max(end_time) FROM appointments WHERE appointment_date BETWEEN :start AND :end'),
+        {'start': (today - timedelta(days=7)).isoformat(), 'end': (today + timedelta(days=60)).isoformat()}
+    )
+    db.session.rollback()
+
+
+def warm_up(app):
+    """Remplir les caches du catalogue (via le client de test, mêmes clés que les vraies requêtes) et charger les index chauds"""
+    with app.app_context():
+        service_ids = db.session.execute(select(Service.id).where(Service.is_active == True)).scalars().all()
+        employee_ids = db.session.execute(select(Employee.id).where(Employee.is_active == True)).scalars().all()
+        touch_hot_indexes()
+        db.session.remove()
+
+    paths = list(WARMUP_PATHS)
+    paths += [f'/api/employees/by-service/{service_id}' for service_id in service_ids]
+    paths += [f'/api/employees/{employee_id}/hours' for employee_id in employee_ids]
+
+    client = app.test_client()
+    for path in paths:
+        response = client.get(path)
+        if response.status_code >= 500:
+            raise RuntimeError(f'{path} : HTTP {response.status_code}')
+
+
+def check_database():
+    db.session.execute(text('SELECT 1'))
+    return 'ok'
+
+
+def check_migrations(state):
+    # Une fois appliquées, les migrations ne peuvent pas disparaître : inutile de réinspecter le schéma
+    if state.migrations_ok:
+        return 'ok'
+    pending = pending_migrations(db)
+    if pending:
+        return pending
+    state.migrations_ok = True
+    return 'ok'
+
+
+def readiness_report():
+    """(prêt ?, détail des vérifications) pour /readyz"""
+    app = current_app._get_current_object()
+    state = app.extensions['readiness']
+    checks = {}
+    ready = True
+
+    try:
+        checks['database'] = check_database()
+        migrations = check_migrations(state)
+        checks['migrations'] = migrations if migrations == 'ok' else {'pending': migrations}
+        ready = migrations == 'ok'
+    except Exception as e:
+        checks['database'] = f'erreur : {e}'
+        ready = False
+
+    if app.config['WARMUP_ENABLED']:
+        state.ensure_warm_up(app)
+        checks['warmup'] = state.status if not state.error else f'{state.status} : {state.error}'
+        ready = ready and state.status == 'done'
+
+    return ready, checks
+
+
+def init_readiness(app):
+    """Préchauffer les caches de chaque worker dès son premier démarrage ou sa première requête"""
+    app.config.setdefault('WARMUP_ENABLED', True)
+    app.extensions['readiness'] = state = Readiness()
+    if not app.config['WARMUP_ENABLED']:
+        return state
+
+    @app.before_request
+    def start_warm_up():
+        # Comparaison de pid : démarre le préchauffage dans chaque worker forké
+        if state.pid != os.getpid():
+            state.ensure_warm_up(app)
+
+    return state
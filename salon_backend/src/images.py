@@ -0,0 +1,156 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.models.models import db, Gallery
+
+# Largeurs générées pour chaque photo de la galerie
+VARIANT_WIDTHS = {'thumb': 320, 'medium': 800, 'full': 1600}
+
+# Format moderne (webp) et repli universel (jpeg)
+VARIANT_FORMATS = [
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+]
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF', 'MPO'}
+
+# Protection contre les "bombes de décompression"
+MAX_IMAGE_PIXELS = 50_000_000
+
+
+class InvalidImageError(ValueError):
+    """Le fichier téléversé n'est pas une image exploitable"""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(app):
+    """Pool de threads partagé pour le traitement des images"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('IMAGE_WORKERS', 2),
+                thread_name_prefix='gallery-images'
+            )
+    return _executor
+
+
+def validate_image(path):
+    """Vérifier que le fichier est une image d'un format accepté et de taille raisonnable"""
+    try:
+        with Image.open(path) as img:
+            if img.format not in ALLOWED_FORMATS:
+                raise InvalidImageError(f"Format d'image non supporté : {img.format}")
+            if img.width * img.height > MAX_IMAGE_PIXELS:
+                raise InvalidImageError('Image trop grande')
+            img.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise InvalidImageError("Le fichier n'est pas une image valide") from e
+
+
+def generate_variants(source_path, output_dir, url_prefix, stem):
+    """
+    Générer les variantes redimensionnées (sans métadonnées EXIF) d'une image.
+    Retourne {"webp": [{"width", "url"}...], "jpeg": [...]} trié par largeur.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    with Image.open(source_path) as img:
+        # Appliquer l'orientation EXIF avant de l'abandonner
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+        widths = sorted({min(w, img.width) for w in VARIANT_WIDTHS.values()})
+        variants = {ext: [] for ext, _, _ in VARIANT_FORMATS}
+
+        for width in widths:
+            height = max(1, round(img.height * width / img.width))
+            resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+
+            for ext, pil_format, options in VARIANT_FORMATS:
+                frame = resized
+                if pil_format == 'JPEG' and frame.mode != 'RGB':
+                    # Le JPEG ne gère pas la transparence : fond blanc
+                    background = Image.new('RGB', frame.size, (255, 255, 255))
+                    background.paste(frame, mask=frame.getchannel('A'))
+                    frame = background
+
+                filename = f'{stem}-{width}.{ext}'
+                # Aucune métadonnée (exif, icc...) n'est transmise à save()
+                frame.save(os.path.join(output_dir, filename), pil_format, **options)
+                variants[ext].append({'width': width, 'url': f'{url_prefix}/{filename}'})
+
+    return variants
+
+
+def process_gallery_image(app, gallery_id, source_path, output_dir, url_prefix, on_complete=None):
+    """Traiter une photo téléversée puis enregistrer ses variantes sur la ligne Gallery"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    with app.app_context():
+        try:
+            gallery_item = db.session.get(Gallery, gallery_id)
+            if gallery_item is None:
+                return
+
+            # Un téléversement identique a pu être traité entre-temps
+            duplicate = find_processed_duplicate(gallery_item.content_hash, exclude_id=gallery_id)
+            if duplicate is not None:
+                variants = duplicate.get_variants()
+            else:
+                try:
+                    variants = generate_variants(source_path, output_dir, url_prefix, stem)
+                except Exception:
+                    app.logger.exception("Échec du traitement de l'image %s", source_path)
+                    variants = None
+
+            if variants:
+                gallery_item.set_variants(variants)
+                # L'original (avec ses métadonnées) est remplacé par la plus grande variante jpeg
+                gallery_item.image_url = variants['jpeg'][-1]['url']
+                gallery_item.processing_status = 'ready'
+            else:
+                gallery_item.processing_status = 'failed'
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Impossible d'enregistrer les variantes de la galerie %s", gallery_id)
+            return
+        finally:
+            db.session.remove()
+
+        if variants:
+            try:
+                os.remove(source_path)
+            except OSError:
+                pass
+
+        if on_complete:
+            on_complete()
+
+
+def find_processed_duplicate(content_hash, exclude_id=None):
+    """Retrouver une photo déjà traitée ayant exactement le même contenu"""
+    if not content_hash:
+        return None
+    query = Gallery.query.filter(
+        Gallery.content_hash == content_hash,
+        Gallery.processing_status == 'ready',
+        Gallery.variants.isnot(None)
+    )
+    if exclude_id is not None:
+        query = query.filter(Gallery.id != exclude_id)
+    return query.first()
+
+
+def schedule_gallery_processing(app, gallery_id, source_path, output_dir, url_prefix, on_complete=None):
+    """Lancer le traitement hors du thread de la requête"""
+    return get_executor(app).submit(
+        process_gallery_image, app, gallery_id, source_path, output_dir, url_prefix, on_complete
+    )
@@ -0,0 +1,130 @@
+import logging
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('src.sql')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Levée en mode strict quand une route dépasse son budget de requêtes SQL"""
+
+
+class RequestQueries:
+    """Requêtes SQL d'une requête HTTP : nombre, temps cumulé, répétitions par instruction"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def add(self, statement, duration, executemany):
+        self.count += 1
+        self.duration += duration
+        if not executemany:
+            self.statements[statement] += 1
+
+    def repeated(self, threshold):
+        """Instructions identiques (hors paramètres) exécutées au moins `threshold` fois : N+1 probable"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+def current_queries():
+    """Statistiques SQL de la requête HTTP en cours (None hors requête ou si désactivé)"""
+    return g.get('sql_queries') if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Départ associé au contexte d'exécution : handle_error retrouve l'entrée de l'instruction en échec
+    conn.info.setdefault('query_started', []).append((context, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info['query_started'].pop()
+    queries = current_queries()
+    if queries is not None:
+        queries.add(statement, time.perf_counter() - started, executemany)
+
+
+def _handle_error(context):
+    # Instruction en échec : after_cursor_execute n'est pas appelé, retirer son départ de la pile
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started and started[-1][0] is context.execution_context:
+        started.pop()
+
+
+def query_budget(app, endpoint):
+    return app.config['SQL_QUERY_BUDGETS'].get(endpoint, app.config['SQL_QUERY_BUDGET_DEFAULT'])
+
+
+def init_sql_instrumentation(app):
+    """
+    Mesurer les requêtes SQL de chaque requête HTTP : en-tête Server-Timing
+    (db, app), journal 'src.sql', détection des instructions répétées (N+1)
+    et, en mode strict (tests), échec au-delà du budget de requêtes de la route.
+    """
+    app.config.setdefault('SQL_INSTRUMENTATION', True)
+    app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    app.config.setdefault('SQL_QUERY_BUDGET_DEFAULT', None)  # None : pas de budget
+    app.config.setdefault('SQL_QUERY_BUDGETS', {})  # {'blueprint.endpoint': nombre maximal de requêtes}
+    app.config.setdefault('SQL_STRICT_BUDGETS', False)
+
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    # Sur la classe Engine : couvre le moteur créé plus tard par Flask-SQLAlchemy
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    reported_repeats = set()
+
+    @app.before_request
+    def start_query_tracking():
+        g.sql_queries = RequestQueries()
+
+    @app.after_request
+    def report_queries(response):
+        queries = g.pop('sql_queries', None)
+        if queries is None:
+            return response
+
+        total_ms = (time.perf_counter() - queries.started) * 1000
+        db_ms = queries.duration * 1000
+        response.headers.add(
+            'Server-Timing', f'db;dur={db_ms:.1f};desc="SQL x{queries.count}", app;dur={total_ms:.1f}'
+        )
+
+        endpoint = request.endpoint or request.path
+        details = {
+            'endpoint': endpoint,
+            'method': request.method,
+            'status': response.status_code,
+            'sql_queries': queries.count,
+            'sql_ms': round(db_ms, 2),
+            'duration_ms': round(total_ms, 2),
+        }
+        logger.debug('%s %s : %d requêtes SQL, %.1f ms', request.method, request.path, queries.count, db_ms,
+                     extra=details)
+
+        for statement, count in queries.repeated(app.config['SQL_N_PLUS_ONE_THRESHOLD']):
+            # Signalé une fois par processus et par instruction, puis seulement en debug
+            key = (endpoint, statement)
+            level = logging.DEBUG if key in reported_repeats else logging.WARNING
+            reported_repeats.add(key)
+            logger.log(level, 'N+1 probable sur %s : instruction exécutée %d fois : %s', endpoint, count,
+                       ' '.join(statement.split())[:300], extra=dict(details, repeated=count))
+
+        budget = query_budget(app, endpoint)
+        if budget is not None and queries.count > budget:
+            message = f'{endpoint} : {queries.count} requêtes SQL pour un budget de {budget}'
+            if app.config['SQL_STRICT_BUDGETS']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra=dict(details, budget=budget))
+
+        return response
@@ -0,0 +1,186 @@
+import json
+import os
+import random
+import signal
+import socket
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.models.models import db, Job
+
+# Délai de reprise d'une tâche dont le worker ne donne plus signe de vie
+DEFAULT_VISIBILITY_TIMEOUT = 300
+
+# Nouvel essai après 30 s, 1 min, 2 min... plafonné à une heure
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+
+_handlers = {}
+
+
+def job(name):
+    """
+    Enregistrer une fonction comme tâche différée. Les tâches peuvent être
+    exécutées plusieurs fois (reprise après échec ou expiration du verrou) :
+    elles doivent donc être idempotentes.
+    """
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, run_at=None, max_attempts=5):
+    """
+    Mettre une tâche en file dans la transaction en cours : elle n'est visible
+    du worker qu'une fois la transaction validée, et disparaît avec elle en cas
+    d'annulation. Une tâche dont la clé d'idempotence existe déjà est ignorée.
+    """
+    if name not in _handlers:
+        raise ValueError(f'Tâche inconnue : {name}')
+
+    statement = sqlite_insert(Job).values(
+        name=name,
+        payload=json.dumps(payload or {}),
+        status='queued',
+        idempotency_key=idempotency_key,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=run_at or datetime.utcnow(),
+        created_at=datetime.utcnow()
+    ).on_conflict_do_nothing(index_elements=['idempotency_key'])
+    return db.session.execute(statement).rowcount == 1
+
+
+def _ready_clause(now):
+    return or_(
+        and_(Job.status == 'queued', Job.run_at <= now),
+        # Verrou expiré : le worker précédent a été interrompu
+        and_(Job.status == 'running', Job.locked_until < now)
+    )
+
+
+def claim_next(worker_id, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+    """Réserver la prochaine tâche prête (UPDATE conditionnel, sûr entre plusieurs workers)"""
+    for _ in range(5):
+        now = datetime.utcnow()
+        job_id = db.session.execute(
+            select(Job.id).where(_ready_clause(now)).order_by(Job.run_at, Job.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.commit()
+            return None
+
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, _ready_clause(now))
+            .values(
+                status='running',
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=visibility_timeout),
+                attempts=Job.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+        # Un autre worker l'a prise entre-temps
+    return None
+
+
+def retry_delay(attempts):
+    """Attente exponentielle avec une part d'aléa pour étaler les reprises"""
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _finish(job_id, worker_id, **values):
+    # Ne rien écrire si le verrou a expiré et que la tâche a été reprise par un autre worker
+    db.session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == 'running')
+        .values(locked_until=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def run_job(job_row, worker_id):
+    """Exécuter une tâche réservée puis la marquer terminée, à reprendre ou en échec"""
+    job_id, attempts, max_attempts = job_row.id, job_row.attempts, job_row.max_attempts
+    handler = _handlers.get(job_row.name)
+
+    if attempts > max_attempts:
+        _finish(job_id, worker_id, status='failed', finished_at=datetime.utcnow(),
+                last_error=job_row.last_error or 'Délai de traitement dépassé')
+        return False
+
+    try:
+        if handler is None:
+            raise LookupError(f'Tâche inconnue : {job_row.name}')
+        handler(**job_row.get_payload())
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Échec de la tâche %s #%s', job_row.name, job_id)
+        if attempts >= max_attempts:
+            _finish(job_id, worker_id, status='failed', finished_at=datetime.utcnow(), last_error=str(e))
+        else:
+            _finish(job_id, worker_id, status='queued', locked_by=None, last_error=str(e),
+                    run_at=datetime.utcnow() + timedelta(seconds=retry_delay(attempts)))
+        return False
+
+    _finish(job_id, worker_id, status='done', finished_at=datetime.utcnow())
+    return True
+
+
+def run_worker(worker_id=None, poll_interval=1.0, burst=False, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT,
+               should_stop=lambda: False):
+    """
+    Boucle du worker : réserve et exécute les tâches prêtes.
+    En mode `burst`, s'arrête dès que la file est vide. Retourne le nombre de tâches traitées.
+    """
+    worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+    processed = 0
+    while not should_stop():
+        job_row = claim_next(worker_id, visibility_timeout)
+        if job_row is None:
+            db.session.remove()
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job_row, worker_id)
+        processed += 1
+        # Ne pas accumuler d'objets dans la session d'un processus de longue durée
+        db.session.remove()
+    return processed
+
+
+@click.command('jobs-worker')
+@click.option('--burst', is_flag=True, help="S'arrêter quand la file est vide")
+@click.option('--poll-interval', default=1.0, help="Attente (secondes) lorsqu'aucune tâche n'est prête")
+@click.option('--visibility-timeout', default=None, type=int, help='Secondes avant reprise d\'une tâche abandonnée')
+@with_appcontext
+def jobs_worker_command(burst, poll_interval, visibility_timeout):
+    """Exécuter les tâches différées (e-mails de confirmation, rappels...)"""
+    stopping = []
+
+    def request_stop(signum, frame):
+        # Terminer la tâche en cours avant de quitter
+        stopping.append(signum)
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    timeout = visibility_timeout or current_app.config.get('JOBS_VISIBILITY_TIMEOUT', DEFAULT_VISIBILITY_TIMEOUT)
+    processed = run_worker(poll_interval=poll_interval, burst=burst, visibility_timeout=timeout,
+                           should_stop=lambda: bool(stopping))
+    click.echo(f'{processed} tâche(s) traitée(s)')
@@ -0,0 +1,80 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # L'encodeur rapide est optionnel
+    orjson = None
+
+
+class RawJSON(bytes):
+    """Charge utile JSON déjà sérialisée (ex: réponse mise en cache), renvoyée telle quelle"""
+
+
+def _default(o):
+    """Sérialiser les types que le module json standard ne connaît pas"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Fournisseur JSON de l'application : utilise orjson s'il est installé,
+    sinon le module json standard avec des séparateurs compacts.
+    Les dates, heures et datetimes sont sérialisées en ISO 8601.
+    """
+
+    sort_keys = False
+    mimetype = 'application/json'
+
+    def dumps_bytes(self, obj, **kwargs):
+        """Sérialiser un objet directement en octets UTF-8"""
+        if isinstance(obj, RawJSON):
+            return bytes(obj)
+
+        if orjson is not None and not kwargs:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=_default, option=option)
+            except TypeError:
+                # Entiers hors plage 64 bits, etc. : on retombe sur la bibliothèque standard
+                pass
+
+        return self._stdlib_dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if isinstance(obj, RawJSON):
+            return obj.decode('utf-8')
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode('utf-8')
+        return self._stdlib_dumps(obj, **kwargs)
+
+    def _stdlib_dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,124 @@
+import os
+import smtplib
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+import click
+from flask import current_app
+
+
+def send_email(to, subject, body):
+    """Envoyer un e-mail texte via le serveur SMTP configuré (MAIL_SERVER / MAIL_PORT)"""
+    config = current_app.config
+    message = EmailMessage()
+    message['From'] = config['MAIL_DEFAULT_SENDER']
+    message['To'] = to
+    message['Subject'] = subject
+    message.set_content(body)
+
+    with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config.get('MAIL_TIMEOUT', 10)) as smtp:
+        if config.get('MAIL_USE_TLS'):
+            smtp.starttls()
+        if config.get('MAIL_USERNAME'):
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        smtp.send_message(message)
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Dialogue SMTP minimal : accepte tout message et le confie au serveur"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def handle(self):
+        self.reply('220 localhost mail-sink')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip(' <>'), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip(' <>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    # Transparence SMTP : un point initial est doublé par l'expéditeur
+                    lines.append(data[1:] if data.startswith(b'..') else data)
+                self.server.deliver(sender, recipients, b''.join(lines))
+                self.reply('250 OK')
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class MailSink(socketserver.ThreadingTCPServer):
+    """
+    Serveur SMTP local qui n'envoie rien : les messages reçus sont conservés
+    en mémoire (`messages`) et, si un dossier est indiqué, écrits en .eml.
+    Permet de développer et de tester l'envoi d'e-mails sans réseau.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=1025, directory=None):
+        super().__init__((host, port), _SinkHandler)
+        self.directory = directory
+        self.messages = []
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def deliver(self, sender, recipients, data):
+        with self._lock:
+            self.messages.append({'from': sender, 'to': recipients, 'data': data})
+            count = len(self.messages)
+        if self.directory:
+            filename = f'{time.strftime("%Y%m%d-%H%M%S")}-{count:04d}.eml'
+            with open(os.path.join(self.directory, filename), 'wb') as f:
+                f.write(data)
+
+    def start(self):
+        """Démarrer le serveur dans un thread (utile dans les tests : port=0 pour un port libre)"""
+        threading.Thread(target=self.serve_forever, name='mail-sink', daemon=True).start()
+        return self
+
+
+@click.command('mail-sink')
+@click.option('--host', default='127.0.0.1')
+@click.option('--port', default=1025)
+@click.option('--directory', default='instance/mail', help='Dossier où écrire les messages reçus')
+def mail_sink_command(host, port, directory):
+    """Serveur SMTP local de développement : les e-mails sont écrits sur disque au lieu d'être envoyés"""
+    with MailSink(host, port, directory) as server:
+        click.echo(f'Serveur SMTP local sur {host}:{server.port}, messages dans {directory}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -3,11 +3,32 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from src.cache import cache
+from src.json_provider import FastJSONProvider
+from src.compression import init_compression
+from src.metrics import init_metrics, instrument_cache
+from src.profiling import init_profiling
+from src.instrumentation import init_sql_instrumentation
+from src.structured_logging import init_logging
+from src.slow_queries import init_slow_query_log
+from src.static_files import StaticIndex, send_static_asset
+from src.uploads import UploadRequest
 from src.models.models import db
+from src.utils.migrations import apply_migrations
+from src.search import init_client_search
+from src.counters import init_counters, rebuild_counters_command
+from src.utils.archive import archive_availability_command
+from src.utils.synthetic_data import generate_data_command
+from src.utils.benchmark import bench_command
+from src.utils.loadtest import loadtest_command
+from src.changes import init_change_tracking, prune_changes_command
+from src.schedule import init_schedule_versions
+from src.events import init_events
+from src.jobs import jobs_worker_command
+from src.mailer import mail_sink_command
 from src.routes.auth import auth_bp
 from src.routes.services import services_bp
 from src.routes.employees import employees_bp
@@ -15,23 +36,70 @@ from src.routes.appointments import appointments_bp
 from src.routes.admin import admin_bp
 from src.routes.salon import salon_bp
 from src.routes.booking_page import booking_page_bp
+from src.routes.health import health_bp
+from src.health import init_readiness
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'), static_url_path='/')
+# Les fichiers du build Vite sont servis par la route `serve` ci-dessous (variantes
+# pré-compressées, repli SPA) : la route statique intégrée ne doit pas la masquer
+app = Flask(__name__, static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'), static_url_path='/static')
 app.config['SECRET_KEY'] = 'salon-coiffure-secret-key-2025'
 app.config['JWT_SECRET_KEY'] = 'jwt-salon-secret-key-2025'
 app.config['JWT_TOKEN_LOCATION'] = ['headers']
 app.config['JWT_HEADER_NAME'] = 'Authorization'
 app.config['JWT_HEADER_TYPE'] = 'Bearer'
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'uploads')
+app.config['IMAGE_WORKERS'] = 2  # Threads de traitement des photos de la galerie
+app.config['UPLOAD_MAX_FILE_SIZE'] = 10 * 1024 * 1024  # 10 Mo par photo
+app.config['MAX_CONTENT_LENGTH'] = 12 * 1024 * 1024  # Corps de requête refusé au-delà (413)
+
+# Envoi des e-mails par le worker (flask jobs-worker). Par défaut vers le serveur
+# SMTP local de développement (flask mail-sink), qui écrit les messages sur disque
+app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'localhost')
+app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 1025))
+app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS') == '1'
+app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
+app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
+app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'Élégance Coiffure <no-reply@elegance-coiffure.fr>')
+app.config['JOBS_VISIBILITY_TIMEOUT'] = 300  # Secondes avant reprise d'une tâche abandonnée
+
+# Les fichiers téléversés sont écrits sur disque par morceaux, avec calcul de leur empreinte
+app.request_class = UploadRequest
+
+# Sérialisation JSON (orjson si disponible, sinon json standard compact)
+app.json = FastJSONProvider(app)
+
+# Profilage à la demande (en-tête X-Profile d'un admin, ou PROFILE_SAMPLE_RATE) ;
+# enregistré en premier pour couvrir tous les autres hooks de la requête
+init_profiling(app)
+
+# Métriques Prometheus (/metrics) ; METRICS_DIR agrège les workers d'un même serveur.
+# Avant la compression : la taille mesurée des réponses est celle envoyée au client
+init_metrics(app, lambda: db.engine)
+
+# Compression gzip/brotli des réponses JSON volumineuses
+init_compression(app)
+
+# Nombre et durée des requêtes SQL par requête HTTP (Server-Timing, détection des N+1).
+# SQL_STRICT_BUDGETS=True fait échouer les tests au-delà de SQL_QUERY_BUDGETS
+init_sql_instrumentation(app)
+
+# Journaux JSON écrits hors des threads de requête (QueueListener), ligne d'accès
+# avec identifiant de requête, utilisateur, durée et temps SQL (LOG_FORMAT=text en développement)
+init_logging(app)
 
 # Configuration CORS
-CORS(app, resources={r"/api/*": {"origins": "*", "allow_headers": ["Content-Type", "Authorization"]}})
+CORS(app, resources={r"/api/*": {"origins": "*", "allow_headers": ["Content-Type", "Authorization", "X-Profile"], "expose_headers": ["X-Total-Count", "X-Page", "X-Per-Page", "X-Change-Cursor", "X-Profile-Id", "X-Request-ID"]}})
 
 # Configuration JWT
 jwt = JWTManager(app)
 
+@app.errorhandler(413)
+def request_entity_too_large(e):
+    return jsonify({'error': 'Fichier trop volumineux'}), 413
+
 # Configuration du cache
 cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+instrument_cache(app, cache)  # Succès / échecs du cache par route dans /metrics
 
 # Enregistrement des blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -41,42 +109,93 @@ app.register_blueprint(appointments_bp, url_prefix='/api/appointments')
 app.register_blueprint(admin_bp, url_prefix='/api/admin')
 app.register_blueprint(salon_bp, url_prefix='/api/salon')
 app.register_blueprint(booking_page_bp, url_prefix='/api')
+app.register_blueprint(health_bp)  # /healthz, /readyz
+
+# Commandes de maintenance (flask archive-availability)
+app.cli.add_command(archive_availability_command)
+app.cli.add_command(prune_changes_command)
+app.cli.add_command(jobs_worker_command)
+app.cli.add_command(mail_sink_command)
+app.cli.add_command(rebuild_counters_command)
+app.cli.add_command(generate_data_command)
+app.cli.add_command(bench_command)
+app.cli.add_command(loadtest_command)
 
-# Configuration de la base de données
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# Journal des modifications pour la synchronisation différentielle (/api/admin/changes)
+init_change_tracking()
+
+# Version des horaires mise en cache, invalidée après chaque modification validée
+init_schedule_versions()
+
+# Notifications en direct (/api/admin/events) : 'local' pour un seul processus,
+# 'redis' (EVENTS_REDIS_URL) pour diffuser entre plusieurs workers
+app.config.setdefault('EVENTS_BACKEND', os.environ.get('EVENTS_BACKEND', 'local'))
+app.config.setdefault('EVENTS_REDIS_URL', os.environ.get('EVENTS_REDIS_URL', 'redis://localhost:6379/0'))
+app.config.setdefault('EVENTS_MAX_SUBSCRIBERS', 50)
+init_events(app)
+
+# Configuration de la base de données (SALON_DATABASE : autre fichier, ex. base synthétique des benchmarks)
+db_path = os.path.abspath(os.environ.get('SALON_DATABASE') or os.path.join(os.path.dirname(__file__), 'database', 'app.db'))
+app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
 # Initialisation de la base de données
 with app.app_context():
     # Créer le dossier database s'il n'existe pas
-    db_folder = os.path.join(os.path.dirname(__file__), 'database')
-    os.makedirs(db_folder, exist_ok=True)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
     # Vérifier si la base de données existe déjà
-    db_path = os.path.join(db_folder, 'app.db')
     db_exists = os.path.exists(db_path)
     
     if not db_exists:
         # Créer la base de données seulement si elle n'existe pas
-        print("Création de la base de données...")
+        app.logger.info("Création de la base de données...")
         db.create_all()
         
         # Import des données de démonstration
         from src.utils.seed_data import seed_database
         seed_database(db)
-        print("Base de données initialisée avec succès!")
+        app.logger.info("Base de données initialisée avec succès!")
     else:
         # La base existe déjà, ne rien faire
-        print("Base de données existante chargée.")
+        app.logger.info("Base de données existante chargée.")
         # S'assurer que toutes les tables existent (pour les migrations)
         db.create_all()
+        # Ajouter les colonnes et index apparus depuis la création de la base
+        for migration in apply_migrations(db):
+            app.logger.info("Migration appliquée : %s", migration)
+
+    # Index de recherche des clients (FTS5), alimenté à sa création puis par triggers
+    if init_client_search(db):
+        app.logger.info("Index de recherche des clients créé")
+
+    # Compteurs du tableau de bord, maintenus par triggers dans la transaction des écritures
+    if init_counters(db):
+        app.logger.info("Compteurs initialisés")
+
+    # Journal des requêtes lentes (logs/slow_queries.log) avec leur plan d'exécution
+    app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100)))
+    init_slow_query_log(app, db.engine)
+
+# Préchauffage des caches du catalogue et des index chauds dans chaque worker,
+# lancé par la première requête (en pratique la sonde /readyz, qui répond 503 d'ici là)
+init_readiness(app)
 
 from flask import current_app
 
 @app.route('/uploads/<path:filename>')
 def uploaded_files(filename):
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+    return send_static_asset(current_app.config['UPLOAD_FOLDER'], filename)
+
+# Index des fichiers du build (rafraîchi sur SIGHUP ou changement de dossier)
+app.config.setdefault('STATIC_INDEX_CHECK_INTERVAL', 5)
+static_index = StaticIndex(
+    app.static_folder,
+    exclude=[os.path.relpath(app.config['UPLOAD_FOLDER'], app.static_folder)],
+    check_interval=app.config['STATIC_INDEX_CHECK_INTERVAL']
+)
+static_index.install_sighup_handler()
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -85,19 +204,18 @@ def serve(path):
     if path.startswith('api/'):
         return "Not found", 404
     
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
         return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
+    static_file = static_index.lookup(path) if path != "" else None
+    if static_file is None:
+        # Repli SPA : le routeur React gère les liens profonds
+        static_file = static_index.lookup('index.html')
+        if static_file is None:
             return "index.html not found", 404
 
+    return static_index.send(static_file)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
 
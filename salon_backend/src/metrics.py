@@ -0,0 +1,340 @@
+import atexit
+import functools
+import glob
+import json
+import os
+import threading
+import time
+
+from flask import Response, abort, current_app, g, has_request_context, request
+
+# Métriques au format texte Prometheus, sans dépendance externe.
+#
+# En mode multi-processus (METRICS_DIR), chaque worker écrit périodiquement un
+# instantané de ses métriques dans METRICS_DIR/metrics-<pid>.json ; /metrics
+# additionne les instantanés de tous les workers. Les compteurs et histogrammes
+# des workers arrêtés sont conservés, les jauges des instantanés périmés ignorées.
+# Vider le dossier au démarrage du serveur (comme pour prometheus_client).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COMPUTE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+class Metric:
+    def __init__(self, registry, kind, name, help, labelnames, buckets=None):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self.registry.lock:
+            self.values[self._key(labels)] = value
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            # [compteurs par borne..., somme, nombre]
+            state = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels):
+        """Décorateur : observer la durée d'exécution de la fonction (histogramme)"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.collectors = []  # Fonctions appelées à chaque collecte (jauges calculées)
+
+    def _register(self, kind, name, help, labelnames=(), buckets=None):
+        if name not in self.metrics:
+            self.metrics[name] = Metric(self, kind, name, help, labelnames, buckets)
+        return self.metrics[name]
+
+    def counter(self, name, help, labelnames=()):
+        return self._register('counter', name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register('gauge', name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register('histogram', name, help, labelnames, buckets)
+
+    def snapshot(self):
+        """État sérialisable en JSON de toutes les métriques"""
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception:
+                pass
+        with self.lock:
+            return {
+                name: {
+                    'kind': metric.kind, 'help': metric.help, 'labelnames': list(metric.labelnames),
+                    'buckets': list(metric.buckets) if metric.buckets else None,
+                    'samples': [[list(key), value] for key, value in metric.values.items()],
+                }
+                for name, metric in self.metrics.items()
+            }
+
+
+def merge_snapshots(snapshots, live):
+    """Additionner des instantanés ; les jauges ne sont prises que dans les instantanés `live`"""
+    merged = {}
+    for snapshot, is_live in zip(snapshots, live):
+        for name, data in snapshot.items():
+            if data['kind'] == 'gauge' and not is_live:
+                continue
+            target = merged.setdefault(name, dict(data, samples={}))
+            for labels, value in data['samples']:
+                key = tuple(labels)
+                if data['kind'] == 'histogram':
+                    current = target['samples'].get(key)
+                    target['samples'][key] = [a + b for a, b in zip(current, value)] if current else list(value)
+                else:
+                    target['samples'][key] = target['samples'].get(key, 0) + value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+INF_BOUND = 'le="+Inf"'
+
+
+def render(merged):
+    """Format d'exposition texte Prometheus 0.0.4"""
+    lines = []
+    for name in sorted(merged):
+        data = merged[name]
+        lines.append(f'# HELP {name} {data["help"]}')
+        lines.append(f'# TYPE {name} {data["kind"]}')
+        names = data['labelnames']
+        for key, value in sorted(data['samples'].items()):
+            if data['kind'] != 'histogram':
+                lines.append(f'{name}{_labels(names, key)} {_number(value)}')
+                continue
+            # Les compteurs par borne sont déjà cumulatifs (observation <= borne)
+            for bound, count in zip(data['buckets'], value):
+                le = 'le="{}"'.format(_number(float(bound)))
+                lines.append(f'{name}_bucket{_labels(names, key, le)} {count}')
+            lines.append(f'{name}_bucket{_labels(names, key, INF_BOUND)} {value[-1]}')
+            lines.append(f'{name}_sum{_labels(names, key)} {_number(value[-2])}')
+            lines.append(f'{name}_count{_labels(names, key)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+class MultiprocessStore:
+    """Instantanés par processus dans un dossier partagé, écrits par un thread en arrière-plan"""
+
+    def __init__(self, registry, directory, interval=5):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.pid = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f'metrics-{os.getpid()}.json')
+
+    def ensure_started(self):
+        # Démarré après le fork du worker (gunicorn --preload), une fois par processus
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        threading.Thread(target=self._run, name='metrics-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def flush(self):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'written_at': time.time(), 'metrics': self.registry.snapshot()}, f)
+        os.replace(temporary, self.path)
+
+    def collect(self):
+        """Instantané courant de ce processus + derniers instantanés des autres"""
+        snapshots, live = [self.registry.snapshot()], [True]
+        stale_before = time.time() - 3 * self.interval
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data['pid'] == os.getpid():
+                continue
+            snapshots.append(data['metrics'])
+            live.append(data['written_at'] >= stale_before)
+        return merge_snapshots(snapshots, live)
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter('http_requests_total', 'Requêtes HTTP traitées', ['endpoint', 'method', 'status'])
+http_latency = registry.histogram('http_request_duration_seconds', 'Durée de traitement des requêtes HTTP', ['endpoint', 'method'])
+http_in_flight = registry.gauge('http_requests_in_flight', 'Requêtes HTTP en cours', ['endpoint'])
+http_response_size = registry.histogram('http_response_size_bytes', 'Taille des réponses HTTP (après compression)',
+                                        ['endpoint'], buckets=SIZE_BUCKETS)
+cache_requests = registry.counter('cache_requests_total', 'Lectures du cache Flask-Caching par route', ['endpoint', 'result'])
+db_pool = registry.gauge('db_pool_connections', 'Connexions du pool SQLAlchemy', ['state'])
+availability_compute = registry.histogram('availability_computation_seconds', 'Durée du calcul des créneaux disponibles',
+                                          ['function'], buckets=COMPUTE_BUCKETS)
+
+
+def _endpoint():
+    return request.endpoint or 'none'
+
+
+class InstrumentedCache:
+    """Enveloppe du backend de cache qui compte les succès et les échecs de lecture"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def _record(self, found):
+        cache_requests.inc(endpoint=_endpoint() if has_request_context() else 'none', result='hit' if found else 'miss')
+
+    def get(self, key):
+        value = self._backend.get(key)
+        self._record(value is not None)
+        return value
+
+    def get_many(self, *keys):
+        values = self._backend.get_many(*keys)
+        for value in values:
+            self._record(value is not None)
+        return values
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+
+def instrument_cache(app, cache):
+    """À appeler après cache.init_app(app)"""
+    backend = app.extensions['cache'][cache]
+    if not isinstance(backend, InstrumentedCache):
+        app.extensions['cache'][cache] = InstrumentedCache(backend)
+
+
+def init_metrics(app, engine_getter=None):
+    """
+    Enregistrer les hooks de mesure des requêtes et la route /metrics.
+    À appeler avant init_compression : la taille mesurée est celle envoyée au client.
+    """
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_DIR', os.environ.get('METRICS_DIR'))  # Agrégation entre workers
+    app.config.setdefault('METRICS_FLUSH_INTERVAL', 5)
+    app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))  # Bearer exigé si défini
+
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    store = None
+    if app.config['METRICS_DIR']:
+        store = MultiprocessStore(registry, app.config['METRICS_DIR'], app.config['METRICS_FLUSH_INTERVAL'])
+
+    if engine_getter is not None:
+        def collect_pool():
+            # Aussi appelé par le thread d'écriture des instantanés, hors requête
+            with app.app_context():
+                pool = engine_getter().pool
+            if hasattr(pool, 'checkedout'):
+                db_pool.set(pool.size(), state='size')
+                db_pool.set(pool.checkedout(), state='checked_out')
+                db_pool.set(pool.checkedin(), state='idle')
+                db_pool.set(max(pool.overflow(), 0), state='overflow')
+        registry.collectors.append(collect_pool)
+
+    @app.before_request
+    def start_request_metrics():
+        if store is not None:
+            store.ensure_started()
+        g.metrics_started = time.perf_counter()
+        g.metrics_endpoint = _endpoint()
+        http_in_flight.inc(endpoint=g.metrics_endpoint)
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        endpoint = g.metrics_endpoint
+        http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        http_latency.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        if not response.is_streamed and response.content_length is not None:
+            http_response_size.observe(response.content_length, endpoint=endpoint)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        endpoint = g.pop('metrics_endpoint', None)
+        if endpoint is None:
+            return
+        http_in_flight.dec(endpoint=endpoint)
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            # Exception non gérée : after_request n'a pas été appelé
+            http_requests.inc(endpoint=endpoint, method=request.method, status=500)
+            http_latency.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+
+    @app.route('/metrics')
+    def metrics():
+        token = current_app.config['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            abort(401)
+        merged = store.collect() if store is not None else merge_snapshots([registry.snapshot()], [True])
+        return Response(render(merged), mimetype='text/plain; version=0.0.4')
@@ -1,3 +1,4 @@
+import json
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -13,8 +14,14 @@ class User(db.Model):
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     phone = db.Column(db.String(20))
-    role = db.Column(db.String(20), default='client')  # client, admin, employee
+    role = db.Column(db.String(20), default='client', index=True)  # client, admin, employee
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Recherche des requêtes courtes par début de nom : LIKE est insensible à la casse, l'index aussi
+        db.Index('ix_users_last_name_nocase', db.collate(last_name, 'NOCASE')),
+        db.Index('ix_users_first_name_nocase', db.collate(first_name, 'NOCASE')),
+    )
     
     # Relations
     appointments = db.relationship('Appointment', back_populates='client', foreign_keys='Appointment.client_id')
@@ -194,6 +201,9 @@ class EmployeeHours(db.Model):
 
 class EmployeeAvailability(db.Model):
     __tablename__ = 'employee_availability'
+    __table_args__ = (
+        db.Index('ix_employee_availability_employee_date', 'employee_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=False, index=True)
@@ -216,6 +226,39 @@ class EmployeeAvailability(db.Model):
             'reason': self.reason
         }
 
+class EmployeeAvailabilityArchive(db.Model):
+    """Indisponibilités passées, déplacées hors de la table vivante par archive_past_availability"""
+    __tablename__ = 'employee_availability_archive'
+    __table_args__ = (
+        db.Index('ix_employee_availability_archive_employee_date', 'employee_id', 'date'),
+        {'sqlite_autoincrement': True},
+    )
+
+    # Clé propre à l'archive : les ids de employee_availability (sans AUTOINCREMENT)
+    # sont réutilisés par SQLite après suppression des lignes les plus récentes
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer)  # Id de la ligne dans employee_availability au moment de l'archivage
+    employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.Time, nullable=True)
+    end_time = db.Column(db.Time, nullable=True)
+    is_available = db.Column(db.Boolean, default=True)
+    reason = db.Column(db.String(100))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source_id': self.source_id,
+            'employee_id': self.employee_id,
+            'date': self.date.isoformat(),
+            'start_time': self.start_time.strftime('%H:%M') if self.start_time else None,
+            'end_time': self.end_time.strftime('%H:%M') if self.end_time else None,
+            'is_available': self.is_available,
+            'reason': self.reason,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
 class ClosedDate(db.Model):
     __tablename__ = 'closed_dates'
     
@@ -278,14 +321,102 @@ class Gallery(db.Model):
     image_url = db.Column(db.String(255), nullable=False)
     title = db.Column(db.String(100))
     display_order = db.Column(db.Integer, default=0)
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 du fichier téléversé
+    # Variantes redimensionnées : {"webp": [{"width": 320, "url": "..."}], "jpeg": [...]}
+    variants = db.Column(db.Text)
+    processing_status = db.Column(db.String(20), default='ready')  # pending, ready, failed
     
+    def get_variants(self):
+        return json.loads(self.variants) if self.variants else {}
+
+    def set_variants(self, variants):
+        self.variants = json.dumps(variants) if variants else None
+
     def to_dict(self):
         # L'URL est déjà relative, pas besoin d'ajouter le base_url ici
         image_url = self.image_url if self.image_url else None
+        variants = self.get_variants()
         return {
             'id': self.id,
             'image_url': image_url,
             'title': self.title,
-            'display_order': self.display_order
+            'display_order': self.display_order,
+            'processing_status': self.processing_status or 'ready',
+            'variants': variants,
+            'srcset': build_srcset(variants.get('webp')),
+            'srcset_fallback': build_srcset(variants.get('jpeg'))
         }
 
+def build_srcset(variants):
+    """Construire un attribut srcset à partir d'une liste de variantes"""
+    if not variants:
+        return None
+    return ', '.join(f"{v['url']} {v['width']}w" for v in variants)
+
+class ChangeLog(db.Model):
+    """Journal des modifications : l'id sert de curseur pour la synchronisation différentielle"""
+    __tablename__ = 'change_log'
+    # AUTOINCREMENT : les ids ne sont jamais réutilisés, même après une purge
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # appointment, client, employee
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # insert, update, delete
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class Job(db.Model):
+    """Tâche différée (e-mails, rappels...) exécutée par le worker `flask jobs-worker`"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # Arguments JSON
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    # Une même clé ne peut être mise en file qu'une fois (ex. rappel d'un rendez-vous)
+    idempotency_key = db.Column(db.String(200), unique=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Au-delà de cette date, une tâche 'running' est considérée abandonnée et reprise
+    locked_until = db.Column(db.DateTime)
+    locked_by = db.Column(db.String(100))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def get_payload(self):
+        return json.loads(self.payload) if self.payload else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'payload': self.get_payload(),
+            'status': self.status,
+            'idempotency_key': self.idempotency_key,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class ScheduleVersion(db.Model):
+    """Version des horaires ('business' ou 'employee:<id>'), incrémentée à chaque modification effective"""
+    __tablename__ = 'schedule_versions'
+
+    scope = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Counter(db.Model):
+    """Compteurs tenus à jour par triggers (users.client, employees, appointments.pending...)"""
+    __tablename__ = 'counters'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+
+from src.jobs import enqueue, job
+from src.mailer import send_email
+from src.models.models import db, Appointment, SalonInfo
+
+# Le rappel est envoyé la veille du rendez-vous
+REMINDER_BEFORE = timedelta(hours=24)
+
+
+def _salon_name():
+    salon = SalonInfo.query.first()
+    return salon.name if salon else 'Élégance Coiffure'
+
+
+def _describe(appointment):
+    return (
+        f"{appointment.service.name if appointment.service else 'Prestation'} le "
+        f"{appointment.appointment_date.strftime('%d/%m/%Y')} à {appointment.start_time.strftime('%H:%M')}"
+    )
+
+
+def _scheduled_for(appointment):
+    return f"{appointment.appointment_date.isoformat()}T{appointment.start_time.strftime('%H:%M')}"
+
+
+def _booked_at(appointment):
+    return appointment.created_at.isoformat() if appointment.created_at else None
+
+
+def _booking_key(appointment):
+    """
+    Identifiant d'une réservation : SQLite réattribue l'id d'un rendez-vous
+    supprimé, created_at distingue la nouvelle réservation de l'ancienne.
+    """
+    return f'{appointment.id}:{_booked_at(appointment)}'
+
+
+def _same_booking(appointment, booked_at):
+    # Tâches mises en file avant l'ajout de booked_at : rien à comparer
+    return booked_at is None or _booked_at(appointment) == booked_at
+
+
+def queue_booking_notifications(appointment):
+    """Mettre en file la confirmation et le rappel d'un rendez-vous (appeler après le flush)"""
+    booked_at = _booked_at(appointment)
+    enqueue(
+        'appointment.confirmation',
+        {'appointment_id': appointment.id, 'booked_at': booked_at},
+        idempotency_key=f'confirmation:{_booking_key(appointment)}'
+    )
+
+    # Les dates des rendez-vous sont en heure locale, celles de la file en UTC
+    starts_at = datetime.combine(appointment.appointment_date, appointment.start_time)
+    remind_at = (starts_at - REMINDER_BEFORE).astimezone(timezone.utc).replace(tzinfo=None)
+    if remind_at > datetime.utcnow():
+        scheduled_for = _scheduled_for(appointment)
+        enqueue(
+            'appointment.reminder',
+            {'appointment_id': appointment.id, 'scheduled_for': scheduled_for, 'booked_at': booked_at},
+            idempotency_key=f'reminder:{_booking_key(appointment)}:{scheduled_for}',
+            run_at=remind_at
+        )
+
+
+def queue_cancellation_notice(appointment):
+    """
+    Mettre en file l'avis d'annulation (appeler avant le flush). La clé reprend
+    updated_at d'avant l'annulation : un rendez-vous réactivé puis annulé de
+    nouveau reçoit un nouvel avis, une même annulation rejouée est ignorée.
+    """
+    version = appointment.updated_at.isoformat() if appointment.updated_at else 'initial'
+    enqueue(
+        'appointment.cancellation',
+        {'appointment_id': appointment.id, 'booked_at': _booked_at(appointment)},
+        idempotency_key=f'cancellation:{_booking_key(appointment)}:{version}'
+    )
+
+
+@job('appointment.confirmation')
+def send_confirmation(appointment_id, booked_at=None):
+    appointment = db.session.get(Appointment, appointment_id)
+    if appointment is None or appointment.client is None or not _same_booking(appointment, booked_at):
+        return
+    status = 'confirmé' if appointment.status == 'confirmed' else 'enregistré'
+    send_email(
+        appointment.client.email,
+        f'Votre rendez-vous chez {_salon_name()}',
+        f"Bonjour {appointment.client.first_name},\n\n"
+        f"Votre rendez-vous est {status} : {_describe(appointment)}.\n\n"
+        f"À bientôt,\n{_salon_name()}"
+    )
+
+
+@job('appointment.reminder')
+def send_reminder(appointment_id, scheduled_for, booked_at=None):
+    appointment = db.session.get(Appointment, appointment_id)
+    # Rendez-vous supprimé, annulé ou déplacé depuis la mise en file : rien à envoyer
+    if appointment is None or appointment.client is None or not _same_booking(appointment, booked_at):
+        return
+    if appointment.status not in ('pending', 'confirmed') or _scheduled_for(appointment) != scheduled_for:
+        return
+    send_email(
+        appointment.client.email,
+        f'Rappel : votre rendez-vous chez {_salon_name()}',
+        f"Bonjour {appointment.client.first_name},\n\n"
+        f"Nous vous rappelons votre rendez-vous : {_describe(appointment)}.\n\n"
+        f"À bientôt,\n{_salon_name()}"
+    )
+
+
+@job('appointment.cancellation')
+def send_cancellation(appointment_id, booked_at=None):
+    appointment = db.session.get(Appointment, appointment_id)
+    if appointment is None or appointment.client is None or not _same_booking(appointment, booked_at):
+        return
+    if appointment.status != 'cancelled':
+        return
+    send_email(
+        appointment.client.email,
+        f'Annulation de votre rendez-vous chez {_salon_name()}',
+        f"Bonjour {appointment.client.first_name},\n\n"
+        f"Votre rendez-vous a bien été annulé : {_describe(appointment)}.\n\n"
+        f"{_salon_name()}"
+    )
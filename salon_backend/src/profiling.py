@@ -0,0 +1,196 @@
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from src.models.models import db, User
+from src.utils.redaction import redacted_query_string
+
+# Profilage à la demande de requêtes réelles :
+# - en-tête PROFILE_HEADER (X-Profile: 1 | cprofile | sampling), réservé aux administrateurs ;
+# - ou une fraction PROFILE_SAMPLE_RATE des requêtes, tirée au hasard.
+# Chaque profil est écrit dans PROFILE_DIR (.prof pour pstats/snakeviz, ou
+# .collapsed pour flamegraph.pl/speedscope) avec ses métadonnées (.json) ;
+# seuls les PROFILE_MAX_FILES plus récents sont conservés.
+
+PROFILE_MODES = ('cprofile', 'sampling')
+PROFILE_EXTENSIONS = {'cprofile': 'prof', 'sampling': 'collapsed'}
+PROFILE_ID = re.compile(r'^[\w.-]+$')
+
+
+class StackSampler(threading.Thread):
+    """Échantillonne la pile d'un thread à intervalle régulier (piles repliées pour flamegraph)"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    def __init__(self, mode, interval):
+        self.mode = mode
+        self.started = time.perf_counter()
+        if mode == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = StackSampler(threading.get_ident(), interval)
+            self.profiler.start()
+
+    def stop(self):
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+        return (time.perf_counter() - self.started) * 1000
+
+    def save(self, path):
+        if self.mode == 'cprofile':
+            self.profiler.dump_stats(path)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.profiler.collapsed())
+
+
+def list_profiles(directory):
+    """Métadonnées des profils conservés, du plus récent au plus ancien"""
+    profiles = []
+    if not os.path.isdir(directory):
+        return profiles
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda profile: profile['id'], reverse=True)
+
+
+def profile_path(directory, profile_id):
+    """Chemin du fichier d'un profil (None si l'id est invalide ou inconnu)"""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    for extension in PROFILE_EXTENSIONS.values():
+        path = os.path.join(directory, f'{profile_id}.{extension}')
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _prune(directory, keep):
+    """Anneau borné : supprimer les profils les plus anciens au-delà de `keep`"""
+    ids = sorted(name[:-5] for name in os.listdir(directory) if name.endswith('.json'))
+    for profile_id in ids[:-keep] if keep else ids:
+        for extension in ('json', *PROFILE_EXTENSIONS.values()):
+            try:
+                os.remove(os.path.join(directory, f'{profile_id}.{extension}'))
+            except FileNotFoundError:
+                pass
+
+
+def _requested_mode(app):
+    """Mode demandé par l'en-tête, si l'appelant est administrateur"""
+    value = request.headers.get(app.config['PROFILE_HEADER'], '').strip().lower()
+    if not value or value in ('0', 'false'):
+        return None
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        return None
+    user = db.session.get(User, int(user_id)) if user_id else None
+    if not user or user.role != 'admin':
+        return None
+    return value if value in PROFILE_MODES else app.config['PROFILE_MODE']
+
+
+def init_profiling(app):
+    """Profiler les requêtes demandées (en-tête admin) ou tirées au sort, et conserver les profils sur disque"""
+    app.config.setdefault('PROFILE_DIR', os.path.join(os.path.dirname(app.root_path), 'logs', 'profiles'))
+    app.config.setdefault('PROFILE_HEADER', 'X-Profile')
+    app.config.setdefault('PROFILE_MODE', 'sampling')  # ou 'cprofile' (plus précis, plus coûteux)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)  # Part des requêtes profilées sans en-tête
+    app.config.setdefault('PROFILE_SAMPLING_INTERVAL', 0.002)  # Secondes entre deux échantillons
+    app.config.setdefault('PROFILE_MAX_FILES', 50)
+    lock = threading.Lock()
+
+    @app.before_request
+    def start_profile():
+        mode = None
+        if request.headers.get(app.config['PROFILE_HEADER']):
+            mode = _requested_mode(app)
+        elif app.config['PROFILE_SAMPLE_RATE'] and random.random() < app.config['PROFILE_SAMPLE_RATE']:
+            mode = app.config['PROFILE_MODE']
+        if mode:
+            g.request_profile = RequestProfile(mode, app.config['PROFILE_SAMPLING_INTERVAL'])
+
+    @app.after_request
+    def save_profile(response):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return response
+        duration_ms = profile.stop()
+
+        directory = app.config['PROFILE_DIR']
+        os.makedirs(directory, exist_ok=True)
+        endpoint = request.endpoint or 'none'
+        profile_id = '{}-{}'.format(datetime.utcnow().strftime('%Y%m%dT%H%M%S%f'), re.sub(r'[^\w.-]', '_', endpoint))
+        extension = PROFILE_EXTENSIONS[profile.mode]
+        profile.save(os.path.join(directory, f'{profile_id}.{extension}'))
+        with open(os.path.join(directory, f'{profile_id}.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'id': profile_id,
+                'mode': profile.mode,
+                'format': extension,
+                'endpoint': endpoint,
+                'method': request.method,
+                'path': request.path,
+                'query_string': redacted_query_string(),  # Tickets et jetons masqués
+                'status': response.status_code,
+                'duration_ms': round(duration_ms, 2),
+                'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            }, f)
+        with lock:
+            _prune(directory, app.config['PROFILE_MAX_FILES'])
+
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    @app.teardown_request
+    def stop_abandoned_profile(exc):
+        # Exception non gérée : arrêter le profileur sans rien écrire
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            profile.stop()
@@ -0,0 +1,141 @@
+from sqlalchemy import and_, lambda_stmt, or_, select
+from sqlalchemy.orm import joinedload
+
+from src.models.models import db, Appointment, Employee, EmployeeAvailability, EmployeeHours, employee_services
+
+# Accès aux données partagé par les routes.
+#
+# Lecture par clé primaire : Session.get consulte d'abord l'identity map, un objet
+# déjà chargé pendant la requête ne coûte donc aucun SELECT.
+#
+# Politique d'expiration : par défaut, le commit expire tous les objets de la
+# session et le moindre attribut lu ensuite relance un SELECT. Les écritures
+# faites par l'ORM (add, modification d'attributs) n'ont pas besoin de cette
+# relecture : la clé primaire et les valeurs par défaut côté Python (created_at,
+# updated_at) sont renseignées sur l'instance au flush. Elles valident donc avec
+# commit_without_expiry(). Après une écriture hors ORM (update()/delete() groupés,
+# déclencheurs, src.schedule), garder db.session.commit() ou rafraîchir
+# explicitement avec db.session.refresh(objet).
+#
+# Requêtes critiques (disponibilités, conflits, listes de rendez-vous) : écrites
+# une seule fois ici, en lambda_stmt. SQLAlchemy met en cache la construction et
+# la compilation de chaque lambda d'après son code ; les variables capturées
+# (ids, dates, heures) deviennent des paramètres liés à chaque appel.
+
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+# Relations lues par Appointment.to_dict()
+APPOINTMENT_DETAILS = (
+    joinedload(Appointment.client),
+    joinedload(Appointment.employee).joinedload(Employee.user),
+    joinedload(Appointment.service),
+)
+
+
+def load_appointment(appointment_id, details=False):
+    """Rendez-vous par clé primaire ; `details` charge dans la même requête tout ce qu'utilise to_dict()"""
+    return db.session.get(Appointment, appointment_id, options=APPOINTMENT_DETAILS if details else None)
+
+
+def commit_without_expiry():
+    """
+    Valider la transaction sans expirer les objets de la session : la réponse est
+    construite à partir des instances écrites, sans les relire (voir la politique ci-dessus).
+    """
+    session = db.session()
+    previous = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = previous
+
+
+# ===== DISPONIBILITÉS =====
+
+def find_conflicting_appointment(employee_id, day, start_time, end_time):
+    """Id d'un rendez-vous actif de l'employé qui chevauche le créneau, ou None"""
+    statement = lambda_stmt(lambda: select(Appointment.id).where(
+        Appointment.employee_id == employee_id,
+        Appointment.appointment_date == day,
+        Appointment.status.in_(ACTIVE_STATUSES),
+        or_(
+            and_(Appointment.start_time <= start_time, Appointment.end_time > start_time),
+            and_(Appointment.start_time < end_time, Appointment.end_time >= end_time),
+            and_(Appointment.start_time >= start_time, Appointment.end_time <= end_time)
+        )
+    ).limit(1))
+    return db.session.execute(statement).scalar()
+
+
+def employee_working_hours(employee_id, day_of_week):
+    """Plages de travail (start_time, end_time) de l'employé pour un jour de la semaine"""
+    statement = lambda_stmt(lambda: select(EmployeeHours.start_time, EmployeeHours.end_time).where(
+        EmployeeHours.employee_id == employee_id,
+        EmployeeHours.day_of_week == day_of_week
+    ))
+    return db.session.execute(statement).all()
+
+
+def employee_unavailabilities(employee_id, day):
+    """Indisponibilités (start_time, end_time) de l'employé ce jour-là ; sans heures = toute la journée"""
+    statement = lambda_stmt(lambda: select(EmployeeAvailability.start_time, EmployeeAvailability.end_time).where(
+        EmployeeAvailability.employee_id == employee_id,
+        EmployeeAvailability.date == day
+    ))
+    return db.session.execute(statement).all()
+
+
+def booked_slots(employee_id, day):
+    """Créneaux (start_time, end_time) des rendez-vous actifs de l'employé ce jour-là"""
+    statement = lambda_stmt(lambda: select(Appointment.start_time, Appointment.end_time).where(
+        Appointment.employee_id == employee_id,
+        Appointment.appointment_date == day,
+        Appointment.status.in_(ACTIVE_STATUSES)
+    ))
+    return db.session.execute(statement).all()
+
+
+def employee_ids_for_service(service_id):
+    """Ids des employés qui réalisent le service"""
+    statement = lambda_stmt(lambda: select(Employee.id)
+                            .join(employee_services, employee_services.c.employee_id == Employee.id)
+                            .where(employee_services.c.service_id == service_id))
+    return db.session.execute(statement).scalars().all()
+
+
+# ===== LISTES DE RENDEZ-VOUS =====
+# Relations chargées par jointure : to_dict() ne relance aucune requête par rendez-vous
+
+def list_appointments(day=None, employee_id=None, status=None):
+    """Rendez-vous filtrés (liste admin), du plus récent au plus ancien"""
+    statement = lambda_stmt(lambda: select(Appointment).options(*APPOINTMENT_DETAILS))
+    # Chaque combinaison de filtres a sa propre entrée dans le cache
+    if day:
+        statement += lambda s: s.where(Appointment.appointment_date == day)
+    if employee_id:
+        statement += lambda s: s.where(Appointment.employee_id == employee_id)
+    if status:
+        statement += lambda s: s.where(Appointment.status == status)
+    statement += lambda s: s.order_by(Appointment.appointment_date.desc(), Appointment.start_time.desc())
+    return db.session.execute(statement).scalars().all()
+
+
+def list_client_appointments(client_id, status=None):
+    """Rendez-vous d'un client, du plus récent au plus ancien"""
+    statement = lambda_stmt(lambda: select(Appointment).options(*APPOINTMENT_DETAILS)
+                            .where(Appointment.client_id == client_id))
+    if status:
+        statement += lambda s: s.where(Appointment.status == status)
+    statement += lambda s: s.order_by(Appointment.appointment_date.desc(), Appointment.start_time.desc())
+    return db.session.execute(statement).scalars().all()
+
+
+def list_employee_appointments(employee_id, start_date, end_date):
+    """Rendez-vous d'un employé sur une période, dans l'ordre chronologique"""
+    statement = lambda_stmt(lambda: select(Appointment).options(*APPOINTMENT_DETAILS).where(
+        Appointment.employee_id == employee_id,
+        Appointment.appointment_date >= start_date,
+        Appointment.appointment_date <= end_date
+    ).order_by(Appointment.appointment_date, Appointment.start_time))
+    return db.session.execute(statement).scalars().all()
@@ -1,11 +1,22 @@
 import os
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, date, timedelta
-from src.models.models import db, User, Employee, Service, Appointment, BusinessHours, EmployeeHours, ClosedDate, Gallery, employee_services, EmployeeAvailability
+from src.models.models import db, User, Employee, Service, Appointment, BusinessHours, EmployeeHours, ClosedDate, Gallery, employee_services, EmployeeAvailability, EmployeeAvailabilityArchive
 from datetime import time
 from werkzeug.utils import secure_filename
 from src.cache import cache
+from src.images import InvalidImageError, validate_image, schedule_gallery_processing, find_processed_duplicate
+from src.uploads import HashingUploadFile
+from src.changes import current_cursor, pruned_cursor, load_changes, record_changes
+from src.notifications import queue_booking_notifications, queue_cancellation_notice
+from src.repository import load_appointment, commit_without_expiry, find_conflicting_appointment, list_appointments, list_employee_appointments
+from src.employee_services import assigned_service_ids, invalidate_service_caches, sync_employee_services
+from src.search import search_clients
+from src.counters import get_counters
+from src.schedule import parse_working_hours, sync_business_hours, sync_employee_hours
+from src.events import appointment_event_data, get_broker, issue_events_ticket, publish_event, publish_appointment_event, read_events_ticket, stream_events
+from src.profiling import list_profiles, profile_path
 
 
 def clear_gallery_cache():
@@ -22,13 +33,39 @@ def clear_gallery_cache():
 
 admin_bp = Blueprint('admin', __name__)
 
+# Durée de validité (secondes) du jeton d'ouverture du flux d'événements
+EVENTS_TICKET_LIFETIME = 60
+
 def is_admin():
     """Vérifier si l'utilisateur est admin"""
     user_id = get_jwt_identity()
     # Convertir l'ID de string en integer car JWT retourne un string
-    user = User.query.get(int(user_id))
+    user = db.session.get(User, int(user_id))
     return user and user.role == 'admin'
 
+def with_change_cursor(response, cursor):
+    """Joindre à une liste le curseur du journal lu avant la requête, pour /changes"""
+    response.headers['X-Change-Cursor'] = str(cursor)
+    return response
+
+def unavailability_dict(unav, archived=False):
+    """
+    Indisponibilité vivante ou archivée. Une ligne archivée n'expose pas d'id : celui de
+    l'archive ne désigne aucune ligne de employee_availability (DELETE /availability/<id>),
+    seulement source_id, l'id qu'elle avait avant l'archivage.
+    """
+    data = {'id': unav.id} if not archived else {'source_id': unav.source_id}
+    data.update({
+        'archived': archived,
+        'employee_id': unav.employee_id,
+        'date': unav.date.isoformat(),
+        'start_time': unav.start_time.strftime('%H:%M') if unav.start_time else None,
+        'end_time': unav.end_time.strftime('%H:%M') if unav.end_time else None,
+        'is_available': unav.is_available,
+        'reason': unav.reason
+    })
+    return data
+
 # ===== GESTION DES SERVICES =====
 
 @admin_bp.route('/services', methods=['GET'])
@@ -42,6 +79,7 @@ def get_all_services():
         services = Service.query.all()
         return jsonify([service.to_dict() for service in services]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/services', methods=['POST'])
@@ -74,6 +112,7 @@ def create_service():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/services/<int:service_id>', methods=['PUT'])
@@ -84,7 +123,7 @@ def update_service(service_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        service = Service.query.get(service_id)
+        service = db.session.get(Service, service_id)
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
         
@@ -106,6 +145,7 @@ def update_service(service_id):
             service.is_active = data['is_active']
         
         db.session.commit()
+        invalidate_service_caches({service_id})
         
         return jsonify({
             'message': 'Service mis à jour',
@@ -114,6 +154,7 @@ def update_service(service_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/services/<int:service_id>', methods=['DELETE'])
@@ -124,17 +165,19 @@ def delete_service(service_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        service = Service.query.get(service_id)
+        service = db.session.get(Service, service_id)
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
         
         db.session.delete(service)
         db.session.commit()
+        invalidate_service_caches({service_id})
         
         return jsonify({'message': 'Service supprimé'}), 200
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 # ===== GESTION DES CLIENTS =====
@@ -147,9 +190,34 @@ def get_all_clients():
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        clients = User.query.filter_by(role='client').all()
-        return jsonify([client.to_dict() for client in clients]), 200
+        cursor = current_cursor()
+        search = request.args.get('q', '').strip()
+        page = request.args.get('page', type=int)
+
+        if not search and not page:
+            clients = User.query.filter_by(role='client').all()
+            return with_change_cursor(jsonify([client.to_dict() for client in clients]), cursor), 200
+
+        # Recherche (index client_search) et pagination côté serveur
+        page = max(page or 1, 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+        if search:
+            ids, total = search_clients(db.session, search, page=page, per_page=per_page)
+            by_id = {client.id: client for client in User.query.filter(User.id.in_(ids)).all()} if ids else {}
+            clients = [by_id[i] for i in ids if i in by_id]
+        else:
+            pagination = User.query.filter_by(role='client').order_by(
+                User.last_name, User.first_name, User.id
+            ).paginate(page=page, per_page=per_page, error_out=False)
+            clients, total = pagination.items, pagination.total
+
+        response = with_change_cursor(jsonify([client.to_dict() for client in clients]), cursor)
+        response.headers['X-Total-Count'] = str(total)
+        response.headers['X-Page'] = str(page)
+        response.headers['X-Per-Page'] = str(per_page)
+        return response, 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/clients', methods=['POST'])
@@ -185,6 +253,7 @@ def create_client():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/clients/<int:client_id>', methods=['PUT'])
@@ -224,6 +293,7 @@ def update_client(client_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/clients/<int:client_id>', methods=['DELETE'])
@@ -245,6 +315,7 @@ def delete_client(client_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 # ===== GESTION DES EMPLOYÉS =====
@@ -257,9 +328,11 @@ def get_all_employees():
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
+        cursor = current_cursor()
         employees = Employee.query.all()
-        return jsonify([emp.to_dict() for emp in employees]), 200
+        return with_change_cursor(jsonify([emp.to_dict() for emp in employees]), cursor), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/employees', methods=['POST'])
@@ -299,14 +372,13 @@ def create_employee():
         db.session.add(employee)
         db.session.flush()
         
-        # Assigner les services
+        # Assigner les services (une requête IN et un INSERT groupé)
+        assigned = set()
         if 'service_ids' in data:
-            for service_id in data['service_ids']:
-                service = Service.query.get(service_id)
-                if service:
-                    employee.services.append(service)
+            assigned = sync_employee_services(employee.id, data['service_ids'], is_new=True)
         
         db.session.commit()
+        invalidate_service_caches(assigned)
         
         return jsonify({
             'message': 'Employé créé',
@@ -315,6 +387,7 @@ def create_employee():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/employees/<int:employee_id>', methods=['PUT'])
@@ -325,7 +398,7 @@ def update_employee(employee_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
@@ -356,15 +429,16 @@ def update_employee(employee_id):
         if 'is_active' in data:
             employee.is_active = data['is_active']
         
-        # Mettre à jour les services
+        # Mettre à jour les services : seuls les ajouts et retraits sont écrits
+        affected = set()
         if 'service_ids' in data:
-            employee.services = []
-            for service_id in data['service_ids']:
-                service = Service.query.get(service_id)
-                if service:
-                    employee.services.append(service)
+            affected = sync_employee_services(employee_id, data['service_ids'])
         
         db.session.commit()
+        if set(data) - {'service_ids'}:
+            # Nom, photo, statut... figurent aussi dans les listes d'employés par service
+            affected |= assigned_service_ids(employee_id)
+        invalidate_service_caches(affected)
         
         return jsonify({
             'message': 'Employé mis à jour',
@@ -373,6 +447,7 @@ def update_employee(employee_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/employees/<int:employee_id>', methods=['DELETE'])
@@ -383,21 +458,26 @@ def delete_employee(employee_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
-        # Supprimer l'utilisateur associé
-        if employee.user:
-            db.session.delete(employee.user)
+        service_ids = assigned_service_ids(employee_id)
+        user = employee.user
         
+        # Supprimer l'employé avant son utilisateur : sinon le chargement des horaires
+        # (cascade) déclenche un autoflush qui tente de vider employees.user_id
         db.session.delete(employee)
+        if user:
+            db.session.delete(user)
         db.session.commit()
+        invalidate_service_caches(service_ids)
         
         return jsonify({'message': 'Employé supprimé'}), 200
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 # ===== GESTION DES RENDEZ-VOUS =====
@@ -410,13 +490,14 @@ def get_employee_working_hours(employee_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
         hours = EmployeeHours.query.filter_by(employee_id=employee_id).order_by(EmployeeHours.day_of_week).all()
         return jsonify([h.to_dict() for h in hours]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/employees/<int:employee_id>/hours', methods=['PUT'])
@@ -427,15 +508,12 @@ def update_employee_working_hours(employee_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
         data = request.get_json()
         
-        # Supprimer les horaires existants pour cet employé
-        EmployeeHours.query.filter_by(employee_id=employee_id).delete()
-        
         new_hours = []
         for hour_data in data:
             day_of_week = hour_data.get('day_of_week')
@@ -453,19 +531,17 @@ def update_employee_working_hours(employee_id):
                 # Gérer le cas où les chaînes sont vides ou nulles après la première vérification
                 continue
             
-            new_hour = EmployeeHours(
-                employee_id=employee_id,
-                day_of_week=day_of_week,
-                start_time=start_time,
-                end_time=end_time
-            )
-            db.session.add(new_hour)
-            new_hours.append(new_hour)
-            
+            new_hours.append({'day_of_week': day_of_week, 'start_time': start_time, 'end_time': end_time})
+
+        # Seules les lignes qui diffèrent des horaires enregistrés sont écrites
+        sync_employee_hours({employee_id: new_hours})
         db.session.commit()
-        return jsonify([h.to_dict() for h in new_hours]), 200
+
+        hours = EmployeeHours.query.filter_by(employee_id=employee_id).order_by(EmployeeHours.day_of_week).all()
+        return jsonify([h.to_dict() for h in hours]), 200
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/appointments', methods=['GET'])
@@ -481,23 +557,15 @@ def get_all_appointments():
         employee_id = request.args.get('employee_id', type=int)
         status = request.args.get('status')
         
-        query = Appointment.query
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else None
         
-        if date_str:
-            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            query = query.filter_by(appointment_date=target_date)
+        cursor = current_cursor()
+        appointments = list_appointments(target_date, employee_id, status)
         
-        if employee_id:
-            query = query.filter_by(employee_id=employee_id)
-        
-        if status:
-            query = query.filter_by(status=status)
-        
-        appointments = query.order_by(Appointment.appointment_date.desc(), Appointment.start_time.desc()).all()
-        
-        return jsonify([apt.to_dict() for apt in appointments]), 200
+        return with_change_cursor(jsonify([apt.to_dict() for apt in appointments]), cursor), 200
         
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/appointments/<int:appointment_id>/status', methods=['PUT'])
@@ -508,16 +576,21 @@ def update_appointment_status(appointment_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        appointment = Appointment.query.get(appointment_id)
+        appointment = load_appointment(appointment_id, details=True)
         if not appointment:
             return jsonify({'error': 'Rendez-vous non trouvé'}), 404
         
         data = request.get_json()
         
+        previous_status = appointment.status
         if 'status' in data:
             appointment.status = data['status']
+        if appointment.status == 'cancelled' and previous_status != 'cancelled':
+            queue_cancellation_notice(appointment)
         
-        db.session.commit()
+        commit_without_expiry()
+        if appointment.status != previous_status:
+            publish_appointment_event('cancelled' if appointment.status == 'cancelled' else 'status_changed', appointment)
         
         return jsonify({
             'message': 'Statut mis à jour',
@@ -526,6 +599,7 @@ def update_appointment_status(appointment_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/employee-appointments/<int:employee_id>', methods=['GET'])
@@ -545,15 +619,125 @@ def get_employee_appointments(employee_id):
         start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
 
-        appointments = Appointment.query.filter(
-            Appointment.employee_id == employee_id,
-            Appointment.appointment_date >= start_date,
-            Appointment.appointment_date <= end_date
-        ).order_by(Appointment.appointment_date, Appointment.start_time).all()
+        appointments = list_employee_appointments(employee_id, start_date, end_date)
 
         return jsonify([apt.to_dict() for apt in appointments]), 200
 
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/calendar', methods=['GET'])
+@jwt_required()
+def get_calendar():
+    """
+    Agenda de tous les employés sur une période : horaires, rendez-vous et
+    indisponibilités regroupés par date, en quelques requêtes groupées (admin)
+    """
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    try:
+        start_str = request.args.get('start')
+        end_str = request.args.get('end')
+        employee_id = request.args.get('employee_id', type=int)
+
+        if not start_str or not end_str:
+            return jsonify({'error': 'Les paramètres start et end sont requis'}), 400
+
+        try:
+            start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Format de date invalide. Utilisez YYYY-MM-DD'}), 400
+
+        if end_date < start_date:
+            return jsonify({'error': 'La date de fin doit être postérieure à la date de début'}), 400
+        if (end_date - start_date).days > 92:
+            return jsonify({'error': 'La période ne peut pas dépasser 92 jours'}), 400
+
+        employees_query = Employee.query.options(db.joinedload(Employee.user)).filter(Employee.is_active == True)
+        if employee_id:
+            employees_query = employees_query.filter(Employee.id == employee_id)
+        employees = employees_query.all()
+        employee_ids = [emp.id for emp in employees]
+
+        calendar = {}
+        for emp in employees:
+            calendar[emp.id] = {
+                'id': emp.id,
+                'first_name': emp.user.first_name if emp.user else None,
+                'last_name': emp.user.last_name if emp.user else None,
+                'working_hours': [],
+                'days': {}
+            }
+
+        def day_bucket(emp_id, day):
+            return calendar[emp_id]['days'].setdefault(day.isoformat(), {'appointments': [], 'unavailabilities': []})
+
+        if employee_ids:
+            hours = EmployeeHours.query.filter(
+                EmployeeHours.employee_id.in_(employee_ids)
+            ).order_by(EmployeeHours.employee_id, EmployeeHours.day_of_week).all()
+            for h in hours:
+                calendar[h.employee_id]['working_hours'].append({
+                    'day_of_week': h.day_of_week,
+                    'start_time': h.start_time.strftime('%H:%M') if h.start_time else None,
+                    'end_time': h.end_time.strftime('%H:%M') if h.end_time else None
+                })
+
+            # Seules les indisponibilités de la période sont chargées
+            unavailabilities = [(unav, False) for unav in EmployeeAvailability.query.filter(
+                EmployeeAvailability.employee_id.in_(employee_ids),
+                EmployeeAvailability.date >= start_date,
+                EmployeeAvailability.date <= end_date
+            ).all()]
+            if start_date < date.today():
+                # Les périodes passées ont pu être déplacées dans la table d'archive
+                unavailabilities += [(unav, True) for unav in EmployeeAvailabilityArchive.query.filter(
+                    EmployeeAvailabilityArchive.employee_id.in_(employee_ids),
+                    EmployeeAvailabilityArchive.date >= start_date,
+                    EmployeeAvailabilityArchive.date <= end_date
+                ).all()]
+            for unav, archived in unavailabilities:
+                day_bucket(unav.employee_id, unav.date)['unavailabilities'].append(unavailability_dict(unav, archived))
+
+            appointments = Appointment.query.options(
+                db.joinedload(Appointment.client),
+                db.joinedload(Appointment.service)
+            ).filter(
+                Appointment.employee_id.in_(employee_ids),
+                Appointment.appointment_date >= start_date,
+                Appointment.appointment_date <= end_date
+            ).order_by(Appointment.appointment_date, Appointment.start_time).all()
+            for apt in appointments:
+                day_bucket(apt.employee_id, apt.appointment_date)['appointments'].append({
+                    'id': apt.id,
+                    'client_id': apt.client_id,
+                    'client_name': f"{apt.client.first_name} {apt.client.last_name}" if apt.client else None,
+                    'service_id': apt.service_id,
+                    'service_name': apt.service.name if apt.service else None,
+                    'service_duration': apt.service.duration if apt.service else None,
+                    'start_time': apt.start_time.strftime('%H:%M'),
+                    'end_time': apt.end_time.strftime('%H:%M'),
+                    'status': apt.status,
+                    'notes': apt.notes
+                })
+
+        closed_dates = ClosedDate.query.filter(
+            ClosedDate.date >= start_date,
+            ClosedDate.date <= end_date
+        ).order_by(ClosedDate.date).all()
+
+        return jsonify({
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'employees': list(calendar.values()),
+            'closed_dates': [cd.to_dict() for cd in closed_dates]
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/appointments', methods=['POST'])
@@ -567,17 +751,17 @@ def admin_create_appointment():
         data = request.get_json()
         
         # Vérifier que le client existe
-        client = User.query.get(data.get('client_id'))
+        client = db.session.get(User, data.get('client_id'))
         if not client or client.role != 'client':
             return jsonify({'error': 'Client non trouvé ou rôle incorrect'}), 404
 
         # Vérifier que le service existe
-        service = Service.query.get(data.get('service_id'))
+        service = db.session.get(Service, data.get('service_id'))
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
         
         # Vérifier que l'employé existe
-        employee = Employee.query.get(data.get('employee_id'))
+        employee = db.session.get(Employee, data.get('employee_id'))
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
@@ -591,25 +775,16 @@ def admin_create_appointment():
         end_time = end_datetime.time()
         
         # Vérifier les conflits de rendez-vous
-        conflicts = Appointment.query.filter(
-            Appointment.employee_id == data['employee_id'],
-            Appointment.appointment_date == appointment_date,
-            Appointment.status.in_(['pending', 'confirmed']),
-            db.or_(
-                db.and_(Appointment.start_time <= start_time, Appointment.end_time > start_time),
-                db.and_(Appointment.start_time < end_time, Appointment.end_time >= end_time),
-                db.and_(Appointment.start_time >= start_time, Appointment.end_time <= end_time)
-            )
-        ).first()
+        conflicts = find_conflicting_appointment(employee.id, appointment_date, start_time, end_time)
         
         if conflicts:
             return jsonify({'error': 'Ce créneau n\'est pas disponible pour cet employé'}), 400
         
         # Créer le rendez-vous
         appointment = Appointment(
-            client_id=data['client_id'],
-            employee_id=data['employee_id'],
-            service_id=data['service_id'],
+            client_id=client.id,
+            employee_id=employee.id,
+            service_id=service.id,
             appointment_date=appointment_date,
             start_time=start_time,
             end_time=end_time,
@@ -618,7 +793,10 @@ def admin_create_appointment():
         )
         
         db.session.add(appointment)
-        db.session.commit()
+        db.session.flush()
+        queue_booking_notifications(appointment)
+        commit_without_expiry()
+        publish_appointment_event('created', appointment)
         
         return jsonify({
             'message': 'Rendez-vous créé avec succès',
@@ -627,6 +805,7 @@ def admin_create_appointment():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/appointments/<int:appointment_id>', methods=['DELETE'])
@@ -637,17 +816,231 @@ def delete_appointment(appointment_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        appointment = Appointment.query.get(appointment_id)
+        appointment = db.session.get(Appointment, appointment_id)
         if not appointment:
             return jsonify({'error': 'Rendez-vous non trouvé'}), 404
         
+        event = appointment_event_data('deleted', appointment)
         db.session.delete(appointment)
         db.session.commit()
+        publish_event('appointment', event)
         
         return jsonify({'message': 'Rendez-vous supprimé avec succès'}), 200
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
+        return jsonify({'error': str(e)}), 500
+
+
+# ===== OPÉRATIONS GROUPÉES =====
+
+# Nombre maximal d'éléments traités par requête (une seule clause IN)
+BATCH_MAX_ITEMS = 500
+
+APPOINTMENT_STATUSES = ('pending', 'confirmed', 'completed', 'cancelled')
+
+def select_batch_appointments(data):
+    """
+    Résoudre la cible d'une opération groupée : une liste d'ids ou un filtre
+    (date, employee_id, status). Retourne (lignes trouvées, ids introuvables).
+    """
+    columns = (Appointment.id, Appointment.employee_id, Appointment.appointment_date, Appointment.status,
+               Appointment.created_at, Appointment.updated_at)
+
+    if 'ids' in data:
+        ids = list(dict.fromkeys(int(i) for i in data['ids']))
+        if len(ids) > BATCH_MAX_ITEMS:
+            raise ValueError(f'{BATCH_MAX_ITEMS} rendez-vous au maximum par requête')
+        rows = db.session.execute(db.select(*columns).where(Appointment.id.in_(ids))).all() if ids else []
+        found = {row.id for row in rows}
+        return rows, [i for i in ids if i not in found]
+
+    filters = data.get('filter') or {}
+    conditions = []
+    if filters.get('date'):
+        conditions.append(Appointment.appointment_date == datetime.strptime(filters['date'], '%Y-%m-%d').date())
+    if filters.get('employee_id'):
+        conditions.append(Appointment.employee_id == int(filters['employee_id']))
+    if filters.get('status'):
+        conditions.append(Appointment.status == filters['status'])
+    if not conditions:
+        # Jamais de modification de toute la table par inadvertance
+        raise ValueError('Indiquer des ids ou au moins un critère de filtre')
+
+    rows = db.session.execute(
+        db.select(*columns).where(*conditions).order_by(Appointment.id).limit(BATCH_MAX_ITEMS + 1)
+    ).all()
+    if len(rows) > BATCH_MAX_ITEMS:
+        raise ValueError(f'{BATCH_MAX_ITEMS} rendez-vous au maximum par requête')
+    return rows, []
+
+def appointment_row_event(action, row, status=None):
+    return {
+        'action': action,
+        'id': row.id,
+        'employee_id': row.employee_id,
+        'appointment_date': row.appointment_date.isoformat() if row.appointment_date else None,
+        'status': status or row.status,
+    }
+
+@admin_bp.route('/appointments/batch/status', methods=['POST'])
+@jwt_required()
+def batch_update_appointment_status():
+    """Changer le statut de plusieurs rendez-vous en une transaction (ex. tout marquer terminé)"""
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    try:
+        data = request.get_json() or {}
+        status = data.get('status')
+        if status not in APPOINTMENT_STATUSES:
+            return jsonify({'error': 'Statut invalide'}), 400
+
+        try:
+            rows, missing = select_batch_appointments(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        changed = [row for row in rows if row.status != status]
+        changed_ids = [row.id for row in changed]
+
+        if changed_ids:
+            # Un seul UPDATE ... WHERE id IN (...), hors ORM : journaliser explicitement
+            db.session.execute(
+                db.update(Appointment)
+                .where(Appointment.id.in_(changed_ids))
+                .values(status=status, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            record_changes(db.session.connection(), 'appointment', changed_ids, 'update')
+            if status == 'cancelled':
+                for row in changed:
+                    queue_cancellation_notice(row)
+        db.session.commit()
+
+        action = 'cancelled' if status == 'cancelled' else 'status_changed'
+        for row in changed:
+            publish_event('appointment', appointment_row_event(action, row, status))
+
+        results = [{'id': row.id, 'ok': True, 'changed': row.status != status} for row in rows]
+        results.extend({'id': i, 'ok': False, 'error': 'Rendez-vous non trouvé'} for i in missing)
+
+        return jsonify({
+            'message': f'{len(changed_ids)} rendez-vous mis à jour',
+            'updated': len(changed_ids),
+            'results': results
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/appointments/batch/delete', methods=['POST'])
+@jwt_required()
+def batch_delete_appointments():
+    """Supprimer plusieurs rendez-vous en une transaction"""
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    try:
+        data = request.get_json() or {}
+        try:
+            rows, missing = select_batch_appointments(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        ids = [row.id for row in rows]
+        if ids:
+            db.session.execute(
+                db.delete(Appointment)
+                .where(Appointment.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            record_changes(db.session.connection(), 'appointment', ids, 'delete')
+        db.session.commit()
+
+        for row in rows:
+            publish_event('appointment', appointment_row_event('deleted', row))
+
+        results = [{'id': i, 'ok': True} for i in ids]
+        results.extend({'id': i, 'ok': False, 'error': 'Rendez-vous non trouvé'} for i in missing)
+
+        return jsonify({
+            'message': f'{len(ids)} rendez-vous supprimé(s)',
+            'deleted': len(ids),
+            'results': results
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/employees/hours/batch', methods=['PUT'])
+@jwt_required()
+def batch_update_employee_hours():
+    """
+    Remplacer les horaires de plusieurs employés en une transaction.
+    Corps : {"items": [{"employee_id", "hours": [...]}, ...]}
+    ou {"employee_ids": [...], "hours": [...]} pour appliquer la même semaine à tous.
+    """
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    try:
+        data = request.get_json() or {}
+        if 'employee_ids' in data:
+            items = [{'employee_id': i, 'hours': data.get('hours', [])} for i in data['employee_ids']]
+        else:
+            items = data.get('items', [])
+        if len(items) > BATCH_MAX_ITEMS:
+            return jsonify({'error': f'{BATCH_MAX_ITEMS} employés au maximum par requête'}), 400
+
+        requested_ids = []
+        for item in items:
+            try:
+                requested_ids.append(int(item.get('employee_id')))
+            except (TypeError, ValueError):
+                requested_ids.append(None)
+        existing = set(db.session.execute(
+            db.select(Employee.id).where(Employee.id.in_([i for i in requested_ids if i is not None]))
+        ).scalars())
+
+        results = []
+        valid = {}
+        for item, employee_id in zip(items, requested_ids):
+            if employee_id is None:
+                results.append({'employee_id': item.get('employee_id'), 'ok': False, 'status': 400,
+                                'error': "Identifiant d'employé invalide"})
+                continue
+            if employee_id not in existing:
+                results.append({'employee_id': employee_id, 'ok': False, 'status': 404, 'error': 'Employé non trouvé'})
+                continue
+            try:
+                valid[employee_id] = parse_working_hours(item.get('hours') or [])
+            except (TypeError, ValueError) as e:
+                results.append({'employee_id': employee_id, 'ok': False, 'status': 400, 'error': str(e)})
+                continue
+            results.append({'employee_id': employee_id, 'ok': True, 'days': len(valid[employee_id])})
+
+        changed = sync_employee_hours(valid)
+        db.session.commit()
+
+        for result in results:
+            if result['ok']:
+                result['changed'] = result['employee_id'] in changed
+
+        return jsonify({
+            'message': f'Horaires mis à jour pour {len(valid)} employé(s)',
+            'updated': len(valid),
+            'results': results
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 
@@ -664,6 +1057,7 @@ def get_business_hours():
         hours = BusinessHours.query.order_by(BusinessHours.day_of_week).all()
         return jsonify([h.to_dict() for h in hours]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/business-hours', methods=['PUT'])
@@ -676,27 +1070,18 @@ def update_business_hours():
     try:
         data = request.get_json()
         
-        for day_data in data.get('hours', []):
-            day_of_week = day_data['day_of_week']
-            hours = BusinessHours.query.filter_by(day_of_week=day_of_week).first()
-            
-            if not hours:
-                hours = BusinessHours(day_of_week=day_of_week)
-                db.session.add(hours)
-            
-            if 'open_time' in day_data:
-                hours.open_time = datetime.strptime(day_data['open_time'], '%H:%M').time() if day_data['open_time'] else None
-            if 'close_time' in day_data:
-                hours.close_time = datetime.strptime(day_data['close_time'], '%H:%M').time() if day_data['close_time'] else None
-            if 'is_closed' in day_data:
-                hours.is_closed = day_data['is_closed']
-        
+        # Un seul SELECT, puis écriture groupée des seuls jours modifiés
+        try:
+            sync_business_hours(data.get('hours', []))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
         db.session.commit()
         
         return jsonify({'message': 'Horaires mis à jour'}), 200
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/closed-dates', methods=['GET'])
@@ -710,6 +1095,7 @@ def get_closed_dates():
         closed_dates = ClosedDate.query.order_by(ClosedDate.date).all()
         return jsonify([cd.to_dict() for cd in closed_dates]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/closed-dates', methods=['POST'])
@@ -737,6 +1123,7 @@ def add_closed_date():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/closed-dates/<int:closed_date_id>', methods=['DELETE'])
@@ -747,7 +1134,7 @@ def delete_closed_date(closed_date_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        closed_date = ClosedDate.query.get(closed_date_id)
+        closed_date = db.session.get(ClosedDate, closed_date_id)
         if not closed_date:
             return jsonify({'error': 'Date non trouvée'}), 404
         
@@ -758,6 +1145,7 @@ def delete_closed_date(closed_date_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 # ===== STATISTIQUES =====
@@ -791,8 +1179,9 @@ def get_stats():
         
         month_revenue = float(month_revenue_query) if month_revenue_query else 0
         
-        # Nombre total de clients
-        total_clients = User.query.filter_by(role='client').count()
+        # Nombre total de clients et répartition par statut : lectures de compteurs, sans parcours de table
+        counters = get_counters('users.client', 'employees', *(f'appointments.{status}' for status in APPOINTMENT_STATUSES))
+        total_clients = counters['users.client']
         
         # Taux d'occupation (simplifié)
         total_slots = 50  # Exemple
@@ -804,12 +1193,106 @@ def get_stats():
             'month_appointments': month_appointments,
             'month_revenue': month_revenue,
             'total_clients': total_clients,
+            'total_employees': counters['employees'],
+            'appointments_by_status': {status: counters[f'appointments.{status}'] for status in APPOINTMENT_STATUSES},
             'occupation_rate': round(occupation_rate, 2)
         }), 200
         
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
+# ===== SYNCHRONISATION DIFFÉRENTIELLE =====
+
+@admin_bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """Rendez-vous, clients et employés modifiés depuis un curseur donné"""
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    try:
+        since = request.args.get('since', type=int)
+        limit = min(max(request.args.get('limit', 500, type=int), 1), 1000)
+
+        if since is None:
+            # Pas de curseur : on renvoie seulement la position courante
+            return jsonify({'cursor': current_cursor(), 'has_more': False, 'changes': None}), 200
+
+        # Journal purgé depuis ce curseur, ou curseur inconnu (au-delà du dernier attribué) :
+        # le client doit tout recharger
+        if since < pruned_cursor() or since > current_cursor():
+            return jsonify({'error': 'Curseur expiré, rechargement complet nécessaire', 'resync': True}), 410
+
+        return jsonify(load_changes(since, limit=limit)), 200
+
+    except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/events/ticket', methods=['POST'])
+@jwt_required()
+def get_events_ticket():
+    """Jeton de courte durée pour ouvrir le flux d'événements (EventSource ne peut pas envoyer d'en-tête Authorization)"""
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    ticket = issue_events_ticket(get_jwt_identity())
+    return jsonify({'ticket': ticket, 'expires_in': EVENTS_TICKET_LIFETIME}), 200
+
+@admin_bp.route('/events', methods=['GET'])
+def stream_admin_events():
+    """Flux Server-Sent Events des rendez-vous créés, annulés ou modifiés"""
+    user_id = read_events_ticket(request.args.get('ticket', ''), max_age=EVENTS_TICKET_LIFETIME)
+    if user_id is None:
+        return jsonify({'error': 'Jeton invalide ou expiré'}), 401
+    user = db.session.get(User, user_id)
+    if not user or user.role != 'admin':
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    # La connexion reste ouverte : ne pas garder de connexion à la base
+    db.session.remove()
+
+    broker = get_broker()
+    if broker.subscriber_count >= current_app.config.get('EVENTS_MAX_SUBSCRIBERS', 50):
+        return jsonify({'error': 'Trop de connexions ouvertes'}), 503
+
+    response = current_app.response_class(stream_events(broker.subscribe()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Désactiver la mise en tampon d'un éventuel proxy nginx
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# ===== PROFILAGE =====
+
+@admin_bp.route('/profiles', methods=['GET'])
+@jwt_required()
+def get_profiles():
+    """Lister les profils de requêtes conservés (en-tête X-Profile ou échantillonnage)"""
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    try:
+        profiles = list_profiles(current_app.config['PROFILE_DIR'])
+        endpoint = request.args.get('endpoint')
+        if endpoint:
+            profiles = [profile for profile in profiles if profile['endpoint'] == endpoint]
+        return jsonify(profiles), 200
+    except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+def download_profile(profile_id):
+    """Télécharger un profil (.prof pour pstats/snakeviz, .collapsed pour flamegraph)"""
+    if not is_admin():
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    path = profile_path(current_app.config['PROFILE_DIR'], profile_id)
+    if not path:
+        return jsonify({'error': 'Profil non trouvé'}), 404
+    return send_file(path, as_attachment=True, download_name=os.path.basename(path))
+
 # ===== GESTION DE LA GALERIE =====
 
 @admin_bp.route('/gallery', methods=['GET'])
@@ -823,6 +1306,7 @@ def get_gallery_images():
         images = Gallery.query.order_by(Gallery.display_order).all()
         return jsonify([image.to_dict() for image in images]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/gallery', methods=['POST'])
@@ -853,6 +1337,7 @@ def add_gallery_image():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/gallery/<int:gallery_id>', methods=['DELETE'])
@@ -863,10 +1348,9 @@ def delete_gallery_image(gallery_id):
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        print(f"Tentative de suppression de l'image de la galerie avec l'ID : {gallery_id}")
-        gallery_item = Gallery.query.get(gallery_id)
+        current_app.logger.info("Suppression de l'image de la galerie %s", gallery_id)
+        gallery_item = db.session.get(Gallery, gallery_id)
         if not gallery_item:
-            print(f"Image de la galerie avec l'ID {gallery_id} non trouvée.")
             return jsonify({'error': 'Image non trouvée'}), 404
         
         db.session.delete(gallery_item)
@@ -878,6 +1362,7 @@ def delete_gallery_image(gallery_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/gallery/upload', methods=['POST'])
@@ -887,32 +1372,35 @@ def upload_gallery_photo():
     if not is_admin():
         return jsonify({'error': 'Accès non autorisé'}), 403
 
+    # Refuser les corps trop volumineux avant même de les lire
+    max_size = current_app.config.get('UPLOAD_MAX_FILE_SIZE')
+    if max_size and request.content_length and request.content_length > max_size + 64 * 1024:
+        return jsonify({'error': 'Fichier trop volumineux'}), 413
+
     if 'photo' not in request.files:
         return jsonify({'error': 'Aucun fichier photo trouvé'}), 400
 
     file = request.files['photo']
     title = request.form.get('title', '')
 
-    if file.filename == '':
+    if file.filename == '' or '.' not in file.filename:
         return jsonify({'error': 'Aucun fichier sélectionné'}), 400
 
-    if file:
-        filename = secure_filename(f"gallery_{datetime.now().timestamp()}.{file.filename.rsplit('.', 1)[1].lower()}")
-        upload_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'gallery')
-        
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-            
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
-        
-        # Créer l'URL relative
-        image_url = f"/uploads/gallery/{filename}"
+    upload = file.stream
+    if not isinstance(upload, HashingUploadFile):
+        return jsonify({'error': 'Une erreur est survenue lors du téléversement'}), 500
+
+    content_hash = upload.hexdigest()
 
-        # Ajouter à la base de données
+    # Image déjà présente : on réutilise ses variantes sans rien stocker de plus
+    duplicate = find_processed_duplicate(content_hash)
+    if duplicate is not None:
         new_image = Gallery(
-            image_url=image_url,
-            title=title
+            image_url=duplicate.image_url,
+            title=title,
+            content_hash=content_hash,
+            variants=duplicate.variants,
+            processing_status='ready'
         )
         db.session.add(new_image)
         db.session.commit()
@@ -924,7 +1412,51 @@ def upload_gallery_photo():
             'gallery_item': new_image.to_dict()
         }), 201
 
-    return jsonify({'error': 'Une erreur est survenue lors du téléversement'}), 500
+    # Stockage adressé par le contenu : <sha256>.<extension>
+    filename = secure_filename(f"{content_hash}.{file.filename.rsplit('.', 1)[1].lower()}")
+    upload_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'gallery')
+    os.makedirs(upload_folder, exist_ok=True)
+
+    file_path = os.path.join(upload_folder, filename)
+    created = upload.commit(file_path)
+
+    # Vérifier que le fichier est bien une image avant de l'enregistrer
+    try:
+        validate_image(file_path)
+    except InvalidImageError as e:
+        if created:
+            os.remove(file_path)
+        return jsonify({'error': str(e)}), 400
+
+    # Créer l'URL relative
+    image_url = f"/uploads/gallery/{filename}"
+
+    # Ajouter à la base de données
+    new_image = Gallery(
+        image_url=image_url,
+        title=title,
+        content_hash=content_hash,
+        processing_status='pending'
+    )
+    db.session.add(new_image)
+    db.session.commit()
+
+    clear_gallery_cache()
+
+    # Redimensionnement et conversion webp en arrière-plan
+    schedule_gallery_processing(
+        current_app._get_current_object(),
+        new_image.id,
+        file_path,
+        os.path.join(upload_folder, 'variants'),
+        '/uploads/gallery/variants',
+        on_complete=clear_gallery_cache
+    )
+
+    return jsonify({
+        'message': 'Image téléversée avec succès',
+        'gallery_item': new_image.to_dict()
+    }), 201
 
 
 # ===== GESTION DES INFORMATIONS DU SALON =====
@@ -989,6 +1521,7 @@ def update_salon_info():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 # ===== GESTION DE LA DISPONIBILITÉ DES EMPLOYÉS =====
@@ -1000,7 +1533,7 @@ def add_employee_availability(employee_id):
     if not is_admin():
         return jsonify({'error': 'Accès non autorisé'}), 403
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
@@ -1033,6 +1566,7 @@ def add_employee_availability(employee_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/employees/<int:employee_id>/availability', methods=['GET'])
@@ -1042,14 +1576,53 @@ def get_employee_availability(employee_id):
     if not is_admin():
         return jsonify({'error': 'Accès non autorisé'}), 403
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
-        availabilities = EmployeeAvailability.query.filter_by(employee_id=employee_id).all()
-        return jsonify([a.to_dict() for a in availabilities]), 200
+        # Filtres optionnels (index employee_id, date)
+        try:
+            start_date = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+            end_date = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+        except ValueError:
+            return jsonify({'error': 'Format de date invalide. Utilisez YYYY-MM-DD'}), 400
+
+        def period_rows(model, archived):
+            statement = db.select(
+                model.id, (model.source_id if archived else db.literal(None, db.Integer)).label('source_id'),
+                db.literal(archived).label('archived'), model.employee_id, model.date,
+                model.start_time, model.end_time, model.is_available, model.reason
+            ).where(model.employee_id == employee_id)
+            if start_date:
+                statement = statement.where(model.date >= start_date)
+            if end_date:
+                statement = statement.where(model.date <= end_date)
+            return statement
+
+        statement = period_rows(EmployeeAvailability, False)
+        if not start_date or start_date < date.today():
+            # Comme /calendar : les périodes passées ont pu être déplacées dans la table d'archive
+            statement = db.union_all(statement, period_rows(EmployeeAvailabilityArchive, True))
+        rows = statement.subquery()
+        query = db.select(rows).order_by(rows.c.date, rows.c.start_time, rows.c.archived.desc(), rows.c.id)
+
+        # Pagination optionnelle : les métadonnées sont renvoyées dans les en-têtes
+        page = request.args.get('page', type=int)
+        if page:
+            per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+            total = db.session.execute(db.select(db.func.count()).select_from(rows)).scalar()
+            items = db.session.execute(query.limit(per_page).offset((max(page, 1) - 1) * per_page)).all()
+            response = jsonify([unavailability_dict(row, row.archived) for row in items])
+            response.headers['X-Total-Count'] = str(total)
+            response.headers['X-Page'] = str(max(page, 1))
+            response.headers['X-Per-Page'] = str(per_page)
+            return response, 200
+
+        availabilities = db.session.execute(query).all()
+        return jsonify([unavailability_dict(row, row.archived) for row in availabilities]), 200
         
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/availability/<int:availability_id>', methods=['DELETE'])
@@ -1059,7 +1632,7 @@ def delete_employee_availability(availability_id):
     if not is_admin():
         return jsonify({'error': 'Accès non autorisé'}), 403
     try:
-        availability = EmployeeAvailability.query.get(availability_id)
+        availability = db.session.get(EmployeeAvailability, availability_id)
         if not availability:
             return jsonify({'error': 'Période d\'indisponibilité non trouvée'}), 404
         
@@ -1070,5 +1643,6 @@ def delete_employee_availability(availability_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
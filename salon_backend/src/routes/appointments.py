@@ -1,8 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, date, time, timedelta
 from src.models.models import db, Appointment, User, Employee, Service, BusinessHours, EmployeeHours, ClosedDate, EmployeeAvailability
 from sqlalchemy import func
+from src.events import publish_appointment_event
+from src.metrics import availability_compute
+from src.notifications import queue_booking_notifications, queue_cancellation_notice
+from src.repository import (
+    load_appointment, commit_without_expiry, find_conflicting_appointment, employee_working_hours,
+    employee_unavailabilities, booked_slots, employee_ids_for_service, list_client_appointments
+)
 
 appointments_bp = Blueprint('appointments', __name__)
 
@@ -17,12 +24,12 @@ def create_appointment():
         data = request.get_json()
         
         # Vérifier que le service existe
-        service = Service.query.get(data.get('service_id'))
+        service = db.session.get(Service, data.get('service_id'))
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
         
         # Vérifier que l'employé existe
-        employee = Employee.query.get(data.get('employee_id'))
+        employee = db.session.get(Employee, data.get('employee_id'))
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
@@ -53,16 +60,7 @@ def create_appointment():
         end_time = end_datetime.time()
         
         # Vérifier les conflits de rendez-vous
-        conflicts = Appointment.query.filter(
-            Appointment.employee_id == data['employee_id'],
-            Appointment.appointment_date == appointment_date,
-            Appointment.status.in_(['pending', 'confirmed']),
-            db.or_(
-                db.and_(Appointment.start_time <= start_time, Appointment.end_time > start_time),
-                db.and_(Appointment.start_time < end_time, Appointment.end_time >= end_time),
-                db.and_(Appointment.start_time >= start_time, Appointment.end_time <= end_time)
-            )
-        ).first()
+        conflicts = find_conflicting_appointment(employee.id, appointment_date, start_time, end_time)
         
         if conflicts:
             return jsonify({'error': 'Ce créneau n\'est pas disponible'}), 400
@@ -70,8 +68,8 @@ def create_appointment():
         # Créer le rendez-vous
         appointment = Appointment(
             client_id=int(user_id),
-            employee_id=data['employee_id'],
-            service_id=data['service_id'],
+            employee_id=employee.id,
+            service_id=service.id,
             appointment_date=appointment_date,
             start_time=start_time,
             end_time=end_time,
@@ -80,7 +78,12 @@ def create_appointment():
         )
         
         db.session.add(appointment)
-        db.session.commit()
+        db.session.flush()
+        # E-mails envoyés par le worker : la réservation n'attend pas le serveur SMTP
+        queue_booking_notifications(appointment)
+        # Pas de relecture : service et employé sont déjà dans l'identity map
+        commit_without_expiry()
+        publish_appointment_event('created', appointment)
         
         return jsonify({
             'message': 'Rendez-vous créé avec succès',
@@ -89,6 +92,7 @@ def create_appointment():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @appointments_bp.route('/my', methods=['GET'])
@@ -102,24 +106,13 @@ def get_my_appointments():
         
         # Filtrer par statut si spécifié
         status = request.args.get('status')
-        query = Appointment.query.filter_by(client_id=user_id)
-        
-        if status:
-            query = query.filter_by(status=status)
-        
-        # Charger les relations client, employee (avec user) et service pour éviter les problèmes N+1
-        query = query.options(
-            db.joinedload(Appointment.client),
-            db.joinedload(Appointment.employee).joinedload(Employee.user),
-            db.joinedload(Appointment.service)
-        )
-        
-        # Trier par date décroissante
-        appointments = query.order_by(Appointment.appointment_date.desc(), Appointment.start_time.desc()).all()
+        # Relations client, employee (avec user) et service chargées par jointure, triées par date décroissante
+        appointments = list_client_appointments(user_id, status)
         
         return jsonify([apt.to_dict() for apt in appointments]), 200
         
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @appointments_bp.route('/<int:appointment_id>', methods=['GET'])
@@ -130,7 +123,7 @@ def get_appointment(appointment_id):
         user_id = get_jwt_identity()
         # Convertir user_id en integer car JWT retourne un string
         user_id = int(user_id)
-        appointment = Appointment.query.get(appointment_id)
+        appointment = load_appointment(appointment_id, details=True)
         
         if not appointment:
             return jsonify({'error': 'Rendez-vous non trouvé'}), 404
@@ -142,6 +135,7 @@ def get_appointment(appointment_id):
         return jsonify(appointment.to_dict()), 200
         
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @appointments_bp.route('/<int:appointment_id>', methods=['PUT'])
@@ -152,7 +146,7 @@ def update_appointment(appointment_id):
         user_id = get_jwt_identity()
         # Convertir user_id en integer car JWT retourne un string
         user_id = int(user_id)
-        appointment = Appointment.query.get(appointment_id)
+        appointment = load_appointment(appointment_id, details=True)
         
         if not appointment:
             return jsonify({'error': 'Rendez-vous non trouvé'}), 404
@@ -167,7 +161,7 @@ def update_appointment(appointment_id):
         if 'notes' in data:
             appointment.notes = data['notes']
         
-        db.session.commit()
+        commit_without_expiry()
         
         return jsonify({
             'message': 'Rendez-vous mis à jour',
@@ -176,6 +170,7 @@ def update_appointment(appointment_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @appointments_bp.route('/<int:appointment_id>/cancel', methods=['POST'])
@@ -186,7 +181,7 @@ def cancel_appointment(appointment_id):
         user_id = get_jwt_identity()
         # Convertir user_id en integer car JWT retourne un string
         user_id = int(user_id)
-        appointment = Appointment.query.get(appointment_id)
+        appointment = load_appointment(appointment_id, details=True)
         
         if not appointment:
             return jsonify({'error': 'Rendez-vous non trouvé'}), 404
@@ -200,7 +195,9 @@ def cancel_appointment(appointment_id):
             return jsonify({'error': 'Ce rendez-vous ne peut pas être annulé'}), 400
         
         appointment.status = 'cancelled'
-        db.session.commit()
+        queue_cancellation_notice(appointment)
+        commit_without_expiry()
+        publish_appointment_event('cancelled', appointment)
         
         return jsonify({
             'message': 'Rendez-vous annulé',
@@ -209,6 +206,7 @@ def cancel_appointment(appointment_id):
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 
@@ -236,8 +234,8 @@ def get_appointment_availability():
         appointment_date = datetime.strptime(date_str, '%Y-%m-%d').date()
         day_of_week = appointment_date.weekday() # Lundi est 0, Dimanche est 6
         
-        service = Service.query.get(service_id)
-        employee = Employee.query.get(employee_id)
+        service = db.session.get(Service, service_id)
+        employee = db.session.get(Employee, employee_id)
         
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
@@ -245,26 +243,16 @@ def get_appointment_availability():
             return jsonify({'error': 'Employé non trouvé'}), 404
             
         # Récupérer les heures de travail de l'employé pour ce jour
-        employee_working_hours = EmployeeHours.query.filter_by(
-            employee_id=employee_id,
-            day_of_week=day_of_week
-        ).all()
+        working_hours = employee_working_hours(employee_id, day_of_week)
 
-        if not employee_working_hours:
+        if not working_hours:
             return jsonify({'available_slots': []}), 200 # Pas d'heures de travail définies pour ce jour
 
         # Récupérer les indisponibilités de l'employé pour ce jour
-        unavailabilities = EmployeeAvailability.query.filter_by(
-            employee_id=employee_id,
-            date=appointment_date
-        ).all()
+        unavailabilities = employee_unavailabilities(employee_id, appointment_date)
 
         # Récupérer les rendez-vous existants pour cet employé et cette date
-        existing_appointments = Appointment.query.filter(
-            Appointment.employee_id == employee_id,
-            Appointment.appointment_date == appointment_date,
-            Appointment.status.in_(['pending', 'confirmed'])
-        ).all()
+        existing_appointments = booked_slots(employee_id, appointment_date)
 
         booked_and_unavailable_slots = []
         for apt in existing_appointments:
@@ -283,7 +271,7 @@ def get_appointment_availability():
                 return jsonify({'available_slots': []}), 200
 
         available_slots = []
-        for hours in employee_working_hours:
+        for hours in working_hours:
             start_work = datetime.combine(appointment_date, hours.start_time)
             end_work = datetime.combine(appointment_date, hours.end_time)
 
@@ -306,37 +294,31 @@ def get_appointment_availability():
         return jsonify({'slots': sorted(list(set(available_slots)))}), 200
 
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
+@availability_compute.time(function='get_available_slots_for_employee')
 def get_available_slots_for_employee(service_id, employee_id, appointment_date):
     """
     Calcule les créneaux disponibles pour un employé, un service et une date donnés.
     Refactorisation de la logique de get_appointment_availability.
     """
     day_of_week = appointment_date.weekday()
-    service = Service.query.get(service_id)
+    service = db.session.get(Service, service_id)
     
     if not service:
         return []
 
     # Heures de travail de l'employé
-    employee_working_hours = EmployeeHours.query.filter_by(
-        employee_id=employee_id, day_of_week=day_of_week
-    ).all()
-    if not employee_working_hours:
+    working_hours = employee_working_hours(employee_id, day_of_week)
+    if not working_hours:
         return []
 
     # Indisponibilités
-    unavailabilities = EmployeeAvailability.query.filter_by(
-        employee_id=employee_id, date=appointment_date
-    ).all()
+    unavailabilities = employee_unavailabilities(employee_id, appointment_date)
 
     # Rendez-vous existants
-    existing_appointments = Appointment.query.filter(
-        Appointment.employee_id == employee_id,
-        Appointment.appointment_date == appointment_date,
-        Appointment.status.in_(['pending', 'confirmed'])
-    ).all()
+    existing_appointments = booked_slots(employee_id, appointment_date)
 
     blocked_slots = []
     for apt in existing_appointments:
@@ -354,7 +336,7 @@ def get_available_slots_for_employee(service_id, employee_id, appointment_date):
             return [] # Indisponible toute la journée
 
     available_slots = []
-    for hours in employee_working_hours:
+    for hours in working_hours:
         start_work = datetime.combine(appointment_date, hours.start_time)
         end_work = datetime.combine(appointment_date, hours.end_time)
         current_slot_start = start_work
@@ -372,21 +354,22 @@ def get_available_slots_for_employee(service_id, employee_id, appointment_date):
             
     return available_slots
 
+@availability_compute.time(function='get_all_employees_availability')
 def get_all_employees_availability(service_id, date_str):
     """
     Récupère les créneaux pour un service et une date, tous employés confondus.
     """
     appointment_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-    service = Service.query.get(service_id)
+    service = db.session.get(Service, service_id)
     if not service:
         return []
 
     # Récupérer les employés qui peuvent effectuer ce service
-    employees = Employee.query.join(Employee.services).filter(Service.id == service_id).all()
+    employee_ids = employee_ids_for_service(service_id)
     
     all_slots = []
-    for emp in employees:
-        all_slots.extend(get_available_slots_for_employee(service_id, emp.id, appointment_date))
+    for emp_id in employee_ids:
+        all_slots.extend(get_available_slots_for_employee(service_id, emp_id, appointment_date))
         
     return sorted(list(set(all_slots)))
 
@@ -408,13 +391,12 @@ def get_availability_by_service():
         start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
         
-        service = Service.query.get(service_id)
+        service = db.session.get(Service, service_id)
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
 
         # Employés pouvant réaliser le service
-        employees = Employee.query.join(Employee.services).filter(Service.id == service_id).all()
-        employee_ids = [emp.id for emp in employees]
+        employee_ids = employee_ids_for_service(service_id)
 
         if not employee_ids:
             return jsonify({'available_days': []}), 200
@@ -433,4 +415,5 @@ def get_availability_by_service():
         return jsonify({'available_days': sorted(list(available_days))}), 200
 
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
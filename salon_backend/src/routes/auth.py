@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from src.models.models import db, User
 
@@ -44,6 +44,7 @@ def register():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
@@ -71,6 +72,7 @@ def login():
         }), 200
         
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/me', methods=['GET'])
@@ -80,7 +82,7 @@ def get_current_user():
     try:
         user_id = get_jwt_identity()
         # Convertir l'ID de string en integer
-        user = User.query.get(int(user_id))
+        user = db.session.get(User, int(user_id))
         
         if not user:
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
@@ -88,6 +90,7 @@ def get_current_user():
         return jsonify(user.to_dict()), 200
         
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/update-profile', methods=['PUT'])
@@ -97,7 +100,7 @@ def update_profile():
     try:
         user_id = get_jwt_identity()
         # Convertir l'ID de string en integer car JWT retourne un string
-        user = User.query.get(int(user_id))
+        user = db.session.get(User, int(user_id))
         
         if not user:
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
@@ -121,5 +124,6 @@ def update_profile():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
@@ -1,5 +1,5 @@
-from flask import Blueprint, render_template_string, jsonify
-from src.models.models import Service, Employee, User
+from flask import Blueprint, render_template_string, jsonify, current_app
+from src.models.models import db, Service, Employee, User
 
 booking_page_bp = Blueprint('booking_page', __name__)
 
@@ -15,7 +15,7 @@ def get_booking_data():
         employees = Employee.query.filter_by(is_active=True).all()
         employees_data = []
         for emp in employees:
-            user = User.query.get(emp.user_id)
+            user = db.session.get(User, emp.user_id)
             emp_dict = emp.to_dict()
             if user:
                 emp_dict['first_name'] = user.first_name
@@ -27,5 +27,6 @@ def get_booking_data():
             'employees': employees_data
         })
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
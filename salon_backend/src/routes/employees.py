@@ -1,6 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from src.models.models import db, Employee, EmployeeHours
 from datetime import time
+from src.cache import cache
+from src.employee_services import employees_by_service_cache_key
+from src.schedule import cached_schedule_version, employee_scope, sync_employee_hours
 
 employees_bp = Blueprint('employees', __name__)
 
@@ -11,51 +14,62 @@ def get_employees():
         employees = Employee.query.filter_by(is_active=True).options(db.joinedload(Employee.user)).all()
         return jsonify([employee.to_dict() for employee in employees]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @employees_bp.route('/<int:employee_id>', methods=['GET'])
 def get_employee(employee_id):
     """Récupérer un employé spécifique"""
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         return jsonify(employee.to_dict()), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @employees_bp.route('/by-service/<int:service_id>', methods=['GET'])
+@cache.cached(timeout=600, key_prefix=lambda: employees_by_service_cache_key(request.view_args['service_id']))
 def get_employees_by_service(service_id):
     """Récupérer les employés qui proposent un service spécifique"""
     try:
         from src.models.models import Service
-        service = Service.query.get(service_id)
+        service = db.session.get(Service, service_id)
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
         
         employees = [emp.to_dict() for emp in service.employees if emp.is_active]
         return jsonify(employees), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
+def employee_hours_cache_key():
+    # La version change à chaque modification effective, et n'est relue en base qu'après invalidation
+    employee_id = request.view_args['employee_id']
+    return f'employee-hours:{employee_id}:v{cached_schedule_version(employee_scope(employee_id))}'
+
 @employees_bp.route('/<int:employee_id>/hours', methods=['GET'])
+@cache.cached(timeout=3600, key_prefix=employee_hours_cache_key)
 def get_employee_hours(employee_id):
     """Récupérer les horaires de travail d'un employé spécifique"""
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
         hours = EmployeeHours.query.filter_by(employee_id=employee_id).all()
         return jsonify([h.to_dict() for h in hours]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @employees_bp.route('/<int:employee_id>/hours', methods=['PUT'])
 def update_employee_hours(employee_id):
     """Mettre à jour les horaires de travail d'un employé spécifique"""
     try:
-        employee = Employee.query.get(employee_id)
+        employee = db.session.get(Employee, employee_id)
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
@@ -63,9 +77,6 @@ def update_employee_hours(employee_id):
         if not isinstance(data, list):
             return jsonify({'error': 'Les données doivent être une liste d\'horaires'}), 400
         
-        # Supprimer les horaires existants pour cet employé
-        EmployeeHours.query.filter_by(employee_id=employee_id).delete()
-        
         new_hours = []
         for hour_data in data:
             day_of_week = hour_data.get('day_of_week')
@@ -81,19 +92,17 @@ def update_employee_hours(employee_id):
             except ValueError:
                 return jsonify({'error': 'Format d\'heure invalide. Utilisez HH:MM:SS'}), 400
             
-            new_hour = EmployeeHours(
-                employee_id=employee_id,
-                day_of_week=day_of_week,
-                start_time=start_time,
-                end_time=end_time
-            )
-            db.session.add(new_hour)
-            new_hours.append(new_hour)
-            
+            new_hours.append({'day_of_week': day_of_week, 'start_time': start_time, 'end_time': end_time})
+
+        # Seules les lignes qui diffèrent des horaires enregistrés sont écrites
+        sync_employee_hours({employee_id: new_hours})
         db.session.commit()
-        return jsonify([h.to_dict() for h in new_hours]), 200
+
+        hours = EmployeeHours.query.filter_by(employee_id=employee_id).order_by(EmployeeHours.day_of_week).all()
+        return jsonify([h.to_dict() for h in hours]), 200
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 
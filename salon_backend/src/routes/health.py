@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+
+from src.health import readiness_report
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Sonde de vivacité : le processus répond (aucun accès à la base)"""
+    return jsonify({'status': 'ok'}), 200
+
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Sonde de disponibilité : base joignable, migrations appliquées, caches préchauffés"""
+    ready, checks = readiness_report()
+    return jsonify({'status': 'ready' if ready else 'not_ready', 'checks': checks}), 200 if ready else 503
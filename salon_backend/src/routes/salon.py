@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.models import db, SalonInfo, Gallery, BusinessHours, User
 from src.cache import cache
+from src.schedule import BUSINESS_SCOPE, cached_schedule_version
 
 salon_bp = Blueprint('salon', __name__)
 
@@ -15,6 +16,7 @@ def get_salon_info():
             return jsonify({'error': 'Informations non trouvées'}), 404
         return jsonify(salon_info.to_dict()), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @salon_bp.route('/info', methods=['PUT'])
@@ -24,7 +26,7 @@ def update_salon_info():
     try:
         user_id = get_jwt_identity()
         # Convertir l'ID de string en integer car JWT retourne un string
-        user = User.query.get(int(user_id))
+        user = db.session.get(User, int(user_id))
         
         if not user or user.role != 'admin':
             return jsonify({'error': 'Accès non autorisé'}), 403
@@ -60,6 +62,7 @@ def update_salon_info():
         
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @salon_bp.route('/gallery', methods=['GET'])
@@ -70,15 +73,21 @@ def get_gallery():
         gallery_items = Gallery.query.order_by(Gallery.display_order).all()
         return jsonify([item.to_dict() for item in gallery_items]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
+def hours_cache_key():
+    # Clé liée à la version des horaires, elle-même en cache : pas de requête tant qu'elle n'a pas changé
+    return f'salon-hours:v{cached_schedule_version(BUSINESS_SCOPE)}'
+
 @salon_bp.route('/hours', methods=['GET'])
-@cache.cached(timeout=3600) # Cache pendant 1 heure
+@cache.cached(timeout=3600, key_prefix=hours_cache_key) # Cache pendant 1 heure
 def get_hours():
     """Récupérer les horaires d'ouverture du salon"""
     try:
         hours = BusinessHours.query.order_by(BusinessHours.day_of_week).all()
         return jsonify([h.to_dict() for h in hours]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
@@ -1,28 +1,31 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from src.models.models import db, Service
 from src.cache import cache
+from src.employee_services import SERVICES_LIST_CACHE_KEY
 
 services_bp = Blueprint('services', __name__)
 
 @services_bp.route('/', methods=['GET'])
-@cache.cached(timeout=600) # Cache pendant 10 minutes
+@cache.cached(timeout=600, key_prefix=SERVICES_LIST_CACHE_KEY) # Cache pendant 10 minutes
 def get_services():
     """Récupérer tous les services actifs"""
     try:
         services = Service.query.filter_by(is_active=True).all()
         return jsonify([service.to_dict() for service in services]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @services_bp.route('/<int:service_id>', methods=['GET'])
 def get_service(service_id):
     """Récupérer un service spécifique"""
     try:
-        service = Service.query.get(service_id)
+        service = db.session.get(Service, service_id)
         if not service:
             return jsonify({'error': 'Service non trouvé'}), 404
         return jsonify(service.to_dict()), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
 @services_bp.route('/categories', methods=['GET'])
@@ -33,5 +36,6 @@ def get_categories():
         categories = db.session.query(Service.category).filter(Service.category.isnot(None)).distinct().all()
         return jsonify([cat[0] for cat in categories if cat[0]]), 200
     except Exception as e:
+        current_app.logger.exception('Erreur lors du traitement de la requête')
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,197 @@
+from collections import defaultdict
+from datetime import datetime, time
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.cache import cache
+from src.changes import record_changes
+from src.models.models import db, BusinessHours, EmployeeHours, ScheduleVersion
+
+BUSINESS_SCOPE = 'business'
+
+# Durée (secondes) pendant laquelle un processus réutilise la version mise en cache :
+# le processus qui modifie les horaires l'invalide aussitôt, les autres la relisent au plus tard après ce délai
+VERSION_CACHE_TIMEOUT = 60
+
+
+def employee_scope(employee_id):
+    return f'employee:{employee_id}'
+
+
+def schedule_version(scope):
+    """Version courante des horaires d'une portée (0 s'ils n'ont jamais été modifiés)"""
+    return db.session.execute(
+        select(ScheduleVersion.version).where(ScheduleVersion.scope == scope)
+    ).scalar() or 0
+
+
+def _version_cache_key(scope):
+    return f'schedule-version:{scope}'
+
+
+def cached_schedule_version(scope):
+    """Version des horaires pour les clés de cache : la base n'est lue que si le cache ne la connaît pas"""
+    key = _version_cache_key(scope)
+    version = cache.get(key)
+    if version is None:
+        version = schedule_version(scope)
+        cache.set(key, version, timeout=VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def bump_schedule_versions(scopes):
+    """Incrémenter la version des portées modifiées, dans la transaction en cours"""
+    now = datetime.utcnow()
+    bumped = db.session.info.setdefault('bumped_schedule_scopes', set())
+    for scope in scopes:
+        bumped.add(scope)
+        statement = sqlite_insert(ScheduleVersion).values(scope=scope, version=1, updated_at=now)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['scope'],
+            set_={'version': ScheduleVersion.version + 1, 'updated_at': now}
+        ))
+
+
+def _after_commit(session):
+    # Nouvelle version validée : la prochaine lecture la relit en base, les réponses en cache sont périmées
+    for scope in session.info.pop('bumped_schedule_scopes', ()):
+        cache.delete(_version_cache_key(scope))
+
+
+def _after_rollback(session):
+    session.info.pop('bumped_schedule_scopes', None)
+
+
+def init_schedule_versions():
+    """Invalider la version mise en cache des horaires modifiés, une fois la transaction validée"""
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+
+def parse_working_hours(hours):
+    """Valider une semaine d'horaires ; les jours sans heures sont des jours non travaillés"""
+    parsed = []
+    for hour_data in hours:
+        day_of_week = hour_data.get('day_of_week')
+        if day_of_week not in range(7):
+            raise ValueError(f'Jour invalide : {day_of_week}')
+        if not hour_data.get('start_time') or not hour_data.get('end_time'):
+            continue
+        start_time = time.fromisoformat(hour_data['start_time'])
+        end_time = time.fromisoformat(hour_data['end_time'])
+        if end_time <= start_time:
+            raise ValueError(f'Horaires incohérents pour le jour {day_of_week}')
+        parsed.append({'day_of_week': day_of_week, 'start_time': start_time, 'end_time': end_time})
+    return parsed
+
+
+def sync_employee_hours(schedules):
+    """
+    Remplacer les horaires d'un ou plusieurs employés ({employee_id: [{day_of_week,
+    start_time, end_time}]}) en n'écrivant que les lignes qui diffèrent :
+    un SELECT pour tous, puis au plus un UPDATE groupé, un INSERT groupé et un DELETE.
+    Retourne les ids des employés dont les horaires ont réellement changé.
+    """
+    if not schedules:
+        return set()
+
+    existing = defaultdict(lambda: defaultdict(list))
+    for row in db.session.execute(
+        select(EmployeeHours.id, EmployeeHours.employee_id, EmployeeHours.day_of_week,
+               EmployeeHours.start_time, EmployeeHours.end_time)
+        .where(EmployeeHours.employee_id.in_(list(schedules)))
+        .order_by(EmployeeHours.employee_id, EmployeeHours.day_of_week, EmployeeHours.start_time, EmployeeHours.id)
+    ):
+        existing[row.employee_id][row.day_of_week].append(row)
+
+    updates, inserts, deletes = [], [], []
+    changed = set()
+
+    for employee_id, hours in schedules.items():
+        incoming = defaultdict(list)
+        for hour in sorted(hours, key=lambda h: (h['day_of_week'], h['start_time'])):
+            incoming[hour['day_of_week']].append(hour)
+
+        current = existing[employee_id]
+        for day in set(current) | set(incoming):
+            stored, wanted = current.get(day, []), incoming.get(day, [])
+            # Les créneaux d'un même jour sont appariés dans l'ordre : on réutilise les lignes existantes
+            for row, hour in zip(stored, wanted):
+                if (row.start_time, row.end_time) != (hour['start_time'], hour['end_time']):
+                    updates.append({'id': row.id, 'start_time': hour['start_time'], 'end_time': hour['end_time']})
+                    changed.add(employee_id)
+            for row in stored[len(wanted):]:
+                deletes.append(row.id)
+                changed.add(employee_id)
+            for hour in wanted[len(stored):]:
+                inserts.append(dict(hour, employee_id=employee_id))
+                changed.add(employee_id)
+
+    if updates:
+        db.session.execute(update(EmployeeHours), updates)
+    if inserts:
+        db.session.execute(insert(EmployeeHours), inserts)
+    if deletes:
+        db.session.execute(
+            delete(EmployeeHours).where(EmployeeHours.id.in_(deletes)).execution_options(synchronize_session=False)
+        )
+
+    if changed:
+        # Écritures hors ORM : journal des modifications et version des horaires à la main
+        record_changes(db.session.connection(), 'employee', sorted(changed), 'update')
+        bump_schedule_versions(employee_scope(employee_id) for employee_id in sorted(changed))
+    return changed
+
+
+def sync_business_hours(days):
+    """
+    Appliquer des horaires d'ouverture partiels ([{day_of_week, open_time?,
+    close_time?, is_closed?}]) en n'écrivant que les jours modifiés.
+    Retourne True si les horaires ont changé ; ValueError si un jour est répété.
+    """
+    seen = set()
+    for day_data in days:
+        if day_data['day_of_week'] in seen:
+            raise ValueError(f"Jour en double : {day_data['day_of_week']}")
+        seen.add(day_data['day_of_week'])
+
+    stored = {row.day_of_week: row for row in db.session.execute(
+        select(BusinessHours.id, BusinessHours.day_of_week, BusinessHours.open_time,
+               BusinessHours.close_time, BusinessHours.is_closed)
+    )}
+
+    updates, inserts = [], []
+    for day_data in days:
+        day_of_week = day_data['day_of_week']
+        values = {}
+        if 'open_time' in day_data:
+            values['open_time'] = datetime.strptime(day_data['open_time'], '%H:%M').time() if day_data['open_time'] else None
+        if 'close_time' in day_data:
+            values['close_time'] = datetime.strptime(day_data['close_time'], '%H:%M').time() if day_data['close_time'] else None
+        if 'is_closed' in day_data:
+            values['is_closed'] = day_data['is_closed']
+
+        row = stored.get(day_of_week)
+        if row is None:
+            inserts.append(dict({'open_time': None, 'close_time': None, 'is_closed': False}, **values, day_of_week=day_of_week))
+            continue
+        diff = {key: value for key, value in values.items() if getattr(row, key) != value}
+        if diff:
+            updates.append(dict(diff, id=row.id))
+
+    # L'UPDATE groupé par clé primaire exige les mêmes colonnes sur chaque ligne
+    by_columns = defaultdict(list)
+    for values in updates:
+        by_columns[tuple(sorted(values))].append(values)
+    for rows in by_columns.values():
+        db.session.execute(update(BusinessHours), rows)
+    if inserts:
+        db.session.execute(insert(BusinessHours), inserts)
+
+    changed = bool(updates or inserts)
+    if changed:
+        bump_schedule_versions([BUSINESS_SCOPE])
+    return changed
@@ -0,0 +1,136 @@
+import re
+
+from sqlalchemy import text
+
+# Index plein texte des clients : FTS5 avec découpage en trigrammes, ce qui
+# permet de retrouver une sous-chaîne n'importe où dans le nom, l'e-mail ou le
+# téléphone. La table est tenue à jour par des triggers SQLite, y compris pour
+# les écritures groupées qui ne passent pas par l'ORM. rowid = users.id.
+#
+# Le téléphone est indexé sans séparateurs : "06 12 34 56 78" -> "0612345678".
+_PHONE_DIGITS = "replace(replace(replace(replace(replace(coalesce({col}, ''), ' ', ''), '.', ''), '-', ''), '(', ''), ')', '')"
+
+CLIENT_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS client_search USING fts5(name, email, phone, tokenize='trigram')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS client_search_insert AFTER INSERT ON users WHEN new.role = 'client'
+    BEGIN
+        INSERT INTO client_search(rowid, name, email, phone)
+        VALUES (new.id, new.first_name || ' ' || new.last_name, new.email, {_PHONE_DIGITS.format(col='new.phone')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS client_search_update AFTER UPDATE ON users
+    BEGIN
+        DELETE FROM client_search WHERE rowid = old.id;
+        INSERT INTO client_search(rowid, name, email, phone)
+        SELECT new.id, new.first_name || ' ' || new.last_name, new.email, {_PHONE_DIGITS.format(col='new.phone')}
+        WHERE new.role = 'client';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS client_search_delete AFTER DELETE ON users
+    BEGIN
+        DELETE FROM client_search WHERE rowid = old.id;
+    END
+    """,
+]
+
+# Le découpage en trigrammes ne trouve rien en dessous de 3 caractères
+MIN_TOKEN_LENGTH = 3
+
+# Au-delà, les résultats sont renvoyés du plus récent au plus ancien, sans calcul de pertinence
+RELEVANCE_MAX_RESULTS = 5000
+
+
+def init_client_search(db):
+    """Créer l'index et ses triggers s'ils n'existent pas, puis l'alimenter à la première création"""
+    with db.engine.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'client_search'"
+        )).first()
+        for statement in CLIENT_SEARCH_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            rebuild_client_search(conn)
+        return not exists
+
+
+def rebuild_client_search(conn):
+    conn.execute(text("DELETE FROM client_search"))
+    conn.execute(text(f"""
+        INSERT INTO client_search(rowid, name, email, phone)
+        SELECT id, first_name || ' ' || last_name, email, {_PHONE_DIGITS.format(col='phone')}
+        FROM users WHERE role = 'client'
+    """))
+
+
+def _tokens(query):
+    return [token for token in re.split(r'[\s,;]+', query.strip()) if token]
+
+
+def _normalize_token(token):
+    # Un numéro saisi avec séparateurs doit correspondre à la forme indexée
+    digits = re.sub(r'[\s.\-()]', '', token)
+    return digits if re.fullmatch(r'\+?\d+', digits) else token
+
+
+def _like_prefix(token):
+    """Motif LIKE « commence par » : % et _ saisis par l'utilisateur sont pris littéralement"""
+    return re.sub(r'([\\%_])', r'\\\1', token) + '%'
+
+
+def search_clients(session, query, page=1, per_page=50):
+    """
+    Rechercher des clients par nom, e-mail ou téléphone.
+    Retourne (ids ordonnés par pertinence, nombre total de résultats).
+    """
+    if re.fullmatch(r'\+?[\d\s.\-()]+', query.strip()):
+        # Numéro de téléphone saisi avec espaces : un seul terme
+        tokens = [_normalize_token(query.strip())]
+    else:
+        tokens = [_normalize_token(token) for token in _tokens(query)]
+    long_tokens = [token for token in tokens if len(token) >= MIN_TOKEN_LENGTH]
+    offset = (page - 1) * per_page
+
+    if long_tokens:
+        # Chaque mot est une sous-chaîne exigée : "jean dup" -> "jean" AND "dup"
+        match = ' AND '.join('"{}"'.format(token.replace('"', '""')) for token in long_tokens)
+        prefix = _like_prefix(long_tokens[0])
+        total = session.execute(
+            text("SELECT count(*) FROM client_search WHERE client_search MATCH :match"),
+            {'match': match}
+        ).scalar()
+        if total > RELEVANCE_MAX_RESULTS:
+            # Requête trop large (ex. "@gmail") : le tri par pertinence coûterait plus qu'il n'apporte
+            ids = session.execute(text(
+                "SELECT rowid FROM client_search WHERE client_search MATCH :match ORDER BY rowid DESC LIMIT :limit OFFSET :offset"
+            ), {'match': match, 'limit': per_page, 'offset': offset}).scalars().all()
+            return ids, total
+
+        # Pertinence : début de nom / d'e-mail d'abord, puis score bm25
+        ids = session.execute(text("""
+            SELECT s.rowid FROM client_search s
+            JOIN users u ON u.id = s.rowid
+            WHERE client_search MATCH :match
+            ORDER BY (u.last_name LIKE :prefix ESCAPE '\\' OR u.first_name LIKE :prefix ESCAPE '\\'
+                      OR u.email LIKE :prefix ESCAPE '\\') DESC,
+                     bm25(client_search), u.last_name, u.first_name, u.id
+            LIMIT :limit OFFSET :offset
+        """), {'match': match, 'prefix': prefix, 'limit': per_page, 'offset': offset}).scalars().all()
+        return ids, total
+
+    if not tokens:
+        return [], 0
+
+    # Requête trop courte pour les trigrammes : début du prénom ou du nom, via leurs index NOCASE.
+    # "+role" écarte l'index du rôle, que SQLite choisirait sinon et qui couvre presque toute la table.
+    prefix = _like_prefix(tokens[0])
+    conditions = "+role = 'client' AND (last_name LIKE :prefix ESCAPE '\\' OR first_name LIKE :prefix ESCAPE '\\')"
+    total = session.execute(text(f"SELECT count(*) FROM users WHERE {conditions}"), {'prefix': prefix}).scalar()
+    ids = session.execute(text(f"""
+        SELECT id FROM users WHERE {conditions}
+        ORDER BY last_name, first_name, id
+        LIMIT :limit OFFSET :offset
+    """), {'prefix': prefix, 'limit': per_page, 'offset': offset}).scalars().all()
+    return ids, total
@@ -0,0 +1,149 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger('src.sql.slow')
+
+# Instructions pour lesquelles EXPLAIN QUERY PLAN n'a pas de sens
+_NOT_EXPLAINABLE = ('EXPLAIN', 'PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'CREATE', 'DROP', 'ALTER')
+
+# Paramètres jamais journalisés pour ces tables : hachés de mots de passe, e-mails, téléphones
+_SENSITIVE_TABLES = re.compile(r'\b(users|client_search)\b', re.IGNORECASE)
+
+# Les autres paramètres texte sont tronqués
+PARAMETER_MAX_LENGTH = 32
+
+
+def _jsonable(value):
+    if isinstance(value, str):
+        return value if len(value) <= PARAMETER_MAX_LENGTH else value[:PARAMETER_MAX_LENGTH] + '…'
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if isinstance(value, bytes):
+        return f'<{len(value)} octets>'
+    return _jsonable(str(value))
+
+
+def loggable_parameters(statement, parameters, executemany):
+    """Paramètres à écrire dans le journal : aucun pour les tables sensibles ou un executemany"""
+    if executemany or _SENSITIVE_TABLES.search(statement):
+        return None
+    return [_jsonable(p) for p in (parameters or ())]
+
+
+def format_plan(rows):
+    """Mettre en forme les lignes (id, parent, _, detail) d'EXPLAIN QUERY PLAN en arbre indenté"""
+    depth = {0: -1}
+    lines = []
+    for row_id, parent, _, detail in rows:
+        depth[row_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[row_id] + detail)
+    return lines
+
+
+class SlowQueryFileHandler(RotatingFileHandler):
+    """
+    Écrit une ligne JSON par requête lente. Exécuté dans le thread du
+    QueueListener : le plan d'exécution y est calculé sur une connexion
+    dédiée, sans retarder la requête HTTP qui a émis l'instruction.
+    """
+
+    def __init__(self, filename, engine, explain=True, **kwargs):
+        super().__init__(filename, encoding='utf-8', **kwargs)
+        self.engine = engine
+        self.explain = explain
+
+    def query_plan(self, statement, parameters):
+        if not self.explain or statement.lstrip().upper().startswith(_NOT_EXPLAINABLE):
+            return None
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ())
+            return format_plan(cursor.fetchall())
+        except Exception as e:
+            return [f'(plan indisponible : {e})']
+        finally:
+            connection.close()
+
+    def format(self, record):
+        entry = dict(record.slow_query)
+        entry['plan'] = self.query_plan(record.sql, record.parameters)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def init_slow_query_log(app, engine):
+    """
+    Journaliser les instructions SQL émises pendant une requête HTTP et plus
+    lentes que SLOW_QUERY_THRESHOLD_MS : durée, paramètres (tronqués, jamais ceux
+    des tables sensibles), route appelante et plan d'exécution, dans un fichier
+    tournant écrit hors du thread de la requête.
+    """
+    app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', 100)  # None : journal désactivé
+    app.config.setdefault('SLOW_QUERY_LOG_FILE', os.path.join(os.path.dirname(app.root_path), 'logs', 'slow_queries.log'))
+    app.config.setdefault('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024)
+    app.config.setdefault('SLOW_QUERY_LOG_BACKUPS', 5)
+    app.config.setdefault('SLOW_QUERY_EXPLAIN', True)
+
+    threshold_ms = app.config['SLOW_QUERY_THRESHOLD_MS']
+    if threshold_ms is None or getattr(engine, '_slow_query_listener', None):
+        return None
+    threshold = threshold_ms / 1000
+
+    os.makedirs(os.path.dirname(app.config['SLOW_QUERY_LOG_FILE']), exist_ok=True)
+    file_handler = SlowQueryFileHandler(
+        app.config['SLOW_QUERY_LOG_FILE'], engine, explain=app.config['SLOW_QUERY_EXPLAIN'],
+        maxBytes=app.config['SLOW_QUERY_LOG_MAX_BYTES'], backupCount=app.config['SLOW_QUERY_LOG_BACKUPS'],
+    )
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    engine._slow_query_listener = listener
+
+    logger.addHandler(QueueHandler(records))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_started', []).append((context, time.perf_counter()))
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        # Instruction en échec : after_cursor_execute n'est pas appelé
+        started = context.connection.info.get('slow_query_started') if context.connection is not None else None
+        if started and started[-1][0] is context.execution_context:
+            started.pop()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['slow_query_started'].pop()[1]
+        if duration < threshold or not has_request_context():
+            return
+        logger.info('Requête lente', extra={
+            'slow_query': {
+                'timestamp': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+                'duration_ms': round(duration * 1000, 2),
+                'endpoint': request.endpoint,
+                'method': request.method,
+                'path': request.path,  # Sans la chaîne de requête (tickets, jetons)
+                'statement': ' '.join(statement.split()),
+                'parameters': loggable_parameters(statement, parameters, executemany),
+                'executemany': executemany,
+            },
+            # Instruction et paramètres d'origine pour EXPLAIN, dans le thread d'écriture
+            'sql': statement,
+            'parameters': None if executemany else parameters,
+        })
+
+    return listener
@@ -0,0 +1,279 @@
+import mimetypes
+import os
+import re
+import signal
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+from flask import abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+
+from src.compression import accepted_encodings
+
+# Fichiers générés par Vite : assets/<nom>-<hash de 8 caractères>.<ext>
+HASHED_ASSET_RE = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+# Téléversements adressés par leur contenu : <sha256>[-<largeur>].<ext>
+CONTENT_ADDRESSED_RE = re.compile(r'(^|/)[0-9a-f]{64}(-\d+)?\.[A-Za-z0-9]+$')
+
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Fichiers gardés en mémoire (avec leurs variantes compressées)
+IN_MEMORY_FILES = {'index.html'}
+
+
+def send_static_asset(directory, path):
+    """
+    Envoyer un fichier statique en privilégiant sa variante pré-compressée
+    (.br/.gz) lorsque le client l'accepte. Les ressources hashées ou adressées
+    par leur contenu sont marquées immuables pour être mises en cache un an.
+    """
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    immutable = bool(HASHED_ASSET_RE.match(path) or CONTENT_ADDRESSED_RE.search(path))
+    max_age = IMMUTABLE_MAX_AGE if immutable else None
+
+    response = None
+    for encoding in accepted_encodings():
+        compressed_path = path + ENCODING_SUFFIXES[encoding]
+        full_path = safe_join(directory, compressed_path)
+        if full_path and os.path.isfile(full_path):
+            response = send_from_directory(directory, compressed_path, mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+            break
+
+    if response is None:
+        response = send_from_directory(directory, path, mimetype=mimetype, max_age=max_age)
+
+    response.vary.add('Accept-Encoding')
+
+    if immutable:
+        response.cache_control.immutable = True
+
+    return response
+
+
+class StaticEntry:
+    """Fichier statique indexé : chemin, taille, date de modification et ETag"""
+
+    __slots__ = ('path', 'size', 'mtime', 'signature', 'etag', 'data')
+
+    def __init__(self, path, stat, data=None):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.etag = f"{stat.st_mtime}-{stat.st_size}-{zlib.adler32(path.encode('utf-8')) & 0xFFFFFFFF}"
+        self.data = data
+
+    @classmethod
+    def load(cls, path, in_memory=False):
+        """Lire les métadonnées (et le contenu pour un fichier gardé en mémoire) depuis le disque"""
+        stat = os.stat(path)
+        data = None
+        if in_memory:
+            with open(path, 'rb') as f:
+                data = f.read()
+        return cls(path, stat, data)
+
+
+def _base_name(name):
+    """Chemin du fichier d'origine d'une variante pré-compressée (le nom lui-même sinon)"""
+    for suffix in ENCODING_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class StaticFile:
+    """Ressource publique avec ses éventuelles variantes pré-compressées"""
+
+    __slots__ = ('name', 'mimetype', 'immutable', 'entry', 'variants')
+
+    def __init__(self, name, entry):
+        self.name = name
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.immutable = bool(HASHED_ASSET_RE.match(name))
+        self.entry = entry
+        self.variants = {}
+
+
+class StaticIndex:
+    """
+    Index en mémoire du dossier statique, construit au démarrage.
+    Il est reconstruit sur SIGHUP ou lorsque la date de modification d'un
+    dossier change (vérifiée au plus une fois par `check_interval` secondes).
+    Le fichier servi est revérifié (stat) à chaque envoi : un fichier réécrit
+    sur place est relu, un fichier supprimé entre deux vérifications donne 404.
+    """
+
+    def __init__(self, root, exclude=(), check_interval=5):
+        self.root = root
+        self.exclude = {d.strip('/') for d in exclude}
+        self.check_interval = check_interval
+        self._files = {}
+        self._dir_mtimes = {}
+        self._next_check = 0
+        self._stale = False
+        self._lock = threading.Lock()
+        self.rebuild()
+
+    def rebuild(self):
+        """(Re)construire l'index à partir du disque"""
+        files = {}
+        dir_mtimes = {}
+        raw = {}
+
+        if self.root and os.path.isdir(self.root):
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                rel_dir = os.path.relpath(dirpath, self.root).replace(os.sep, '/')
+                rel_dir = '' if rel_dir == '.' else rel_dir
+                if rel_dir in self.exclude:
+                    dirnames[:] = []
+                    continue
+                dir_mtimes[dirpath] = os.stat(dirpath).st_mtime
+
+                for filename in filenames:
+                    name = f"{rel_dir}/{filename}" if rel_dir else filename
+                    try:
+                        raw[name] = StaticEntry.load(os.path.join(dirpath, filename),
+                                                     _base_name(name) in IN_MEMORY_FILES)
+                    except OSError:
+                        continue  # Supprimé pendant le parcours
+
+        # Les variantes .br/.gz d'un fichier présent ne sont pas des ressources publiques
+        variants = {name for name in raw if _base_name(name) != name and _base_name(name) in raw}
+        for name, entry in raw.items():
+            if name not in variants:
+                files[name] = StaticFile(name, entry)
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            for name, static_file in files.items():
+                variant = raw.get(name + suffix)
+                if variant is not None:
+                    static_file.variants[encoding] = variant
+
+        self._files = files
+        self._dir_mtimes = dir_mtimes
+        self._stale = False
+        self._next_check = time.monotonic() + self.check_interval if self.check_interval else None
+
+    def refresh_if_stale(self):
+        """Reconstruire l'index si SIGHUP a été reçu ou si un dossier a changé"""
+        if not self._stale:
+            if self._next_check is None or time.monotonic() < self._next_check:
+                return
+        with self._lock:
+            if not self._stale:
+                if self._next_check is None or time.monotonic() < self._next_check:
+                    return
+                changed = False
+                for dirpath, mtime in self._dir_mtimes.items():
+                    try:
+                        if os.stat(dirpath).st_mtime != mtime:
+                            changed = True
+                            break
+                    except OSError:
+                        changed = True
+                        break
+                if not changed:
+                    self._next_check = time.monotonic() + self.check_interval
+                    return
+            self.rebuild()
+
+    def install_sighup_handler(self):
+        """Marquer l'index à reconstruire sur SIGHUP (POSIX, thread principal seulement)"""
+        if not hasattr(signal, 'SIGHUP'):
+            return False
+        previous = signal.getsignal(signal.SIGHUP)
+
+        def handle_sighup(signum, frame):
+            self._stale = True
+            if callable(previous):
+                previous(signum, frame)
+
+        try:
+            signal.signal(signal.SIGHUP, handle_sighup)
+        except ValueError:
+            return False
+        return True
+
+    def lookup(self, name):
+        """Retrouver une ressource par son chemin public, sans accès disque"""
+        self.refresh_if_stale()
+        return self._files.get(name)
+
+    def _current(self, holder, key):
+        """
+        Entrée à jour d'un fichier indexé (`holder[key]` ou `holder.key`) : relue si
+        le fichier a été réécrit, None s'il a disparu (l'index sera reconstruit).
+        """
+        entry = holder[key] if isinstance(holder, dict) else getattr(holder, key)
+        try:
+            stat = os.stat(entry.path)
+            if (stat.st_mtime_ns, stat.st_size) == entry.signature:
+                return entry
+            entry = StaticEntry.load(entry.path, entry.data is not None)
+        except OSError:
+            self._stale = True
+            return None
+        if isinstance(holder, dict):
+            holder[key] = entry
+        else:
+            setattr(holder, key, entry)
+        return entry
+
+    def send(self, static_file):
+        """Construire la réponse (conditionnelle, Range, X-Sendfile) pour une ressource"""
+        entry, encoding = None, None
+        for accepted in accepted_encodings():
+            if accepted in static_file.variants:
+                entry = self._current(static_file.variants, accepted)
+                if entry is not None:
+                    encoding = accepted
+                    break
+        if entry is None:
+            entry = self._current(static_file, 'entry')
+            if entry is None:
+                abort(404)
+
+        response_class = current_app.response_class
+        x_sendfile = entry.data is None and current_app.config.get('USE_X_SENDFILE')
+        if entry.data is not None:
+            response = response_class(entry.data, mimetype=static_file.mimetype)
+        elif x_sendfile:
+            response = response_class(mimetype=static_file.mimetype)
+            response.headers['X-Sendfile'] = entry.path
+            response.content_length = entry.size
+        else:
+            try:
+                f = open(entry.path, 'rb')
+            except OSError:
+                self._stale = True  # Supprimé depuis la vérification
+                abort(404)
+            # wsgi.file_wrapper permet au serveur d'utiliser sendfile()
+            data = wrap_file(request.environ, f)
+            response = response_class(data, mimetype=static_file.mimetype, direct_passthrough=True)
+            response.content_length = entry.size
+
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if static_file.variants:
+            response.vary.add('Accept-Encoding')
+
+        response.last_modified = entry.mtime
+        response.set_etag(entry.etag)
+        if static_file.immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+
+        if x_sendfile:
+            # Les requêtes Range sont alors traitées par le serveur frontal
+            return response.make_conditional(request)
+        return response.make_conditional(request, accept_ranges=True, complete_length=entry.size)
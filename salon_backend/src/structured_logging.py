@@ -0,0 +1,189 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+from flask_jwt_extended import get_jwt
+
+from src.utils.redaction import redacted_query_string
+
+access_logger = logging.getLogger('src.access')
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[\w.-]{1,64}$')
+
+# Attributs présents sur tout LogRecord : le reste vient de `extra=` et est sérialisé tel quel
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+def request_id():
+    """Identifiant de la requête en cours : repris de l'en-tête X-Request-ID (proxy) ou généré"""
+    if 'request_id' not in g:
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        g.request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+    return g.request_id
+
+
+def _current_user_id():
+    try:
+        return get_jwt().get('sub')
+    except Exception:
+        return None  # Route publique ou jeton pas encore vérifié
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute à chaque enregistrement le contexte de la requête (id, utilisateur, route)"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = request_id()
+            record.method = request.method
+            record.path = request.path
+            if not hasattr(record, 'endpoint'):
+                record.endpoint = request.endpoint
+            user_id = _current_user_id()
+            if user_id is not None:
+                record.user_id = user_id
+        return True
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    Met l'enregistrement en file sans le formater : seul le texte de la trace
+    est calculé ici, le JSON est produit par le thread du QueueListener.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, avec les champs passés dans `extra=`"""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Format lisible pour le développement : contexte de la requête en fin de ligne"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        if getattr(record, 'request_id', None):
+            line += f' [{record.request_id}]'
+        return line
+
+
+def init_logging(app):
+    """
+    Journalisation structurée et asynchrone : les enregistrements passent par une
+    file (QueueHandler) et sont écrits par un thread dédié (QueueListener), en
+    JSON (ou en texte, LOG_FORMAT=text) sur stderr et, si LOG_FILE est défini,
+    dans un fichier tournant. Chaque requête produit une ligne d'accès avec sa
+    durée et ses temps SQL ; les erreurs 500 sont journalisées au niveau ERROR,
+    sauf celles des sondes de santé (/readyz en 503 pendant le préchauffage).
+    """
+    app.config.setdefault('LOG_LEVEL', os.environ.get('LOG_LEVEL', 'INFO'))
+    app.config.setdefault('LOG_FORMAT', os.environ.get('LOG_FORMAT', 'json'))
+    app.config.setdefault('LOG_FILE', os.environ.get('LOG_FILE'))
+    app.config.setdefault('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024)
+    app.config.setdefault('LOG_FILE_BACKUPS', 5)
+    app.config.setdefault('LOG_ACCESS', True)
+    app.config.setdefault('LOG_ACCESS_SKIP_ENDPOINTS', {'health.healthz', 'health.readyz'})  # Sondes : journalisées en échec seulement, en INFO
+
+    formatter = JsonFormatter() if app.config['LOG_FORMAT'] == 'json' else TextFormatter()
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if app.config['LOG_FILE']:
+        os.makedirs(os.path.dirname(os.path.abspath(app.config['LOG_FILE'])), exist_ok=True)
+        handlers.append(RotatingFileHandler(app.config['LOG_FILE'], encoding='utf-8',
+                                            maxBytes=app.config['LOG_FILE_MAX_BYTES'],
+                                            backupCount=app.config['LOG_FILE_BACKUPS']))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = StructuredQueueHandler(records)
+    queue_handler.addFilter(RequestContextFilter())
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, StructuredQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(app.config['LOG_LEVEL'])
+
+    # Tout passe par la racine : pas de second gestionnaire Flask, ni de ligne d'accès werkzeug en double
+    app.logger.removeHandler(default_handler)
+    if app.config['LOG_ACCESS']:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    @app.before_request
+    def assign_request_id():
+        request_id()
+        g.log_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        response.headers[REQUEST_ID_HEADER] = request_id()
+        started = g.pop('log_started', None)
+        if not app.config['LOG_ACCESS'] or started is None:
+            return response
+        probe = request.endpoint in app.config['LOG_ACCESS_SKIP_ENDPOINTS']
+        if probe and response.status_code < 400:
+            return response
+
+        details = {
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            'remote_addr': request.remote_addr,
+        }
+        if response.content_length is not None:
+            details['response_size'] = response.content_length
+        queries = g.get('sql_queries')  # Instrumentation SQL (src.instrumentation)
+        if queries is not None:
+            details['sql_queries'] = queries.count
+            details['sql_ms'] = round(queries.duration * 1000, 2)
+        if response.status_code >= 500:
+            details['query_string'] = redacted_query_string()
+
+        # Chemin seul dans le message : la chaîne de requête peut porter un jeton
+        # Une sonde en 503 (démarrage, dépendance indisponible) est un état attendu, pas une erreur
+        level = logging.ERROR if response.status_code >= 500 and not probe else logging.INFO
+        access_logger.log(level, '%s %s %s', request.method, request.path, response.status_code, extra=details)
+        return response
+
+    return listener
@@ -0,0 +1,66 @@
+import hashlib
+import os
+import tempfile
+
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class HashingUploadFile:
+    """
+    Fichier temporaire qui reçoit un téléversement par morceaux, en calculant
+    son empreinte SHA-256 au fil de l'eau et en refusant les fichiers trop gros.
+    """
+
+    def __init__(self, directory, max_size=None):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix='upload_', suffix='.part', dir=directory)
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self.max_size = max_size
+        self.size = 0
+        self.committed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            self.close()
+            raise RequestEntityTooLarge()
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def commit(self, destination):
+        """
+        Déplacer le fichier vers son emplacement définitif (adressé par son
+        contenu). Retourne False si un fichier identique y était déjà.
+        """
+        self._file.close()
+        self.committed = True
+        if os.path.exists(destination):
+            os.remove(self.path)
+            return False
+        os.replace(self.path, destination)
+        return True
+
+    def close(self):
+        self._file.close()
+        if not self.committed and os.path.exists(self.path):
+            os.remove(self.path)
+            self.committed = True
+
+    def __getattr__(self, name):
+        # read, seek, tell... sont délégués au fichier sous-jacent
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Requête dont les fichiers sont écrits directement sur disque, par morceaux"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingUploadFile(
+            os.path.join(current_app.config['UPLOAD_FOLDER'], 'tmp'),
+            max_size=current_app.config.get('UPLOAD_MAX_FILE_SIZE')
+        )
@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, insert, literal, select
+
+from src.models.models import db, EmployeeAvailability, EmployeeAvailabilityArchive
+
+# L'id de la ligne vivante est conservé dans source_id : l'archive a sa propre clé
+ARCHIVED_COLUMNS = ['employee_id', 'date', 'start_time', 'end_time', 'is_available', 'reason']
+
+
+def archive_past_availability(before=None, batch_size=1000):
+    """
+    Déplacer les indisponibilités antérieures à `before` (aujourd'hui par défaut)
+    vers la table d'archive, par lots, chaque lot dans une seule transaction.
+    Retourne le nombre de lignes archivées.
+    """
+    before = before or date.today()
+    archived = 0
+
+    while True:
+        ids = db.session.execute(
+            select(EmployeeAvailability.id)
+            .where(EmployeeAvailability.date < before)
+            .order_by(EmployeeAvailability.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        try:
+            source = select(
+                EmployeeAvailability.id,
+                *[getattr(EmployeeAvailability, name) for name in ARCHIVED_COLUMNS],
+                literal(datetime.utcnow())
+            ).where(EmployeeAvailability.id.in_(ids)).order_by(EmployeeAvailability.id)
+            db.session.execute(
+                insert(EmployeeAvailabilityArchive).from_select(['source_id'] + ARCHIVED_COLUMNS + ['archived_at'], source)
+            )
+            db.session.execute(
+                delete(EmployeeAvailability).where(EmployeeAvailability.id.in_(ids))
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    return archived
+
+
+@click.command('archive-availability')
+@click.option('--days', default=0, help="Conserver les N derniers jours dans la table vivante")
+@click.option('--batch-size', default=1000, help='Nombre de lignes déplacées par transaction')
+@with_appcontext
+def archive_availability_command(days, batch_size):
+    """Archiver les indisponibilités passées des employés"""
+    cutoff = date.today() - timedelta(days=days)
+    count = archive_past_availability(before=cutoff, batch_size=batch_size)
+    click.echo(f'{count} indisponibilité(s) archivée(s) avant le {cutoff.isoformat()}')
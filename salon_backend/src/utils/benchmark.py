@@ -0,0 +1,260 @@
+import json
+import math
+import platform
+import sqlite3
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_jwt_extended import create_access_token
+from sqlalchemy import delete, event, func, select
+
+from src.cache import cache
+from src.models.models import db, User, Employee, Service, Appointment, ChangeLog, Job, employee_services
+
+# Suite de benchmarks des chemins critiques de la réservation, exécutée via le
+# client de test Flask (sans réseau). Chaque scénario est répété, on mesure la
+# latence (percentiles) et le nombre de requêtes SQL par appel.
+
+
+def percentile(sorted_values, p):
+    """Percentile par rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+def summarize(durations, query_counts):
+    durations = sorted(durations)
+    return {
+        'iterations': len(durations),
+        'mean_ms': round(sum(durations) / len(durations), 3),
+        'min_ms': round(durations[0], 3),
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p90_ms': round(percentile(durations, 90), 3),
+        'p99_ms': round(percentile(durations, 99), 3),
+        'max_ms': round(durations[-1], 3),
+        'queries': round(sum(query_counts) / len(query_counts), 2),
+        'max_queries': max(query_counts),
+    }
+
+
+@contextmanager
+def count_queries(engine):
+    """Compter les instructions SQL exécutées sur le moteur pendant le bloc"""
+    counter = {'queries': 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter['queries'] += 1
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=current_app.root_path, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _busiest_upcoming_saturday(employee_id):
+    """Samedi à venir le plus chargé de l'employé (ou le prochain samedi)"""
+    today = date.today()
+    saturday = today + timedelta(days=(5 - today.weekday()) % 7 or 7)
+    row = db.session.execute(
+        select(Appointment.appointment_date, func.count())
+        .where(Appointment.employee_id == employee_id, Appointment.appointment_date >= today,
+               func.strftime('%w', Appointment.appointment_date) == '6')
+        .group_by(Appointment.appointment_date)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).first()
+    return row[0] if row else saturday
+
+
+def build_scenarios():
+    """
+    Choisir les paramètres des scénarios dans la base courante : l'employé le plus
+    chargé, un de ses services et son samedi à venir le plus rempli.
+    Retourne (scénarios, contexte) ; chaque scénario est (nom, méthode, url, rôle, corps).
+    """
+    admin_id = db.session.execute(select(User.id).where(User.role == 'admin').limit(1)).scalar()
+    client_id = db.session.execute(select(User.id).where(User.role == 'client').limit(1)).scalar()
+    employee_id = db.session.execute(
+        select(Appointment.employee_id).group_by(Appointment.employee_id).order_by(func.count().desc()).limit(1)
+    ).scalar() or db.session.execute(select(Employee.id).where(Employee.is_active == True).limit(1)).scalar()
+    service = db.session.execute(
+        select(Service.id, Service.duration).join(employee_services, employee_services.c.service_id == Service.id)
+        .where(employee_services.c.employee_id == employee_id)
+        .order_by(Service.duration, Service.id)
+        .limit(1)
+    ).first()
+    if service is None or not (admin_id and client_id and employee_id):
+        raise click.ClickException(
+            'La base doit contenir un administrateur, un client et un employé proposant au moins un service'
+        )
+    service_id, duration = service
+
+    day = _busiest_upcoming_saturday(employee_id).isoformat()
+    period_end = (date.fromisoformat(day) + timedelta(days=13)).isoformat()
+
+    scenarios = [
+        ('availability', 'GET', f'/api/appointments/availability?service_id={service_id}&employee_id={employee_id}&date={day}', 'client', None),
+        ('availability_any_employee', 'GET', f'/api/appointments/availability?service_id={service_id}&employee_id=0&date={day}', 'client', None),
+        ('availability_by_service', 'GET', f'/api/appointments/availability-by-service?service_id={service_id}&start_date={day}&end_date={period_end}', 'client', None),
+        ('booking_data', 'GET', '/api/booking-data', None, None),
+        ('admin_appointments_day', 'GET', f'/api/admin/appointments?date={day}', 'admin', None),
+        ('admin_appointments_employee', 'GET', f'/api/admin/appointments?employee_id={employee_id}&status=pending', 'admin', None),
+        ('admin_stats', 'GET', '/api/admin/stats', 'admin', None),
+        ('create_appointment', 'POST', '/api/appointments/', 'client', {'service_id': service_id, 'employee_id': employee_id}),
+    ]
+    context = {
+        'admin_id': admin_id, 'client_id': client_id, 'employee_id': employee_id,
+        'service_id': service_id, 'service_duration': duration, 'date': day,
+    }
+    return scenarios, context
+
+
+def _booking_slots(duration):
+    """Créneaux libres successifs, très loin dans le futur, pour les créations de rendez-vous"""
+    day = date.today() + timedelta(days=3 * 365)
+    minute = 9 * 60
+    while True:
+        if minute + duration > 19 * 60:
+            day, minute = day + timedelta(days=1), 9 * 60
+        yield {'appointment_date': day.isoformat(), 'start_time': f'{minute // 60:02d}:{minute % 60:02d}'}
+        minute += duration
+
+
+def run_benchmarks(iterations=50, warmup=5, cold=False, only=None):
+    """
+    Exécuter les scénarios et retourner un rapport sérialisable en JSON.
+    `cold` vide le cache avant chaque appel (sinon le cache est chaud après l'échauffement).
+    Les rendez-vous créés par le scénario create_appointment sont supprimés à la fin.
+    """
+    # Préchauffage du worker fait d'avance : il ne doit pas tourner pendant les mesures
+    current_app.extensions['readiness'].ensure_warm_up(current_app._get_current_object(), wait=True)
+    scenarios, context = build_scenarios()
+    if only:
+        scenarios = [scenario for scenario in scenarios if scenario[0] in only]
+    tokens = {
+        'admin': create_access_token(identity=str(context['admin_id'])),
+        'client': create_access_token(identity=str(context['client_id'])),
+    }
+    client = current_app.test_client()
+    engine = db.engine
+
+    # Repères pour nettoyer les lignes écrites par le scénario de création
+    marks = {model: db.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+             for model in (Appointment, Job, ChangeLog)}
+    db.session.remove()
+
+    results = {}
+    slots = _booking_slots(context['service_duration'])
+    try:
+        for name, method, url, role, body in scenarios:
+            headers = {'Authorization': f'Bearer {tokens[role]}'} if role else {}
+            durations, query_counts = [], []
+            cache.clear()
+            for i in range(warmup + iterations):
+                payload = dict(body, **next(slots)) if name == 'create_appointment' else body
+                if cold:
+                    cache.clear()
+                with count_queries(engine) as counter:
+                    started = time.perf_counter()
+                    response = client.open(url, method=method, headers=headers, json=payload)
+                    elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code >= 400:
+                    raise click.ClickException(f'{name} : HTTP {response.status_code} {response.get_data(as_text=True)[:200]}')
+                if i >= warmup:
+                    durations.append(elapsed)
+                    query_counts.append(counter['queries'])
+            results[name] = dict(summarize(durations, query_counts), method=method, url=url)
+    finally:
+        for model, mark in marks.items():
+            db.session.execute(delete(model).where(model.id > mark))
+        db.session.commit()
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'database': engine.url.database,
+            'iterations': iterations,
+            'warmup': warmup,
+            'cold_cache': cold,
+            'dataset': {
+                'clients': db.session.execute(select(func.count()).select_from(User).where(User.role == 'client')).scalar(),
+                'employees': db.session.execute(select(func.count()).select_from(Employee)).scalar(),
+                'services': db.session.execute(select(func.count()).select_from(Service)).scalar(),
+                'appointments': db.session.execute(select(func.count()).select_from(Appointment)).scalar(),
+            },
+            'parameters': context,
+        },
+        'results': results,
+    }
+
+
+def compare_reports(baseline, current, metric='p50_ms', tolerance=0.1):
+    """
+    Comparer deux rapports scénario par scénario.
+    Retourne [(scénario, avant, après, variation relative, régression ?)].
+    Une hausse du nombre de requêtes SQL compte toujours comme une régression.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        change = (result[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+        regression = change > tolerance or result['queries'] > before['queries']
+        rows.append((name, before, result, change, regression))
+    return rows
+
+
+@click.command('bench')
+@click.option('--iterations', default=50, help='Appels mesurés par scénario')
+@click.option('--warmup', default=5, help="Appels d'échauffement non mesurés")
+@click.option('--cold', is_flag=True, help='Vider le cache avant chaque appel')
+@click.option('--only', multiple=True, help='Limiter à un scénario (option répétable)')
+@click.option('--output', type=click.Path(dir_okay=False), help='Écrire le rapport JSON dans ce fichier')
+@click.option('--compare', 'baseline_path', type=click.Path(exists=True, dir_okay=False),
+              help='Rapport JSON de référence (commit précédent)')
+@click.option('--tolerance', default=0.1, help='Hausse relative du p50 tolérée avant de signaler une régression')
+@with_appcontext
+def bench_command(iterations, warmup, cold, only, output, baseline_path, tolerance):
+    """Mesurer la latence et le nombre de requêtes SQL des routes critiques"""
+    report = run_benchmarks(iterations=iterations, warmup=warmup, cold=cold, only=set(only))
+
+    click.echo(f"{'scénario':<30}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'requêtes':>10}")
+    for name, result in report['results'].items():
+        click.echo(f"{name:<30}{result['p50_ms']:>10.2f}{result['p90_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['queries']:>10g}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        click.echo(f'Rapport écrit dans {output}')
+
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        click.echo(f"\nComparaison avec {baseline['meta'].get('commit') or baseline_path}")
+        regressions = 0
+        for name, before, after, change, regression in compare_reports(baseline, report, tolerance=tolerance):
+            regressions += regression
+            click.echo(f"{name:<30}{before['p50_ms']:>10.2f} -> {after['p50_ms']:<10.2f}{change:>+8.0%}"
+                       f"  requêtes {before['queries']:g} -> {after['queries']:g}{'  RÉGRESSION' if regression else ''}")
+        if regressions:
+            raise SystemExit(1)
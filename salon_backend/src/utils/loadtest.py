@@ -0,0 +1,369 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_jwt_extended import create_access_token
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.orm import aliased
+from werkzeug.security import generate_password_hash
+
+from src.models.models import db, User, Employee, Service, Appointment, ChangeLog, Job, employee_services
+from src.utils.benchmark import percentile
+
+# Test de charge concurrent : des clients virtuels (un thread chacun) démarrent
+# ensemble et enchaînent lectures (disponibilités, catalogue) et écritures
+# (réservation, annulation) sur un même jour, soit dans le processus via le
+# client de test Flask, soit contre un serveur local (--url).
+
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+DEFAULT_MIX = {'availability': 40, 'catalogue': 25, 'book': 25, 'cancel': 10}
+
+
+class _Response:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    def json(self):
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return None
+
+
+class InProcessTransport:
+    """Appels via le client de test Flask (un client par thread virtuel)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def call(method, path, token=None, payload=None):
+            headers = {'Authorization': f'Bearer {token}'} if token else {}
+            response = client.open(path, method=method, headers=headers, json=payload)
+            return _Response(response.status_code, response.get_data(as_text=True))
+        return call
+
+
+class HttpTransport:
+    """Appels HTTP vers un serveur déjà démarré (flask run, gunicorn...)"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def session(self):
+        def call(method, path, token=None, payload=None):
+            data = json.dumps(payload).encode() if payload is not None else None
+            request = urllib.request.Request(self.base_url + path, data=data, method=method)
+            if data is not None:
+                request.add_header('Content-Type', 'application/json')
+            if token:
+                request.add_header('Authorization', f'Bearer {token}')
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return _Response(response.status, response.read().decode('utf-8', 'replace'))
+            except urllib.error.HTTPError as e:
+                return _Response(e.code, e.read().decode('utf-8', 'replace'))
+        return call
+
+
+def _load_test_clients(count):
+    """Ids de `count` clients, en créant les comptes manquants"""
+    ids = db.session.execute(
+        select(User.id).where(User.role == 'client').order_by(User.id).limit(count)
+    ).scalars().all()
+    missing = count - len(ids)
+    if missing > 0:
+        run = db.session.execute(select(func.coalesce(func.max(User.id), 0))).scalar()
+        password_hash = generate_password_hash('client123')
+        db.session.execute(insert(User), [{
+            'email': f'charge{run}-{i}@synthetique.test', 'password_hash': password_hash,
+            'first_name': 'Client', 'last_name': f'Charge {i}', 'role': 'client', 'created_at': datetime.utcnow(),
+        } for i in range(missing)])
+        db.session.commit()
+        ids = db.session.execute(
+            select(User.id).where(User.role == 'client').order_by(User.id).limit(count)
+        ).scalars().all()
+    return ids
+
+
+def find_double_bookings(day):
+    """Paires de rendez-vous actifs qui se chevauchent pour un même employé ce jour-là"""
+    other = aliased(Appointment)
+    return db.session.execute(
+        select(Appointment.id, other.id, Appointment.employee_id)
+        .join(other, and_(
+            other.employee_id == Appointment.employee_id,
+            other.appointment_date == Appointment.appointment_date,
+            other.id > Appointment.id,
+            other.start_time < Appointment.end_time,
+            Appointment.start_time < other.end_time,
+        ))
+        .where(Appointment.appointment_date == day,
+               Appointment.status.in_(ACTIVE_STATUSES), other.status.in_(ACTIVE_STATUSES))
+    ).all()
+
+
+class VirtualClient(threading.Thread):
+    """Un client qui attend le départ commun puis enchaîne les opérations tirées au sort"""
+
+    def __init__(self, harness, index, user_id):
+        super().__init__(name=f'client-{index}', daemon=True)
+        self.harness = harness
+        self.user_id = user_id
+        self.token = create_access_token(identity=str(user_id), expires_delta=timedelta(hours=1))
+        self.rng = random.Random(harness.seed + index)
+        self.booked = []
+
+    def run(self):
+        harness = self.harness
+        call = harness.transport.session()
+        operations, weights = zip(*harness.mix.items())
+        harness.start_barrier.wait()
+        for _ in range(harness.requests_per_client):
+            if harness.deadline and time.perf_counter() > harness.deadline:
+                break
+            operation = self.rng.choices(operations, weights)[0]
+            if operation == 'cancel' and not self.booked:
+                operation = 'book'
+            started = time.perf_counter()
+            try:
+                response = getattr(self, operation)(call)
+                status, body = response.status, response.body
+            except Exception as e:
+                status, body = 'exception', repr(e)
+            harness.record(operation, status, body, (time.perf_counter() - started) * 1000)
+
+    def availability(self, call):
+        harness = self.harness
+        return call('GET', f'/api/appointments/availability?service_id={harness.service_id}'
+                           f'&employee_id={self.rng.choice(harness.employee_ids)}&date={harness.day}', self.token)
+
+    def catalogue(self, call):
+        return call('GET', self.rng.choice(['/api/services/', '/api/booking-data', '/api/salon/info']))
+
+    def book(self, call):
+        harness = self.harness
+        # Les clients visent volontairement les mêmes créneaux pour provoquer la contention
+        response = call('POST', '/api/appointments/', self.token, {
+            'service_id': harness.service_id,
+            'employee_id': self.rng.choice(harness.employee_ids),
+            'appointment_date': harness.day,
+            'start_time': self.rng.choice(harness.start_times),
+        })
+        if response.status == 201:
+            self.booked.append(response.json()['appointment']['id'])
+        return response
+
+    def cancel(self, call):
+        appointment_id = self.booked.pop(self.rng.randrange(len(self.booked)))
+        return call('POST', f'/api/appointments/{appointment_id}/cancel', self.token)
+
+
+class LoadTest:
+    def __init__(self, transport, concurrency=200, requests_per_client=20, duration=None,
+                 day=None, mix=None, seed=1):
+        self.transport = transport
+        self.concurrency = concurrency
+        self.requests_per_client = requests_per_client
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.seed = seed
+        self.deadline = None
+        self.start_barrier = threading.Barrier(concurrency + 1)
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.locked_errors = 0
+        self.errors = Counter()
+
+        today = date.today()
+        self.day = day or (today + timedelta(days=(5 - today.weekday()) % 7 or 7)).isoformat()
+
+    def record(self, operation, status, body, elapsed_ms):
+        with self._lock:
+            self.samples[operation].append(elapsed_ms)
+            self.statuses[operation][str(status)] += 1
+            if 'database is locked' in body:
+                self.locked_errors += 1
+            if status == 'exception' or (isinstance(status, int) and status >= 500):
+                self.errors[body[:120]] += 1
+
+    def prepare(self):
+        """Choisir le service le plus demandé et les employés qui le réalisent, créer les clients virtuels"""
+        self.service_id, duration = db.session.execute(
+            select(Service.id, Service.duration)
+            .join(employee_services, employee_services.c.service_id == Service.id)
+            .join(Employee, Employee.id == employee_services.c.employee_id)
+            .where(Service.is_active == True, Employee.is_active == True)
+            .group_by(Service.id)
+            .order_by(func.count().desc(), Service.duration)
+            .limit(1)
+        ).first()
+        self.employee_ids = db.session.execute(
+            select(employee_services.c.employee_id)
+            .join(Employee, Employee.id == employee_services.c.employee_id)
+            .where(employee_services.c.service_id == self.service_id, Employee.is_active == True)
+        ).scalars().all()
+        # Créneaux de départ d'une journée type, au pas de la durée du service
+        self.start_times = [f'{m // 60:02d}:{m % 60:02d}' for m in range(9 * 60, 19 * 60 - duration + 1, duration)]
+        self.clients = [VirtualClient(self, i, user_id)
+                        for i, user_id in enumerate(_load_test_clients(self.concurrency))]
+
+    def check_shared_database(self):
+        """
+        Avec --url, les clients, la vérification des doubles réservations et le
+        nettoyage passent par la base locale : vérifier que le serveur visé lit la
+        même base (et accepte nos jetons) en comparant un client virtuel vu des deux côtés.
+        """
+        client = self.clients[-1]
+        user = db.session.get(User, client.user_id)
+        response = self.transport.session()('GET', '/api/auth/me', client.token)
+        if response.status in (401, 422):
+            raise click.ClickException(
+                f'Le serveur refuse les jetons du test (HTTP {response.status}) : '
+                'il doit partager la clé JWT et la base de données de cette commande')
+        if response.status != 200 or response.json() != json.loads(json.dumps(user.to_dict())):
+            raise click.ClickException(
+                "Le serveur n'utilise pas la même base de données que cette commande "
+                '(SALON_DATABASE) : doubles réservations et nettoyage seraient faux')
+
+    def run(self):
+        if isinstance(self.transport, InProcessTransport):
+            # Préchauffage du worker fait d'avance : il ne doit pas concurrencer le départ groupé
+            self.transport.app.extensions['readiness'].ensure_warm_up(self.transport.app, wait=True)
+        self.prepare()
+        if isinstance(self.transport, HttpTransport):
+            self.check_shared_database()
+        marks = {model: db.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+                 for model in (Appointment, Job, ChangeLog)}
+        db.session.remove()
+
+        for client in self.clients:
+            client.start()
+        # Départ simultané de tous les clients virtuels
+        self.start_barrier.wait()
+        started = time.perf_counter()
+        if self.duration:
+            self.deadline = started + self.duration
+        for client in self.clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+
+        double_bookings = find_double_bookings(date.fromisoformat(self.day))
+        return self.report(elapsed, double_bookings), marks
+
+    def report(self, elapsed, double_bookings):
+        operations = {}
+        total = 0
+        for operation, durations in self.samples.items():
+            durations = sorted(durations)
+            total += len(durations)
+            operations[operation] = {
+                'requests': len(durations),
+                'p50_ms': round(percentile(durations, 50), 3),
+                'p95_ms': round(percentile(durations, 95), 3),
+                'p99_ms': round(percentile(durations, 99), 3),
+                'max_ms': round(durations[-1], 3),
+                'statuses': dict(self.statuses[operation]),
+            }
+        return {
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+                'transport': type(self.transport).__name__,
+                'concurrency': self.concurrency,
+                'requests_per_client': self.requests_per_client,
+                'duration_limit_s': self.duration,
+                'mix': self.mix,
+                'date': self.day,
+                'service_id': self.service_id,
+                'employee_ids': self.employee_ids,
+            },
+            'elapsed_s': round(elapsed, 3),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 1) if elapsed else None,
+            'database_locked_errors': self.locked_errors,
+            'server_errors': sum(self.errors.values()),
+            'top_errors': self.errors.most_common(5),
+            'double_bookings': [
+                {'appointment_ids': [first, second], 'employee_id': employee_id}
+                for first, second, employee_id in double_bookings
+            ],
+            'operations': operations,
+        }
+
+
+def cleanup(marks):
+    """Supprimer les lignes écrites pendant le test (rendez-vous, tâches, journal)"""
+    for model, mark in marks.items():
+        db.session.execute(delete(model).where(model.id > mark))
+    db.session.commit()
+
+
+def _parse_mix(value):
+    if not value:
+        return None
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise click.BadParameter(f'Opération inconnue : {name}', param_hint='--mix')
+        mix[name] = int(weight)
+    return mix
+
+
+@click.command('loadtest')
+@click.option('--concurrency', default=200, help='Clients virtuels simultanés')
+@click.option('--requests', 'requests_per_client', default=20, help='Requêtes par client virtuel')
+@click.option('--duration', type=float, help='Durée maximale en secondes')
+@click.option('--date', 'day', help='Jour visé par les réservations (par défaut : samedi prochain)')
+@click.option('--mix', help='Pondération des opérations, ex. availability=40,catalogue=25,book=25,cancel=10')
+@click.option('--url', help='Serveur à tester (ex. http://127.0.0.1:5000) ; sinon dans le processus. '
+                            'Le serveur doit utiliser la même base (SALON_DATABASE) et la même clé JWT que '
+                            'cette commande : clients, contrôle des doubles réservations et nettoyage passent '
+                            'par la base locale (vérifié au démarrage)')
+@click.option('--seed', default=1, help='Graine des tirages des clients virtuels')
+@click.option('--output', type=click.Path(dir_okay=False), help='Écrire le rapport JSON dans ce fichier')
+@click.option('--keep', is_flag=True, help='Conserver les rendez-vous créés pendant le test')
+@with_appcontext
+def loadtest_command(concurrency, requests_per_client, duration, day, mix, url, seed, output, keep):
+    """Test de charge concurrent : réservations simultanées sur un même jour"""
+    transport = HttpTransport(url) if url else InProcessTransport(current_app._get_current_object())
+    load_test = LoadTest(transport, concurrency=concurrency, requests_per_client=requests_per_client,
+                         duration=duration, day=day, mix=_parse_mix(mix), seed=seed)
+    report, marks = load_test.run()
+    if not keep:
+        cleanup(marks)
+
+    click.echo(f"{report['requests']} requêtes en {report['elapsed_s']} s, {report['throughput_rps']} req/s "
+               f"({concurrency} clients, {report['meta']['date']})")
+    click.echo(f"{'opération':<15}{'requêtes':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  statuts")
+    for name, result in sorted(report['operations'].items()):
+        statuses = ' '.join(f'{status}:{count}' for status, count in sorted(result['statuses'].items()))
+        click.echo(f"{name:<15}{result['requests']:>10}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                   f"{result['p99_ms']:>10.1f}{result['max_ms']:>10.1f}  {statuses}")
+    click.echo(f"Erreurs « database is locked » : {report['database_locked_errors']}")
+    click.echo(f"Erreurs serveur : {report['server_errors']}")
+    for message, count in report['top_errors']:
+        click.echo(f'  {count} x {message}')
+    click.echo(f"Doubles réservations : {len(report['double_bookings'])}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        click.echo(f'Rapport écrit dans {output}')
+
+    if report['double_bookings']:
+        raise SystemExit(1)
@@ -0,0 +1,66 @@
+from sqlalchemy import inspect, text
+
+# Remplissage des colonnes ajoutées à une table existante, exécuté une fois juste après l'ALTER TABLE
+COLUMN_BACKFILLS = {
+    # Avant source_id, l'archive reprenait l'id de la ligne vivante comme clé primaire
+    ('employee_availability_archive', 'source_id'): 'UPDATE employee_availability_archive SET source_id = id',
+}
+
+
+def apply_migrations(db):
+    """
+    Mettre à niveau une base existante : db.create_all() crée les tables
+    manquantes mais n'ajoute ni colonnes ni index aux tables déjà présentes.
+    Retourne la liste des opérations effectuées.
+    """
+    applied = []
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    ddl += f" DEFAULT {default.text if hasattr(default, 'text') else repr(str(default))}"
+                conn.execute(text(ddl))
+                applied.append(ddl)
+                backfill = COLUMN_BACKFILLS.get((table.name, column.name))
+                if backfill:
+                    conn.execute(text(backfill))
+                    applied.append(backfill)
+
+            existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    applied.append(f'CREATE INDEX {index.name}')
+
+    return applied
+
+
+def pending_migrations(db):
+    """Lister les tables, colonnes et index du modèle absents de la base"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    pending = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            pending.append(table.name)
+            continue
+        existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+        pending.extend(f'{table.name}.{c.name}' for c in table.columns if c.name not in existing_columns)
+        existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+        pending.extend(i.name for i in table.indexes if i.name not in existing_indexes)
+
+    return pending
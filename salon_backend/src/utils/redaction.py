@@ -0,0 +1,14 @@
+from urllib.parse import parse_qsl, urlencode
+
+from flask import request
+
+# Paramètres de requête dont la valeur n'est jamais enregistrée (ex. ticket du flux d'événements)
+SENSITIVE_QUERY_PARAMETERS = {'ticket', 'token', 'access_token', 'refresh_token', 'jwt',
+                              'password', 'secret', 'key', 'api_key', 'signature'}
+
+
+def redacted_query_string():
+    """Chaîne de requête de la requête en cours, valeurs des paramètres sensibles masquées"""
+    pairs = parse_qsl(request.query_string.decode('utf-8', 'replace'), keep_blank_values=True)
+    return urlencode([(name, '[masqué]' if name.lower() in SENSITIVE_QUERY_PARAMETERS else value)
+                      for name, value in pairs])
@@ -0,0 +1,204 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from src.models.models import (
+    db, User, Employee, Service, EmployeeHours, EmployeeAvailability, Appointment, employee_services
+)
+
+# Générateur de bases réalistes pour les benchmarks et tests de charge.
+# Les lignes sont insérées par lots (executemany) directement sur les tables ;
+# les triggers SQLite (compteurs, index de recherche) restent à jour.
+
+FIRST_NAMES = ['Camille', 'Léa', 'Manon', 'Chloé', 'Emma', 'Inès', 'Sarah', 'Julie', 'Laura', 'Marie',
+               'Lucas', 'Hugo', 'Louis', 'Nathan', 'Thomas', 'Arthur', 'Jules', 'Paul', 'Théo', 'Antoine']
+LAST_NAMES = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau',
+              'Simon', 'Laurent', 'Lefebvre', 'Michel', 'Garcia', 'David', 'Bertrand', 'Roux', 'Vincent', 'Fournier']
+
+SERVICE_TEMPLATES = [
+    ('Coupe', 'Coupe', 30, 28.0), ('Coupe longue', 'Coupe', 45, 45.0), ('Coloration', 'Coloration', 90, 65.0),
+    ('Balayage', 'Coloration', 120, 85.0), ('Mèches', 'Coloration', 90, 70.0), ('Brushing', 'Coiffage', 30, 30.0),
+    ('Chignon', 'Coiffage', 60, 55.0), ('Soin', 'Soin', 45, 35.0), ('Lissage', 'Soin', 180, 150.0),
+    ('Barbe', 'Barbe', 20, 15.0),
+]
+
+UNAVAILABILITY_REASONS = ['Congé', 'Maladie', 'Formation', 'Pause']
+
+# Créneaux de la journée de travail générée (lundi à samedi, day_of_week 0 à 5)
+OPENING, CLOSING = time(9, 0), time(19, 0)
+SLOT_MINUTES = 15
+
+BATCH_SIZE = 5000
+
+
+def _insert_batches(table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+def _minutes(t):
+    return t.hour * 60 + t.minute
+
+
+def _time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+def _appointment_status(day, today, rng):
+    roll = rng.random()
+    if day < today:
+        return 'completed' if roll < 0.85 else 'cancelled'
+    if roll < 0.1:
+        return 'cancelled'
+    return 'confirmed' if roll < 0.6 else 'pending'
+
+
+def generate_synthetic_data(employees=10, services=30, clients=5000, years=2, days_ahead=60,
+                            occupancy=0.7, unavailability_rate=0.03, seed=42):
+    """
+    Ajouter à la base un jeu de données synthétique :
+    - `services` services actifs et `employees` employés (lundi-samedi, 9h-19h),
+      chacun qualifié pour une partie des services ;
+    - `clients` clients (mot de passe commun : client123) ;
+    - des rendez-vous sur `years` années passées et `days_ahead` jours à venir,
+      remplissant environ `occupancy` de chaque journée de travail ;
+    - des indisponibilités sur environ `unavailability_rate` des journées.
+    Le générateur est déterministe pour une même graine. Retourne le nombre de lignes créées par table.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.utcnow()
+    password_hash = generate_password_hash('client123')  # Un seul hachage : volontairement coûteux
+    run = db.session.execute(select(func.coalesce(func.max(User.id), 0))).scalar()
+
+    # Services
+    service_rows = []
+    for i in range(services):
+        name, category, duration, price = SERVICE_TEMPLATES[i % len(SERVICE_TEMPLATES)]
+        service_rows.append({
+            'name': f'{name} {i // len(SERVICE_TEMPLATES) + 1}' if i >= len(SERVICE_TEMPLATES) else name,
+            'description': f'{name} (données synthétiques)', 'duration': duration,
+            'price': price, 'category': category, 'is_active': True,
+        })
+    first_service = db.session.execute(select(func.coalesce(func.max(Service.id), 0))).scalar() + 1
+    _insert_batches(Service.__table__, service_rows)
+    service_ids = list(range(first_service, first_service + services))
+    durations = {service_id: row['duration'] for service_id, row in zip(service_ids, service_rows)}
+
+    # Employés : un utilisateur, un profil, des horaires et une partie des services chacun
+    user_rows = [{
+        'email': f'employe{run}-{i}@synthetique.test', 'password_hash': password_hash,
+        'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES),
+        'phone': f'06{rng.randrange(10 ** 8):08d}', 'role': 'employee', 'created_at': now,
+    } for i in range(employees)]
+    _insert_batches(User.__table__, user_rows)
+    employee_user_ids = db.session.execute(
+        select(User.id).where(User.email.like(f'employe{run}-%@synthetique.test')).order_by(User.id)
+    ).scalars().all()
+
+    first_employee = db.session.execute(select(func.coalesce(func.max(Employee.id), 0))).scalar() + 1
+    _insert_batches(Employee.__table__, [{
+        'user_id': user_id, 'bio': 'Profil synthétique', 'specialties': '', 'position': 'Coiffeur',
+        'years_experience': rng.randrange(1, 20), 'is_active': True,
+    } for user_id in employee_user_ids])
+    employee_ids = list(range(first_employee, first_employee + len(employee_user_ids)))
+
+    skills = {
+        employee_id: sorted(rng.sample(service_ids, max(1, int(len(service_ids) * rng.uniform(0.4, 0.8)))))
+        for employee_id in employee_ids
+    }
+    _insert_batches(employee_services, [
+        {'employee_id': employee_id, 'service_id': service_id}
+        for employee_id, ids in skills.items() for service_id in ids
+    ])
+    _insert_batches(EmployeeHours.__table__, [
+        {'employee_id': employee_id, 'day_of_week': day, 'start_time': OPENING, 'end_time': CLOSING}
+        for employee_id in employee_ids for day in range(6)
+    ])
+
+    # Clients
+    _insert_batches(User.__table__, [{
+        'email': f'client{run}-{i}@synthetique.test', 'password_hash': password_hash,
+        'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES),
+        'phone': f'0{rng.choice("67")}{rng.randrange(10 ** 8):08d}', 'role': 'client', 'created_at': now,
+    } for i in range(clients)])
+    client_ids = db.session.execute(
+        select(User.id).where(User.email.like(f'client{run}-%@synthetique.test'))
+    ).scalars().all()
+
+    # Rendez-vous et indisponibilités, journée par journée
+    appointments, unavailabilities = [], []
+    day = today - timedelta(days=365 * years)
+    end = today + timedelta(days=days_ahead)
+    opening, closing = _minutes(OPENING), _minutes(CLOSING)
+    while day <= end:
+        if day.weekday() < 6:
+            for employee_id in employee_ids:
+                blocked = None
+                if rng.random() < unavailability_rate:
+                    if rng.random() < 0.5:
+                        # Journée entière
+                        unavailabilities.append({'employee_id': employee_id, 'date': day, 'start_time': None,
+                                                 'end_time': None, 'is_available': False,
+                                                 'reason': rng.choice(UNAVAILABILITY_REASONS[:3])})
+                        continue
+                    start = rng.randrange(opening, closing - 60, SLOT_MINUTES)
+                    blocked = (start, start + rng.choice([60, 90, 120]))
+                    unavailabilities.append({'employee_id': employee_id, 'date': day, 'start_time': _time(start),
+                                             'end_time': _time(min(blocked[1], closing)), 'is_available': False,
+                                             'reason': 'Pause'})
+
+                cursor = opening
+                while cursor < closing:
+                    service_id = rng.choice(skills[employee_id])
+                    finish = cursor + durations[service_id]
+                    if finish > closing:
+                        break
+                    if blocked and cursor < blocked[1] and finish > blocked[0]:
+                        cursor = blocked[1]
+                        continue
+                    if rng.random() < occupancy:
+                        created = datetime.combine(min(day, today), OPENING) - timedelta(days=rng.randrange(1, 30))
+                        appointments.append({
+                            'client_id': rng.choice(client_ids), 'employee_id': employee_id,
+                            'service_id': service_id, 'appointment_date': day,
+                            'start_time': _time(cursor), 'end_time': _time(finish),
+                            'status': _appointment_status(day, today, rng),
+                            'created_at': created, 'updated_at': created,
+                        })
+                        cursor = finish
+                    else:
+                        cursor += SLOT_MINUTES
+        day += timedelta(days=1)
+
+    _insert_batches(EmployeeAvailability.__table__, unavailabilities)
+    _insert_batches(Appointment.__table__, appointments)
+    db.session.commit()
+
+    return {
+        'services': len(service_rows),
+        'employees': len(employee_ids),
+        'clients': len(client_ids),
+        'appointments': len(appointments),
+        'unavailabilities': len(unavailabilities),
+    }
+
+
+@click.command('generate-data')
+@click.option('--employees', default=10, help="Nombre d'employés")
+@click.option('--services', default=30, help='Nombre de services')
+@click.option('--clients', default=5000, help='Nombre de clients')
+@click.option('--years', default=2, help="Années d'historique de rendez-vous")
+@click.option('--days-ahead', default=60, help='Jours de rendez-vous à venir')
+@click.option('--occupancy', default=0.7, help='Taux de remplissage des journées (0 à 1)')
+@click.option('--unavailability-rate', default=0.03, help='Part des journées avec une indisponibilité')
+@click.option('--seed', default=42, help='Graine aléatoire (même graine, même jeu de données)')
+@with_appcontext
+def generate_data_command(**options):
+    """Remplir la base avec des données synthétiques (à utiliser avec SALON_DATABASE)"""
+    counts = generate_synthetic_data(**options)
+    click.echo(', '.join(f'{count} {table}' for table, count in counts.items()))
@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+# L'application est créée à l'import de src.main, sur la base SALON_DATABASE :
+# une base jetable, créée et peuplée des données de démonstration au premier import
+_DATABASE_DIR = tempfile.mkdtemp(prefix='salon-tests-')
+os.environ['SALON_DATABASE'] = os.path.join(_DATABASE_DIR, 'app.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import app as flask_app  # noqa: E402
+from src.cache import cache  # noqa: E402
+from src.models.models import db  # noqa: E402
+
+ADMIN = {'email': 'admin@elegance-coiffure.fr', 'password': 'admin123'}
+CLIENT = {'email': 'client@test.fr', 'password': 'client123'}
+
+# Copie de la base de démonstration, restaurée avant chaque test
+with flask_app.app_context():
+    db.engine.dispose()
+_PRISTINE_DATABASE = os.path.join(_DATABASE_DIR, 'pristine.db')
+shutil.copyfile(os.environ['SALON_DATABASE'], _PRISTINE_DATABASE)
+
+
+@pytest.fixture(autouse=True)
+def app():
+    """Application sur une base de démonstration neuve, caches vides et préchauffage désactivé"""
+    with flask_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    shutil.copyfile(_PRISTINE_DATABASE, os.environ['SALON_DATABASE'])
+    cache.clear()
+    readiness = flask_app.extensions['readiness']
+    readiness.pid, readiness.status = os.getpid(), 'done'
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _login(client, credentials):
+    response = client.post('/api/auth/login', json=credentials)
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(client):
+    return _login(client, ADMIN)
+
+
+@pytest.fixture
+def client_headers(client):
+    return _login(client, CLIENT)
+
+
+@pytest.fixture
+def next_monday():
+    """Un lundi à venir (jour travaillé par tous les employés de démonstration)"""
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+@pytest.fixture
+def book(client, client_headers, next_monday):
+    """Réserver un rendez-vous pour le client de démonstration ; renvoie la réponse JSON"""
+    def book(start_time='10:00', day=None, service_id=1, employee_id=1, headers=None):
+        response = client.post('/api/appointments/', headers=headers or client_headers, json={
+            'service_id': service_id,
+            'employee_id': employee_id,
+            'appointment_date': (day or next_monday).isoformat(),
+            'start_time': start_time,
+        })
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['appointment']
+    return book
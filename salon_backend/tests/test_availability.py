@@ -0,0 +1,143 @@
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from src.models.models import db, EmployeeAvailability, EmployeeAvailabilityArchive
+from src.utils.archive import archive_availability_command, archive_past_availability
+from src.utils.migrations import apply_migrations
+
+TODAY = date.today()
+
+
+def _add_unavailability(day, reason='Congés', employee_id=1):
+    row = EmployeeAvailability(employee_id=employee_id, date=day, is_available=False, reason=reason)
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def _list(client, headers, employee_id=1, **params):
+    return client.get(f'/api/admin/employees/{employee_id}/availability', headers=headers, query_string=params)
+
+
+def test_list_filters_by_date_range(app, client, admin_headers):
+    with app.app_context():
+        for offset in (1, 5, 10, 20):
+            _add_unavailability(TODAY + timedelta(days=offset), reason=f'J+{offset}')
+        _add_unavailability(TODAY + timedelta(days=5), employee_id=2)
+
+    response = _list(client, admin_headers, start=(TODAY + timedelta(days=5)).isoformat(),
+                     end=(TODAY + timedelta(days=10)).isoformat())
+    assert response.status_code == 200
+    assert [a['reason'] for a in response.get_json()] == ['J+5', 'J+10']
+    assert len(_list(client, admin_headers).get_json()) == 4
+
+
+def test_list_pagination_headers(app, client, admin_headers):
+    with app.app_context():
+        for offset in range(1, 6):
+            _add_unavailability(TODAY + timedelta(days=offset), reason=f'J+{offset}')
+
+    response = _list(client, admin_headers, page=2, per_page=2)
+    assert [a['reason'] for a in response.get_json()] == ['J+3', 'J+4']
+    assert response.headers['X-Total-Count'] == '5'
+    assert response.headers['X-Page'] == '2'
+    assert response.headers['X-Per-Page'] == '2'
+
+    assert _list(client, admin_headers, page=1, per_page=1000).headers['X-Per-Page'] == '200'
+    assert _list(client, admin_headers, page=9, per_page=2).get_json() == []
+
+
+def test_list_errors(client, admin_headers, client_headers):
+    assert _list(client, admin_headers, start='demain').status_code == 400
+    assert _list(client, admin_headers, employee_id=999).status_code == 404
+    assert _list(client, client_headers).status_code == 403
+
+
+def test_archive_moves_only_past_rows(app):
+    with app.app_context():
+        past = [_add_unavailability(TODAY - timedelta(days=d)) for d in (3, 2, 1)]
+        future = _add_unavailability(TODAY + timedelta(days=1))
+
+        assert archive_past_availability(batch_size=2) == 3
+
+        assert db.session.execute(db.select(EmployeeAvailability.id)).scalars().all() == [future]
+        archived = db.session.execute(
+            db.select(EmployeeAvailabilityArchive).order_by(EmployeeAvailabilityArchive.id)
+        ).scalars().all()
+        assert [row.source_id for row in archived] == past
+        assert all(row.archived_at is not None for row in archived)
+        assert archive_past_availability() == 0
+
+
+def test_archive_twice_after_id_reuse(app):
+    with app.app_context():
+        first_id = _add_unavailability(TODAY - timedelta(days=10), reason='Premier')
+        assert archive_past_availability() == 1
+
+        # Table vivante vide : SQLite redonne le même id à la ligne suivante
+        assert _add_unavailability(TODAY - timedelta(days=5), reason='Second') == first_id
+        assert archive_past_availability() == 1
+
+        archived = db.session.execute(
+            db.select(EmployeeAvailabilityArchive).order_by(EmployeeAvailabilityArchive.id)
+        ).scalars().all()
+        assert [(row.source_id, row.reason) for row in archived] == [(first_id, 'Premier'), (first_id, 'Second')]
+        assert archived[0].id != archived[1].id
+
+
+def test_archive_command_keeps_recent_days(app):
+    with app.app_context():
+        _add_unavailability(TODAY - timedelta(days=30))
+        recent = _add_unavailability(TODAY - timedelta(days=2))
+
+    result = app.test_cli_runner().invoke(archive_availability_command, ['--days', '7'])
+    assert result.exit_code == 0, result.output
+    assert '1 indisponibilité(s) archivée(s)' in result.output
+    with app.app_context():
+        assert db.session.execute(db.select(EmployeeAvailability.id)).scalars().all() == [recent]
+
+
+def test_migration_backfills_source_id_of_legacy_archive(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text('DROP TABLE employee_availability_archive'))
+            conn.execute(text("""
+                CREATE TABLE employee_availability_archive (
+                    id INTEGER PRIMARY KEY, employee_id INTEGER NOT NULL, date DATE NOT NULL,
+                    start_time TIME, end_time TIME, is_available BOOLEAN, reason VARCHAR(100), archived_at DATETIME
+                )
+            """))
+            conn.execute(text("INSERT INTO employee_availability_archive (id, employee_id, date, reason) "
+                              "VALUES (7, 1, '2024-01-01', 'Ancien')"))
+
+        applied = apply_migrations(db)
+
+        assert 'UPDATE employee_availability_archive SET source_id = id' in applied
+        assert db.session.execute(text(
+            'SELECT id, source_id FROM employee_availability_archive'
+        )).all() == [(7, 7)]
+        assert apply_migrations(db) == []
+
+
+def test_list_includes_archived_rows_for_past_ranges(app, client, admin_headers):
+    with app.app_context():
+        past = _add_unavailability(TODAY - timedelta(days=10), reason='Archivée')
+        _add_unavailability(TODAY - timedelta(days=2), reason='Passée', employee_id=2)
+        assert archive_past_availability() == 2
+        future = _add_unavailability(TODAY + timedelta(days=3), reason='À venir')
+
+    response = _list(client, admin_headers, start=(TODAY - timedelta(days=30)).isoformat())
+    archived, live = response.get_json()
+    assert archived['reason'] == 'Archivée' and archived['archived'] is True
+    assert archived['source_id'] == past and 'id' not in archived
+    assert live == {'id': future, 'archived': False, 'employee_id': 1, 'date': (TODAY + timedelta(days=3)).isoformat(),
+                    'start_time': None, 'end_time': None, 'is_available': False, 'reason': 'À venir'}
+
+    # Sans borne de début : tout l'historique ; futur seul : pas de lecture de l'archive
+    assert [a['reason'] for a in _list(client, admin_headers).get_json()] == ['Archivée', 'À venir']
+    assert [a['reason'] for a in _list(client, admin_headers, start=TODAY.isoformat()).get_json()] == ['À venir']
+
+    paged = _list(client, admin_headers, page=1, per_page=1)
+    assert paged.headers['X-Total-Count'] == '2'
+    assert [a['reason'] for a in paged.get_json()] == ['Archivée']
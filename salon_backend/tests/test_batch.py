@@ -0,0 +1,135 @@
+from src.changes import load_changes
+from src.events import get_broker
+from src.models.models import db, Appointment, EmployeeHours, Job
+
+
+def _status(client, headers, body):
+    return client.post('/api/admin/appointments/batch/status', headers=headers, json=body)
+
+
+def _cursor(client, headers):
+    return client.get('/api/admin/changes', headers=headers).get_json()['cursor']
+
+
+def test_batch_status_by_ids(app, client, admin_headers, book):
+    first, second = book('09:00'), book('11:00')
+    client.put(f"/api/admin/appointments/{second['id']}/status", headers=admin_headers,
+               json={'status': 'completed'})
+    cursor = _cursor(client, admin_headers)
+
+    response = _status(client, admin_headers, {'ids': [first['id'], second['id'], 9999], 'status': 'completed'})
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['updated'] == 1
+    assert payload['results'] == [
+        {'id': first['id'], 'ok': True, 'changed': True},
+        {'id': second['id'], 'ok': True, 'changed': False},
+        {'id': 9999, 'ok': False, 'error': 'Rendez-vous non trouvé'},
+    ]
+
+    with app.app_context():
+        assert db.session.get(Appointment, first['id']).status == 'completed'
+        # UPDATE groupé hors ORM : la modification est tout de même journalisée
+        changes = load_changes(cursor)['changes']['appointments']
+        assert [a['id'] for a in changes['upserted']] == [first['id']]
+
+
+def test_batch_cancel_by_filter_notifies(app, client, admin_headers, book, next_monday):
+    appointments = [book('09:00'), book('11:00'), book('10:00', employee_id=3, service_id=2)]
+    subscriber = get_broker().subscribe()
+    try:
+        response = _status(client, admin_headers, {
+            'filter': {'date': next_monday.isoformat(), 'employee_id': 1}, 'status': 'cancelled'
+        })
+        assert response.get_json()['updated'] == 2
+        assert subscriber.get(timeout=0) is not None
+        assert subscriber.get(timeout=0) is not None
+        assert subscriber.get(timeout=0) is None
+    finally:
+        get_broker().unsubscribe(subscriber)
+
+    with app.app_context():
+        statuses = {a['id']: db.session.get(Appointment, a['id']).status for a in appointments}
+        notices = db.session.execute(db.select(Job.payload).where(Job.name == 'appointment.cancellation')).scalars()
+        assert len(list(notices)) == 2
+    assert list(statuses.values()) == ['cancelled', 'cancelled', 'pending']
+
+
+def test_batch_status_errors(client, admin_headers, client_headers):
+    assert _status(client, admin_headers, {'ids': [1], 'status': 'archived'}).status_code == 400
+    assert _status(client, admin_headers, {'status': 'completed'}).status_code == 400
+    assert _status(client, admin_headers, {'ids': ['abc'], 'status': 'completed'}).status_code == 400
+    assert _status(client, admin_headers, {'ids': list(range(501)), 'status': 'completed'}).status_code == 400
+    assert _status(client, admin_headers, {'filter': {'date': '14/03'}, 'status': 'completed'}).status_code == 400
+    assert _status(client, client_headers, {'ids': [1], 'status': 'completed'}).status_code == 403
+
+
+def test_batch_delete(app, client, admin_headers, book):
+    first, second = book('09:00'), book('11:00')
+    cursor = _cursor(client, admin_headers)
+    response = client.post('/api/admin/appointments/batch/delete', headers=admin_headers,
+                           json={'ids': [first['id'], first['id'], 9999]})
+    assert response.get_json()['deleted'] == 1
+    assert response.get_json()['results'][1] == {'id': 9999, 'ok': False, 'error': 'Rendez-vous non trouvé'}
+
+    with app.app_context():
+        assert db.session.get(Appointment, first['id']) is None
+        assert db.session.get(Appointment, second['id']) is not None
+        assert load_changes(cursor)['changes']['appointments']['deleted'] == [first['id']]
+
+    assert client.post('/api/admin/appointments/batch/delete', headers=admin_headers,
+                       json={'filter': {}}).status_code == 400
+
+
+def test_batch_employee_hours(app, client, admin_headers):
+    week = [{'day_of_week': day, 'start_time': '10:00', 'end_time': '18:00'} for day in range(1, 6)]
+    response = client.put('/api/admin/employees/hours/batch', headers=admin_headers, json={'items': [
+        {'employee_id': 1, 'hours': week},
+        {'employee_id': 2, 'hours': [{'day_of_week': 9, 'start_time': '10:00', 'end_time': '18:00'}]},
+        {'employee_id': 3, 'hours': [{'day_of_week': 1, 'start_time': '18:00', 'end_time': '10:00'}]},
+        {'employee_id': 999, 'hours': week},
+    ]})
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['updated'] == 1
+    assert [(r['employee_id'], r['ok']) for r in payload['results']] == [(1, True), (2, False), (3, False), (999, False)]
+    assert payload['results'][0]['changed'] is True
+
+    with app.app_context():
+        hours = db.session.execute(
+            db.select(EmployeeHours.day_of_week, EmployeeHours.start_time).where(EmployeeHours.employee_id == 1)
+            .order_by(EmployeeHours.day_of_week)
+        ).all()
+        assert [(day, start.strftime('%H:%M')) for day, start in hours] == [(day, '10:00') for day in range(1, 6)]
+        # Horaires des employés en erreur inchangés
+        assert db.session.execute(
+            db.select(db.func.count()).select_from(EmployeeHours).where(EmployeeHours.employee_id == 2)
+        ).scalar() == 6
+
+
+def test_batch_same_week_for_several_employees(client, admin_headers):
+    week = [{'day_of_week': 2, 'start_time': '09:00', 'end_time': '12:00'}]
+    body = {'employee_ids': [2, 3], 'hours': week}
+    first = client.put('/api/admin/employees/hours/batch', headers=admin_headers, json=body).get_json()
+    assert [r['changed'] for r in first['results']] == [True, True]
+    # Même semaine renvoyée : rien n'est réécrit
+    again = client.put('/api/admin/employees/hours/batch', headers=admin_headers, json=body).get_json()
+    assert [r['changed'] for r in again['results']] == [False, False]
+
+
+def test_batch_employee_hours_coerces_ids(app, client, admin_headers):
+    week = [{'day_of_week': 2, 'start_time': '09:00', 'end_time': '12:00'}]
+    response = client.put('/api/admin/employees/hours/batch', headers=admin_headers,
+                          json={'employee_ids': ['2', 'abc', None, '999'], 'hours': week})
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['updated'] == 1
+    assert [(r['employee_id'], r['ok'], r.get('status')) for r in payload['results']] == [
+        (2, True, None), ('abc', False, 400), (None, False, 400), (999, False, 404)
+    ]
+    assert payload['results'][1]['error'] == "Identifiant d'employé invalide"
+
+    with app.app_context():
+        assert db.session.execute(
+            db.select(db.func.count()).select_from(EmployeeHours).where(EmployeeHours.employee_id == 2)
+        ).scalar() == 1
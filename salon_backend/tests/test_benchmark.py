@@ -0,0 +1,110 @@
+import click
+import pytest
+from sqlalchemy import func, select
+
+from src.counters import get_counters
+from src.models.models import db, employee_services, Appointment, ChangeLog, Job, User
+from src.utils.benchmark import build_scenarios, compare_reports, percentile, run_benchmarks, summarize
+from src.utils.synthetic_data import generate_data_command, generate_synthetic_data
+
+SMALL = dict(employees=2, services=4, clients=20, years=0, days_ahead=6, occupancy=0.5, seed=7)
+
+
+def _snapshot():
+    rows = db.session.execute(
+        select(Appointment.employee_id, Appointment.service_id, Appointment.appointment_date,
+               Appointment.start_time, Appointment.status)
+        .where(Appointment.client_id.in_(select(User.id).where(User.email.like('client%@synthetique.test'))))
+        .order_by(Appointment.appointment_date, Appointment.employee_id, Appointment.start_time)
+    ).all()
+    return [tuple(row) for row in rows]
+
+
+def test_generated_rows_match_counts_and_counters(app):
+    with app.app_context():
+        counts = generate_synthetic_data(**SMALL)
+        assert counts['services'] == 4 and counts['employees'] == 2 and counts['clients'] == 20
+        assert counts['appointments'] == len(_snapshot()) > 0
+        assert User.query.filter(User.email.like('client%@synthetique.test')).count() == 20
+
+        # Insertions par lots : les triggers tiennent les compteurs à jour
+        counters = get_counters('users.client', 'appointments')
+        assert counters['users.client'] == User.query.filter_by(role='client').count()
+        assert counters['appointments'] == Appointment.query.count()
+
+
+def test_same_seed_same_dataset(app):
+    with app.app_context():
+        generate_synthetic_data(**SMALL)
+        first = _snapshot()
+    with app.app_context():
+        db.session.execute(db.delete(Appointment).where(Appointment.id > 0))
+        db.session.commit()
+        generate_synthetic_data(**SMALL)
+        second = _snapshot()
+    # Les identifiants changent d'un lancement à l'autre, pas la forme des rendez-vous
+    assert [row[2:] for row in first] == [row[2:] for row in second]
+
+
+def test_generate_data_command(app):
+    result = app.test_cli_runner().invoke(generate_data_command, [
+        '--employees', '1', '--services', '2', '--clients', '3', '--years', '0', '--days-ahead', '2'
+    ])
+    assert result.exit_code == 0, result.output
+    assert '3 clients' in result.output
+
+
+def test_percentile_and_summary():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) is None
+
+    summary = summarize([3.0, 1.0, 2.0], [4, 4, 7])
+    assert summary['iterations'] == 3
+    assert summary['min_ms'] == 1.0 and summary['p50_ms'] == 2.0 and summary['max_ms'] == 3.0
+    assert summary['queries'] == 5.0 and summary['max_queries'] == 7
+
+
+def test_compare_reports_flags_regressions():
+    baseline = {'results': {
+        'fast': {'p50_ms': 10.0, 'queries': 3},
+        'stable': {'p50_ms': 10.0, 'queries': 3},
+        'chatty': {'p50_ms': 10.0, 'queries': 3},
+    }}
+    current = {'results': {
+        'fast': {'p50_ms': 12.0, 'queries': 3},
+        'stable': {'p50_ms': 10.5, 'queries': 3},
+        'chatty': {'p50_ms': 9.0, 'queries': 4},
+        'new': {'p50_ms': 1.0, 'queries': 1},
+    }}
+    rows = {name: (change, regression) for name, _, _, change, regression in compare_reports(baseline, current)}
+    assert set(rows) == {'fast', 'stable', 'chatty'}
+    assert rows['fast'] == (pytest.approx(0.2), True)
+    assert rows['stable'][1] is False
+    assert rows['chatty'][1] is True  # Une requête SQL de plus : régression même plus rapide
+
+
+def test_run_benchmarks_cleans_up(app, book):
+    book('10:00')
+    with app.app_context():
+        before = {model: db.session.execute(select(func.count()).select_from(model)).scalar()
+                  for model in (Appointment, Job, ChangeLog)}
+        report = run_benchmarks(iterations=2, warmup=1, only={'booking_data', 'create_appointment', 'admin_stats'})
+        after = {model: db.session.execute(select(func.count()).select_from(model)).scalar()
+                 for model in (Appointment, Job, ChangeLog)}
+
+    assert set(report['results']) == {'booking_data', 'create_appointment', 'admin_stats'}
+    assert report['results']['booking_data']['iterations'] == 2
+    assert report['meta']['warmup'] == 1
+    # Les rendez-vous créés par le scénario de création sont supprimés
+    assert after == before
+
+
+def test_build_scenarios_requires_a_bookable_service(app):
+    with app.app_context():
+        db.session.execute(employee_services.delete())
+        db.session.commit()
+        with pytest.raises(click.ClickException, match='au moins un service'):
+            build_scenarios()
@@ -0,0 +1,119 @@
+from datetime import date, time, timedelta
+
+from sqlalchemy import event
+
+from src.models.models import db, ClosedDate, EmployeeAvailability, EmployeeAvailabilityArchive
+
+
+def _calendar(client, headers, **params):
+    return client.get('/api/admin/calendar', headers=headers, query_string=params)
+
+
+def _sql_queries(app, send):
+    """Nombre d'instructions SQL exécutées par send()"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        assert send().status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return len(statements)
+
+
+def _employee(payload, employee_id):
+    return next(emp for emp in payload['employees'] if emp['id'] == employee_id)
+
+
+def test_calendar_groups_appointments_and_unavailabilities(client, admin_headers, book, next_monday):
+    appointment = book('10:00')
+    client.post('/api/admin/employees/1/availability', headers=admin_headers, json={
+        'date': next_monday.isoformat(), 'start_time': '14:00', 'end_time': '16:00',
+        'is_available': False, 'reason': 'Formation'
+    })
+
+    response = _calendar(client, admin_headers, start=next_monday.isoformat(),
+                         end=(next_monday + timedelta(days=6)).isoformat())
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert len(payload['employees']) == 3
+
+    sophie = _employee(payload, 1)
+    assert len(sophie['working_hours']) == 6
+    day = sophie['days'][next_monday.isoformat()]
+    assert [a['id'] for a in day['appointments']] == [appointment['id']]
+    assert day['appointments'][0]['client_name'] == 'Jean Dupont'
+    assert day['unavailabilities'][0]['reason'] == 'Formation'
+    assert _employee(payload, 2)['days'] == {}
+
+
+def test_calendar_query_count_does_not_grow_with_appointments(app, client, admin_headers, book, next_monday):
+    params = {'start': next_monday.isoformat(), 'end': next_monday.isoformat()}
+    book('09:00')
+    first = _sql_queries(app, lambda: _calendar(client, admin_headers, **params))
+    for start_time in ('11:00', '13:00', '15:00'):
+        book(start_time)
+    book('10:00', employee_id=2, service_id=4)
+    assert _sql_queries(app, lambda: _calendar(client, admin_headers, **params)) == first
+
+
+def test_calendar_filters_on_employee(client, admin_headers, next_monday):
+    response = _calendar(client, admin_headers, start=next_monday.isoformat(), end=next_monday.isoformat(),
+                         employee_id=2)
+    assert [emp['id'] for emp in response.get_json()['employees']] == [2]
+
+
+def test_calendar_includes_closed_dates(app, client, admin_headers, next_monday):
+    with app.app_context():
+        db.session.add(ClosedDate(date=next_monday + timedelta(days=1), reason='Férié'))
+        db.session.commit()
+
+    response = _calendar(client, admin_headers, start=next_monday.isoformat(),
+                         end=(next_monday + timedelta(days=2)).isoformat())
+    assert [closed['reason'] for closed in response.get_json()['closed_dates']] == ['Férié']
+
+
+def test_calendar_marks_archived_unavailabilities(app, client, admin_headers):
+    past_day = date.today() - timedelta(days=30)
+    with app.app_context():
+        db.session.add(EmployeeAvailabilityArchive(employee_id=1, date=past_day, is_available=False,
+                                                   reason='Congés', source_id=7))
+        db.session.add(EmployeeAvailability(employee_id=1, date=past_day, start_time=time(9, 0),
+                                            end_time=time(10, 0), is_available=False, reason='Pause'))
+        db.session.commit()
+
+    response = _calendar(client, admin_headers, start=past_day.isoformat(),
+                         end=(past_day + timedelta(days=2)).isoformat())
+    live, archived = _employee(response.get_json(), 1)['days'][past_day.isoformat()]['unavailabilities']
+    assert live['reason'] == 'Pause' and live['archived'] is False and live['id'] == 1
+    # L'id de l'archive ne doit pas pouvoir être pris pour celui d'une ligne vivante
+    assert archived['reason'] == 'Congés' and archived['archived'] is True
+    assert archived['source_id'] == 7 and 'id' not in archived
+
+
+def test_calendar_rejects_invalid_ranges(client, admin_headers):
+    assert _calendar(client, admin_headers).status_code == 400
+    assert _calendar(client, admin_headers, start='2025-01-01').status_code == 400
+    assert _calendar(client, admin_headers, start='01/01/2025', end='2025-01-07').status_code == 400
+    assert _calendar(client, admin_headers, start='2025-01-07', end='2025-01-01').status_code == 400
+    assert _calendar(client, admin_headers, start='2025-01-01', end='2025-06-01').status_code == 400
+
+
+def test_calendar_requires_admin(client, client_headers):
+    assert _calendar(client, client_headers, start='2025-01-01', end='2025-01-07').status_code == 403
+
+
+def test_unexpected_value_error_is_a_server_error(app, client, admin_headers, monkeypatch):
+    with app.app_context():
+        db.session.add(ClosedDate(date=date(2025, 1, 2), reason='Férié'))
+        db.session.commit()
+
+    def broken_to_dict(self):
+        raise ValueError('donnée corrompue')
+    monkeypatch.setattr(ClosedDate, 'to_dict', broken_to_dict)
+
+    assert _calendar(client, admin_headers, start='2025-01-01', end='2025-01-07').status_code == 500
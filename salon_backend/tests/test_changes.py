@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from src.changes import prune_changes, prune_changes_command
+from src.models.models import db, ChangeLog
+
+
+def _changes(client, headers, since=None, **params):
+    if since is not None:
+        params['since'] = since
+    return client.get('/api/admin/changes', headers=headers, query_string=params)
+
+
+def _cursor(client, headers):
+    return _changes(client, headers).get_json()['cursor']
+
+
+def _prune_all(app):
+    with app.app_context():
+        return prune_changes(datetime.utcnow() + timedelta(days=1))
+
+
+def test_changes_since_cursor(client, admin_headers, book):
+    list_response = client.get('/api/admin/appointments', headers=admin_headers)
+    cursor = int(list_response.headers['X-Change-Cursor'])
+    assert cursor == _cursor(client, admin_headers)
+
+    appointment = book('10:00')
+    client.put(f"/api/admin/appointments/{appointment['id']}/status", headers=admin_headers,
+               json={'status': 'confirmed'})
+
+    payload = _changes(client, admin_headers, cursor).get_json()
+    assert payload['cursor'] > cursor
+    assert payload['has_more'] is False
+    upserted = payload['changes']['appointments']['upserted']
+    assert [(a['id'], a['status']) for a in upserted] == [(appointment['id'], 'confirmed')]
+
+    # Rien de nouveau depuis le curseur renvoyé
+    later = _changes(client, admin_headers, payload['cursor']).get_json()
+    assert later['cursor'] == payload['cursor']
+    assert later['changes']['appointments'] == {'upserted': [], 'deleted': []}
+
+
+def test_deleted_rows_are_listed(client, admin_headers, book):
+    appointment = book('10:00')
+    cursor = _cursor(client, admin_headers)
+    assert client.delete(f"/api/admin/appointments/{appointment['id']}", headers=admin_headers).status_code == 200
+
+    changes = _changes(client, admin_headers, cursor).get_json()['changes']
+    assert changes['appointments'] == {'upserted': [], 'deleted': [appointment['id']]}
+
+
+def test_changes_are_paginated(client, admin_headers, book):
+    cursor = _cursor(client, admin_headers)
+    for start_time in ('09:00', '11:00', '14:00'):
+        book(start_time)
+
+    first = _changes(client, admin_headers, cursor, limit=2).get_json()
+    assert first['has_more'] is True
+    second = _changes(client, admin_headers, first['cursor'], limit=2).get_json()
+    assert second['has_more'] is False
+    ids = [a['id'] for page in (first, second) for a in page['changes']['appointments']['upserted']]
+    assert len(set(ids)) == 3
+
+
+def test_full_prune_expires_old_cursors(app, client, admin_headers, book):
+    book('10:00')
+    old_cursor = _cursor(client, admin_headers) - 1
+    assert _prune_all(app) > 0
+
+    response = _changes(client, admin_headers, old_cursor)
+    assert response.status_code == 410
+    assert response.get_json()['resync'] is True
+
+    # Le curseur courant survit à la purge : seules les nouvelles modifications sont renvoyées
+    cursor = _cursor(client, admin_headers)
+    assert cursor == old_cursor + 1
+    assert _changes(client, admin_headers, cursor).status_code == 200
+    appointment = book('14:00')
+    upserted = _changes(client, admin_headers, cursor).get_json()['changes']['appointments']['upserted']
+    assert [a['id'] for a in upserted] == [appointment['id']]
+
+
+def test_partial_prune(app, client, admin_headers, book):
+    book('10:00')
+    with app.app_context():
+        boundary = db.session.execute(db.select(db.func.max(ChangeLog.id))).scalar()
+        db.session.execute(db.update(ChangeLog).values(changed_at=datetime.utcnow() - timedelta(days=60)))
+        db.session.commit()
+    book('14:00')
+
+    result = app.test_cli_runner().invoke(prune_changes_command, ['--days', '30'])
+    assert result.exit_code == 0, result.output
+    assert _changes(client, admin_headers, boundary - 1).status_code == 410
+    assert _changes(client, admin_headers, boundary).status_code == 200
+
+
+def test_cursor_ahead_of_the_log_is_rejected(client, admin_headers):
+    cursor = _cursor(client, admin_headers)
+    assert _changes(client, admin_headers, cursor + 1).status_code == 410
+
+
+def test_changes_require_admin(client, client_headers):
+    assert _changes(client, client_headers, 0).status_code == 403
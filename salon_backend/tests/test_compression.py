@@ -0,0 +1,53 @@
+import gzip
+
+from src.compression import precompress_directory
+from src.static_files import send_static_asset
+
+
+def test_large_json_is_gzipped(client):
+    plain = client.get('/api/services/')
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.data) >= 1024
+
+    response = client.get('/api/services/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_small_json_is_not_compressed(client):
+    response = client.get('/api/salon/hours', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert len(response.data) < 1024
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_precompress_directory(tmp_path):
+    (tmp_path / 'app.js').write_text('console.log("salon");\n' * 100)
+    (tmp_path / 'tiny.css').write_text('a{}')
+    (tmp_path / 'photo.jpg').write_bytes(b'\xff\xd8' * 1000)
+
+    assert precompress_directory(str(tmp_path)) == 1
+    assert gzip.decompress((tmp_path / 'app.js.gz').read_bytes()) == (tmp_path / 'app.js').read_bytes()
+    assert not (tmp_path / 'tiny.css.gz').exists()
+    assert not (tmp_path / 'photo.jpg.gz').exists()
+    # Variante à jour : rien à réécrire
+    assert precompress_directory(str(tmp_path)) == 0
+
+
+def test_send_static_asset_prefers_precompressed_variant(app, tmp_path):
+    (tmp_path / 'app.js').write_text('console.log("salon");\n' * 100)
+    precompress_directory(str(tmp_path))
+
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = send_static_asset(str(tmp_path), 'app.js')
+        response.direct_passthrough = False
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.mimetype in ('text/javascript', 'application/javascript')
+        assert response.get_data() == (tmp_path / 'app.js.gz').read_bytes()
+
+    with app.test_request_context():
+        response = send_static_asset(str(tmp_path), 'app.js')
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers['Vary']
+
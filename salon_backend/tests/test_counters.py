@@ -0,0 +1,77 @@
+from sqlalchemy import text
+
+from src.counters import get_counter, get_counters, init_counters, rebuild_counters_command
+from src.models.models import db, Appointment, User
+
+
+def _expected(app):
+    with app.app_context():
+        return {
+            'users.client': User.query.filter_by(role='client').count(),
+            'appointments': Appointment.query.count(),
+            'appointments.pending': Appointment.query.filter_by(status='pending').count(),
+            'appointments.cancelled': Appointment.query.filter_by(status='cancelled').count(),
+        }
+
+
+def _counters(app):
+    with app.app_context():
+        return get_counters('users.client', 'appointments', 'appointments.pending', 'appointments.cancelled')
+
+
+def test_counters_follow_orm_and_bulk_writes(app, client, admin_headers, book):
+    first, second = book('09:00'), book('11:00')
+    client.post('/api/admin/clients', headers=admin_headers, json={
+        'email': 'nouveau@test.fr', 'first_name': 'Nouveau', 'last_name': 'Client'
+    })
+    client.post('/api/admin/appointments/batch/status', headers=admin_headers,
+                json={'ids': [first['id']], 'status': 'cancelled'})
+    client.post('/api/admin/appointments/batch/delete', headers=admin_headers, json={'ids': [second['id']]})
+    with app.app_context():
+        db.session.execute(db.update(User).where(User.email == 'nouveau@test.fr').values(role='employee'))
+        db.session.commit()
+
+    assert _counters(app) == _expected(app) == {
+        'users.client': 1, 'appointments': 1, 'appointments.pending': 0, 'appointments.cancelled': 1
+    }
+
+
+def test_missing_counter_is_zero(app):
+    with app.app_context():
+        assert get_counter('appointments.unknown') == 0
+
+
+def test_dashboard_reads_counters(client, admin_headers, book):
+    book('09:00')
+    stats = client.get('/api/admin/stats', headers=admin_headers).get_json()
+    assert stats['total_clients'] == 1
+    assert stats['total_employees'] == 3
+    assert stats['appointments_by_status']['pending'] == 1
+
+
+def test_rebuild_fixes_drift(app):
+    with app.app_context():
+        db.session.execute(text("UPDATE counters SET value = 42 WHERE name = 'users.client'"))
+        db.session.commit()
+    result = app.test_cli_runner().invoke(rebuild_counters_command)
+    assert result.exit_code == 0, result.output
+    assert _counters(app)['users.client'] == 1
+
+
+def test_missing_triggers_are_recreated(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text('DROP TRIGGER counters_users_insert'))
+            conn.execute(text("INSERT INTO users (email, password_hash, first_name, last_name, role) "
+                              "VALUES ('sans@trigger.fr', '-', 'Sans', 'Trigger', 'client')"))
+        assert get_counter('users.client') == 1
+
+        assert init_counters(db) is True
+        assert get_counter('users.client') == 2
+        assert init_counters(db) is False
+
+
+def test_role_index_exists(app):
+    with app.app_context():
+        indexes = db.session.execute(text("SELECT name FROM sqlite_master WHERE tbl_name = 'users'")).scalars()
+        assert 'ix_users_role' in set(indexes)
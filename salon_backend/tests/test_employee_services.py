@@ -0,0 +1,68 @@
+from src.cache import cache
+from src.changes import load_changes
+from src.employee_services import (
+    SERVICES_LIST_CACHE_KEY, assigned_service_ids, employees_by_service_cache_key, sync_employee_services
+)
+from src.models.models import db
+
+
+def _employee_ids(client, service_id):
+    return [emp['id'] for emp in client.get(f'/api/employees/by-service/{service_id}').get_json()]
+
+
+def test_sync_writes_additions_and_removals(app):
+    with app.app_context():
+        cursor = load_changes(0, limit=1000)['cursor']
+        # Marc : Coupe Homme (2), Brushing (7), Coupe + Barbe (10)
+        assert assigned_service_ids(3) == {2, 7, 10}
+        assert sync_employee_services(3, [2, 10, 1, 999]) == {1, 7}
+        db.session.commit()
+
+        assert assigned_service_ids(3) == {1, 2, 10}
+        changes = load_changes(cursor)['changes']['employees']
+        assert [emp['id'] for emp in changes['upserted']] == [3]
+        assert sync_employee_services(3, ['1', 2, 10]) == set()
+
+
+def test_update_invalidates_only_affected_services(client, admin_headers):
+    assert 3 not in _employee_ids(client, 1)
+    assert 3 in _employee_ids(client, 7)
+    _employee_ids(client, 4)  # Coloration : Marc n'est pas concerné
+    client.get('/api/services/')
+
+    response = client.put('/api/admin/employees/3', headers=admin_headers, json={'service_ids': [1, 2, 10]})
+    assert response.status_code == 200
+
+    assert cache.get(SERVICES_LIST_CACHE_KEY) is None
+    assert cache.get(employees_by_service_cache_key(1)) is None
+    assert cache.get(employees_by_service_cache_key(4)) is not None
+    assert 3 in _employee_ids(client, 1)
+    assert 3 not in _employee_ids(client, 7)
+
+
+def test_profile_update_invalidates_assigned_services(client, admin_headers):
+    _employee_ids(client, 2)
+    _employee_ids(client, 4)
+    client.put('/api/admin/employees/3', headers=admin_headers, json={'first_name': 'Marcel'})
+
+    assert cache.get(employees_by_service_cache_key(2)) is None
+    assert cache.get(employees_by_service_cache_key(4)) is not None
+    names = [emp['first_name'] for emp in client.get('/api/employees/by-service/2').get_json()]
+    assert 'Marcel' in names
+
+
+def test_create_and_delete_employee(client, admin_headers):
+    assert len(_employee_ids(client, 8)) == 2  # Soin Capillaire : Sophie et Julie
+    response = client.post('/api/admin/employees', headers=admin_headers, json={
+        'email': 'lea@elegance-coiffure.fr', 'first_name': 'Léa', 'last_name': 'Moreau', 'service_ids': [8, 999]
+    })
+    assert response.status_code == 201
+    employee_id = response.get_json()['employee']['id']
+    assert employee_id in _employee_ids(client, 8)
+
+    assert client.delete(f'/api/admin/employees/{employee_id}', headers=admin_headers).status_code == 200
+    assert employee_id not in _employee_ids(client, 8)
+    assert client.get(f'/api/employees/{employee_id}').status_code == 404
+    assert client.post('/api/auth/login', json={
+        'email': 'lea@elegance-coiffure.fr', 'password': 'password123'
+    }).status_code == 401
@@ -0,0 +1,172 @@
+import json
+import logging
+
+import pytest
+
+from src import events
+from src.events import EventBroker, RedisBackend, Subscriber, format_event, issue_events_ticket
+from src.models.models import User
+from src.routes import admin
+
+
+def _ticket(client, headers):
+    response = client.post('/api/admin/events/ticket', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['expires_in'] == admin.EVENTS_TICKET_LIFETIME
+    return response.get_json()['ticket']
+
+
+def _open_stream(client, ticket):
+    return client.get('/api/admin/events', query_string={'ticket': ticket}, buffered=False)
+
+
+def _parse(frame):
+    fields = dict(line.split(': ', 1) for line in frame.strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+
+def test_format_event():
+    assert format_event('appointment', {'id': 1}, 7) == 'id: 7\nevent: appointment\ndata: {"id":1}\n\n'
+
+
+def test_slow_subscriber_gets_a_single_resync():
+    subscriber = Subscriber(maxsize=2)
+    for i in range(5):
+        subscriber.put(format_event('appointment', {'id': i}))
+    assert subscriber.get(timeout=0) == format_event('resync', {})
+    assert subscriber.get(timeout=0) is None
+
+    subscriber.put('après')
+    assert subscriber.get(timeout=0) == 'après'
+
+
+def test_broker_delivers_to_every_subscriber():
+    broker = EventBroker()
+    first, second = broker.subscribe(), broker.subscribe()
+    broker.publish('appointment', {'id': 1})
+    broker.unsubscribe(second)
+    broker.publish('appointment', {'id': 2})
+
+    assert [_parse(first.get(timeout=0))[1]['id'] for _ in range(2)] == [1, 2]
+    assert _parse(second.get(timeout=0))[1]['id'] == 1
+    assert second.get(timeout=0) is None
+    assert broker.subscriber_count == 1
+
+
+def test_stream_receives_booking_events(client, admin_headers, book):
+    response = _open_stream(client, _ticket(client, admin_headers))
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    stream = iter(response.response)
+    assert next(stream).startswith(b'retry:')
+    appointment = book('10:00')
+    event_type, data = _parse(next(stream).decode('utf-8'))
+    assert event_type == 'appointment'
+    assert data['action'] == 'created'
+    assert data['id'] == appointment['id']
+
+    subscribers = events.get_broker().subscriber_count
+    response.close()
+    assert events.get_broker().subscriber_count == subscribers - 1
+
+
+def test_ticket_is_not_a_bearer_token(client, admin_headers):
+    ticket = _ticket(client, admin_headers)
+    headers = {'Authorization': f'Bearer {ticket}'}
+    for path in ('/api/admin/appointments', '/api/admin/clients', '/api/auth/me'):
+        assert client.get(path, headers=headers).status_code in (401, 422)
+    assert client.post('/api/admin/events/ticket', headers=headers).status_code in (401, 422)
+
+
+def test_stream_rejects_missing_tampered_and_expired_tickets(client, admin_headers, monkeypatch):
+    ticket = _ticket(client, admin_headers)
+    assert client.get('/api/admin/events').status_code == 401
+    assert _open_stream(client, ticket[:-2] + 'xx').status_code == 401
+    # Un JWT d'accès n'ouvre pas le flux
+    access_token = admin_headers['Authorization'].split(' ', 1)[1]
+    assert _open_stream(client, access_token).status_code == 401
+
+    monkeypatch.setattr(admin, 'EVENTS_TICKET_LIFETIME', -1)
+    assert _open_stream(client, ticket).status_code == 401
+
+
+def test_stream_is_reserved_to_admins(app, client, client_headers):
+    assert client.post('/api/admin/events/ticket', headers=client_headers).status_code == 403
+    with app.test_request_context():
+        client_id = User.query.filter_by(email='client@test.fr').one().id
+        client_ticket = issue_events_ticket(client_id)
+    assert _open_stream(client, client_ticket).status_code == 403
+
+
+def test_stream_subscriber_limit(app, client, admin_headers, monkeypatch):
+    monkeypatch.setitem(app.config, 'EVENTS_MAX_SUBSCRIBERS', 0)
+    assert _open_stream(client, _ticket(client, admin_headers)).status_code == 503
+
+
+def test_publish_failure_is_logged_not_raised(monkeypatch, caplog):
+    class BrokenBroker:
+        def publish(self, event_type, data):
+            raise ConnectionError('redis indisponible')
+    monkeypatch.setattr(events, 'broker', BrokenBroker())
+
+    with caplog.at_level(logging.WARNING, logger='src.events'):
+        events.publish_event('appointment', {'id': 1})
+
+    record = caplog.records[-1]
+    assert record.levelno == logging.WARNING
+    assert record.exc_info[0] is ConnectionError
+
+
+class _StopListening(Exception):
+    pass
+
+
+class _FakePubSub:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.closed = False
+
+    def subscribe(self, channel):
+        if self.outcome == 'refused':
+            raise ConnectionError('connexion refusée')
+
+    def listen(self):
+        yield {'data': b'event: appointment\ndata: {}\n\n'}
+        raise ConnectionError('connexion perdue')
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeRedis:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.pubsubs = []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        self.pubsubs.append(_FakePubSub(self.outcomes.pop(0)))
+        return self.pubsubs[-1]
+
+
+def test_redis_listener_reconnects_with_backoff(monkeypatch):
+    delays = []
+
+    def fake_sleep(delay):
+        delays.append(delay)
+        if len(delays) == 4:
+            raise _StopListening()
+    monkeypatch.setattr(events.time, 'sleep', fake_sleep)
+
+    backend = RedisBackend.__new__(RedisBackend)
+    backend._client = _FakeRedis(['refused', 'refused', 'connected', 'refused'])
+    backend.channel = 'salon-events'
+    delivered = []
+    with pytest.raises(_StopListening):
+        backend._listen(delivered.append)
+
+    # Attente doublée à chaque échec, remise à zéro après un abonnement réussi
+    assert delays == [0.5, 1.0, 0.5, 1.0]
+    assert delivered == ['event: appointment\ndata: {}\n\n']
+    assert all(pubsub.closed for pubsub in backend._client.pubsubs)
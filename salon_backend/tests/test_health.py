@@ -0,0 +1,88 @@
+import logging
+import os
+
+import pytest
+
+import src.health
+
+
+@pytest.fixture
+def readiness(app):
+    return app.extensions['readiness']
+
+
+def test_healthz(client):
+    assert client.get('/healthz').get_json() == {'status': 'ok'}
+
+
+def test_readyz_ready(client):
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'ready', 'checks': {'database': 'ok', 'migrations': 'ok', 'warmup': 'done'}}
+
+
+def test_readyz_during_warm_up_is_503_logged_at_info(client, readiness, caplog):
+    readiness.pid, readiness.status = os.getpid(), 'running'
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['checks']['warmup'] == 'running'
+    [record] = [r for r in caplog.records if r.name == 'src.access']
+    assert record.levelno == logging.INFO and record.status == 503
+
+
+def test_warm_up_fills_caches(app, client, readiness):
+    readiness.status = 'failed'  # Relancé après un échec
+    readiness.ensure_warm_up(app, wait=True)
+    assert readiness.status == 'done' and readiness.duration_ms is not None
+    assert client.get('/readyz').status_code == 200
+    # Catalogue servi depuis le cache, sans requête SQL
+    assert 'SQL x0' in client.get('/api/services/').headers['Server-Timing']
+    assert 'SQL x0' in client.get('/api/employees/by-service/1').headers['Server-Timing']
+
+
+def test_warm_up_once_per_process(app, readiness, monkeypatch):
+    calls = []
+    monkeypatch.setattr(src.health, 'warm_up', calls.append)
+    readiness.ensure_warm_up(app, wait=True)
+    assert calls == []  # Déjà préchauffé dans ce processus
+
+    readiness.pid = None  # Nouveau worker forké
+    readiness.ensure_warm_up(app, wait=True)
+    assert calls == [app] and readiness.status == 'done'
+
+
+def test_failed_warm_up_is_reported_then_retried(app, client, readiness, monkeypatch):
+    def fail(app):
+        raise RuntimeError('/api/services/ : HTTP 500')
+    monkeypatch.setattr(src.health, 'warm_up', fail)
+    readiness.status = 'failed'
+    readiness.ensure_warm_up(app, wait=True)
+    assert readiness.status == 'failed'
+
+    with monkeypatch.context() as patch:
+        # Sans relance en arrière-plan par la sonde elle-même
+        patch.setattr(readiness, 'ensure_warm_up', lambda app, wait=False: None)
+        response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['checks']['warmup'] == 'failed : /api/services/ : HTTP 500'
+
+    monkeypatch.setattr(src.health, 'warm_up', lambda app: None)
+    readiness.ensure_warm_up(app, wait=True)
+    assert client.get('/readyz').status_code == 200
+
+
+def test_readyz_pending_migrations(client, readiness, monkeypatch):
+    monkeypatch.setattr(readiness, 'migrations_ok', False)
+    monkeypatch.setattr(src.health, 'pending_migrations', lambda db: ['appointments.reminder_sent_at'])
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['checks']['migrations'] == {'pending': ['appointments.reminder_sent_at']}
+
+
+def test_readyz_database_unreachable(client, monkeypatch):
+    def unreachable():
+        raise RuntimeError('unable to open database file')
+    monkeypatch.setattr(src.health, 'check_database', unreachable)
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['checks']['database'] == 'erreur : unable to open database file'
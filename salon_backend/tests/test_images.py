@@ -0,0 +1,101 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from src.images import InvalidImageError, generate_variants, process_gallery_image, validate_image
+from src.models.models import db, Gallery
+
+
+def _write_image(path, size=(2000, 1000), mode='RGB', fmt='PNG', exif_orientation=None):
+    image = Image.new(mode, size, (200, 100, 50, 128) if mode == 'RGBA' else (200, 100, 50))
+    options = {}
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        options['exif'] = exif
+    image.save(path, fmt, **options)
+    return path
+
+
+def test_generate_variants_widths_and_formats(tmp_path):
+    source = _write_image(tmp_path / 'source.png', mode='RGBA')
+    variants = generate_variants(str(source), str(tmp_path / 'out'), '/uploads/v', 'photo')
+
+    assert [v['width'] for v in variants['webp']] == [320, 800, 1600]
+    assert [v['width'] for v in variants['jpeg']] == [320, 800, 1600]
+    assert variants['jpeg'][0]['url'] == '/uploads/v/photo-320.jpeg'
+    with Image.open(tmp_path / 'out' / 'photo-800.webp') as img:
+        assert img.size == (800, 400)
+    with Image.open(tmp_path / 'out' / 'photo-1600.jpeg') as img:
+        assert img.mode == 'RGB'
+
+
+def test_small_image_is_not_upscaled(tmp_path):
+    source = _write_image(tmp_path / 'small.png', size=(500, 250))
+    variants = generate_variants(str(source), str(tmp_path / 'out'), '/v', 'small')
+    assert [v['width'] for v in variants['webp']] == [320, 500]
+
+
+def test_exif_orientation_is_applied_and_stripped(tmp_path):
+    # Orientation 6 : photo prise en portrait, stockée couchée
+    source = _write_image(tmp_path / 'portrait.jpg', size=(1000, 500), fmt='JPEG', exif_orientation=6)
+    generate_variants(str(source), str(tmp_path / 'out'), '/v', 'portrait')
+    with Image.open(tmp_path / 'out' / 'portrait-500.jpeg') as img:
+        assert img.size == (500, 1000)
+        assert not img.getexif()
+
+
+def test_validate_image(tmp_path):
+    validate_image(str(_write_image(tmp_path / 'ok.png')))
+
+    (tmp_path / 'fake.jpg').write_text('pas une image')
+    with pytest.raises(InvalidImageError):
+        validate_image(str(tmp_path / 'fake.jpg'))
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (10, 10)).save(buffer, 'BMP')
+    (tmp_path / 'image.bmp').write_bytes(buffer.getvalue())
+    with pytest.raises(InvalidImageError, match='non supporté'):
+        validate_image(str(tmp_path / 'image.bmp'))
+
+
+def _gallery_item():
+    item = Gallery(image_url='/uploads/gallery/x.png', title='Test', processing_status='pending')
+    db.session.add(item)
+    db.session.commit()
+    return item.id
+
+
+def test_process_gallery_image(app, tmp_path):
+    source = _write_image(tmp_path / ('a' * 64 + '.png'))
+    with app.app_context():
+        gallery_id = _gallery_item()
+
+    completed = []
+    process_gallery_image(app, gallery_id, str(source), str(tmp_path / 'variants'), '/v',
+                          on_complete=lambda: completed.append(True))
+
+    with app.app_context():
+        item = db.session.get(Gallery, gallery_id)
+        assert item.processing_status == 'ready'
+        assert item.image_url == '/v/' + 'a' * 64 + '-1600.jpeg'
+        assert len(item.get_variants()['webp']) == 3
+    assert not os.path.exists(source)
+    assert completed == [True]
+
+
+def test_process_gallery_image_failure_keeps_original(app, tmp_path):
+    source = tmp_path / ('b' * 64 + '.png')
+    source.write_text('corrompu')
+    with app.app_context():
+        gallery_id = _gallery_item()
+
+    process_gallery_image(app, gallery_id, str(source), str(tmp_path / 'variants'), '/v')
+
+    with app.app_context():
+        item = db.session.get(Gallery, gallery_id)
+        assert item.processing_status == 'failed'
+        assert item.image_url == '/uploads/gallery/x.png'
+    assert os.path.exists(source)
@@ -0,0 +1,84 @@
+import logging
+import re
+
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from src.cache import cache
+from src.instrumentation import QueryBudgetExceeded, RequestQueries
+from src.models.models import db
+
+
+def _sql_count(response):
+    match = re.search(r'db;dur=[\d.]+;desc="SQL x(\d+)", app;dur=[\d.]+', response.headers['Server-Timing'])
+    assert match, response.headers['Server-Timing']
+    return int(match.group(1))
+
+
+def test_server_timing_counts_queries(client):
+    assert _sql_count(client.get('/api/salon/info')) >= 1
+    # Réponse en cache : aucune requête SQL
+    assert _sql_count(client.get('/api/services/')) >= 1
+    assert _sql_count(client.get('/api/services/')) == 0
+
+
+def test_repeated_statements():
+    queries = RequestQueries()
+    for _ in range(3):
+        queries.add('SELECT * FROM services WHERE id = ?', 0.001, False)
+    queries.add('SELECT * FROM users', 0.001, False)
+    queries.add('INSERT INTO jobs VALUES (?)', 0.001, True)
+    assert queries.count == 5
+    assert queries.repeated(3) == [('SELECT * FROM services WHERE id = ?', 3)]
+    assert queries.repeated(4) == []
+
+
+def test_n_plus_one_warned_once(app, client, monkeypatch, caplog):
+    monkeypatch.setitem(app.config, 'SQL_N_PLUS_ONE_THRESHOLD', 1)
+    caplog.set_level(logging.DEBUG, logger='src.sql')
+
+    client.get('/api/salon/info')
+    first = [r for r in caplog.records if r.name == 'src.sql' and 'N+1 probable' in r.getMessage()]
+    assert first and all(r.levelno == logging.WARNING for r in first)
+    assert first[0].endpoint == 'salon.get_salon_info'
+
+    caplog.clear()
+    cache.clear()  # Sinon la réponse vient du cache, sans SQL
+    client.get('/api/salon/info')
+    again = [r for r in caplog.records if r.name == 'src.sql' and 'N+1 probable' in r.getMessage()]
+    assert again and all(r.levelno == logging.DEBUG for r in again)
+
+
+def test_budget_exceeded_is_logged(app, client, monkeypatch, caplog):
+    monkeypatch.setitem(app.config, 'SQL_QUERY_BUDGETS', {'salon.get_salon_info': 0})
+    response = client.get('/api/salon/info')
+    assert response.status_code == 200
+    assert any('pour un budget de 0' in r.getMessage() and r.levelno == logging.WARNING
+               for r in caplog.records if r.name == 'src.sql')
+
+
+def test_budget_exceeded_fails_in_strict_mode(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'SQL_QUERY_BUDGETS', {'salon.get_salon_info': 0})
+    monkeypatch.setitem(app.config, 'SQL_STRICT_BUDGETS', True)
+    monkeypatch.setitem(app.config, 'PROPAGATE_EXCEPTIONS', True)
+    with pytest.raises(QueryBudgetExceeded, match='salon.get_salon_info'):
+        client.get('/api/salon/info')
+
+    # Dans le budget : aucune erreur
+    monkeypatch.setitem(app.config, 'SQL_QUERY_BUDGETS', {'salon.get_salon_info': 50})
+    assert client.get('/api/salon/info').status_code == 200
+
+
+def test_failed_statement_leaves_no_timing_behind(app):
+    with app.test_request_context('/api/salon/info'):
+        app.preprocess_request()
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(IntegrityError):
+                    conn.execute(text("INSERT INTO users (id, email, password_hash, first_name, last_name)"
+                                      " VALUES (1, 'x', 'x', 'x', 'x')"))
+            assert conn.info['query_started'] == []
+            conn.execute(text('SELECT 1'))
+        assert g.sql_queries.count == 1
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import jobs, notifications
+from src.jobs import claim_next, enqueue, job, retry_delay, run_job, run_worker
+from src.models.models import db, Job
+
+calls = []
+
+
+@job('test.record')
+def record(value):
+    calls.append(value)
+
+
+@job('test.fail')
+def fail():
+    raise RuntimeError('serveur SMTP indisponible')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+@pytest.fixture
+def sent_emails(monkeypatch):
+    sent = []
+    monkeypatch.setattr(notifications, 'send_email', lambda to, subject, body: sent.append((to, subject)))
+    return sent
+
+
+def _jobs(name=None):
+    query = db.select(Job).order_by(Job.id)
+    if name:
+        query = query.where(Job.name == name)
+    return db.session.execute(query).scalars().all()
+
+
+def test_enqueue_is_idempotent_and_transactional(app):
+    with app.app_context():
+        assert enqueue('test.record', {'value': 1}, idempotency_key='record:1') is True
+        assert enqueue('test.record', {'value': 2}, idempotency_key='record:1') is False
+        db.session.commit()
+        enqueue('test.record', {'value': 3}, idempotency_key='record:3')
+        db.session.rollback()
+
+        assert [j.get_payload() for j in _jobs('test.record')] == [{'value': 1}]
+        with pytest.raises(ValueError):
+            enqueue('test.unknown')
+
+
+def test_claim_and_run(app):
+    with app.app_context():
+        enqueue('test.record', {'value': 'maintenant'})
+        enqueue('test.record', {'value': 'plus tard'}, run_at=datetime.utcnow() + timedelta(hours=1))
+        db.session.commit()
+
+        claimed = claim_next('worker-a', visibility_timeout=60)
+        assert claimed.get_payload() == {'value': 'maintenant'}
+        assert (claimed.status, claimed.attempts, claimed.locked_by) == ('running', 1, 'worker-a')
+        # Seule tâche prête, déjà réservée
+        assert claim_next('worker-b') is None
+
+        assert run_job(claimed, 'worker-a') is True
+        db.session.expire_all()
+        assert claimed.status == 'done'
+        assert claimed.finished_at is not None and claimed.locked_until is None
+    assert calls == ['maintenant']
+
+
+def test_failed_job_is_retried_with_backoff(app):
+    with app.app_context():
+        enqueue('test.fail', max_attempts=2)
+        db.session.commit()
+
+        first = claim_next('worker-a')
+        before = datetime.utcnow()
+        assert run_job(first, 'worker-a') is False
+        db.session.expire_all()
+        assert first.status == 'queued'
+        assert first.locked_by is None
+        assert first.last_error == 'serveur SMTP indisponible'
+        assert before + timedelta(seconds=23) < first.run_at < before + timedelta(seconds=37)
+        assert claim_next('worker-a') is None
+
+        # Dernier essai : la tâche échoue définitivement
+        first.run_at = datetime.utcnow()
+        db.session.commit()
+        second = claim_next('worker-a')
+        assert second.attempts == 2
+        run_job(second, 'worker-a')
+        db.session.expire_all()
+        assert second.status == 'failed'
+        assert second.finished_at is not None
+
+
+def test_retry_delay_grows_and_is_capped():
+    assert 24 <= retry_delay(1) <= 36
+    assert 48 <= retry_delay(2) <= 72
+    assert retry_delay(20) <= jobs.RETRY_MAX_DELAY * 1.2
+
+
+def test_abandoned_job_is_reclaimed(app):
+    with app.app_context():
+        enqueue('test.record', {'value': 'repris'})
+        db.session.commit()
+        stale = claim_next('worker-a', visibility_timeout=60)
+        stale_id = stale.id
+
+        db.session.execute(db.update(Job).where(Job.id == stale_id)
+                           .values(locked_until=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+        reclaimed = claim_next('worker-b')
+        assert (reclaimed.id, reclaimed.attempts, reclaimed.locked_by) == (stale_id, 2, 'worker-b')
+
+        # Le premier worker termine en retard : il ne doit rien écraser
+        jobs._finish(stale_id, 'worker-a', status='done')
+        db.session.expire_all()
+        assert db.session.get(Job, stale_id).status == 'running'
+        assert run_job(reclaimed, 'worker-b') is True
+
+
+def test_run_worker_sends_booking_emails(app, book, next_monday, sent_emails):
+    book('10:00', day=next_monday + timedelta(days=7))
+    with app.app_context():
+        names = [j.name for j in _jobs()]
+        assert names == ['appointment.confirmation', 'appointment.reminder']
+        assert _jobs('appointment.reminder')[0].run_at > datetime.utcnow()
+
+        assert run_worker(worker_id='test', burst=True) == 1
+    assert sent_emails == [('client@test.fr', 'Votre rendez-vous chez Élégance Coiffure')]
+
+
+def test_worker_command(app, book, next_monday, sent_emails):
+    book('10:00', day=next_monday + timedelta(days=7))
+    result = app.test_cli_runner().invoke(jobs.jobs_worker_command, ['--burst'])
+    assert result.exit_code == 0, result.output
+    assert '1 tâche(s) traitée(s)' in result.output
+
+
+def test_cancellation_notice_per_transition(client, client_headers, admin_headers, book, app):
+    appointment = book('10:00')
+    status_url = f"/api/admin/appointments/{appointment['id']}/status"
+
+    assert client.post(f"/api/appointments/{appointment['id']}/cancel", headers=client_headers).status_code == 200
+    # Rejouer la même annulation ne crée pas de second avis
+    assert client.put(status_url, headers=admin_headers, json={'status': 'cancelled'}).status_code == 200
+    assert client.put(status_url, headers=admin_headers, json={'status': 'confirmed'}).status_code == 200
+    assert client.put(status_url, headers=admin_headers, json={'status': 'cancelled'}).status_code == 200
+
+    with app.app_context():
+        keys = [j.idempotency_key for j in _jobs('appointment.cancellation')]
+    assert len(keys) == len(set(keys)) == 2
+
+
+def test_reminder_skips_moved_or_cancelled_appointments(app, book, sent_emails):
+    appointment = book('10:00')
+    with app.app_context():
+        notifications.send_reminder(appointment['id'], 'autre-date')
+        notifications.send_reminder(appointment['id'] + 1000, 'autre-date')
+    assert sent_emails == []
+
+
+def test_rebooking_a_reused_id_gets_its_own_notifications(client, admin_headers, book, next_monday, app, sent_emails):
+    day = next_monday + timedelta(days=7)
+    first = book('10:00', day=day)
+    assert client.delete(f"/api/admin/appointments/{first['id']}", headers=admin_headers).status_code == 200
+    second = book('11:00', day=day)
+    assert second['id'] == first['id']  # SQLite réattribue l'id supprimé
+
+    with app.app_context():
+        assert len(_jobs('appointment.confirmation')) == 2
+        reminders = _jobs('appointment.reminder')
+        assert len({j.idempotency_key for j in reminders}) == 2
+        # Le rappel de l'ancienne réservation ne part pas pour la nouvelle
+        stale = reminders[0].get_payload()
+        notifications.send_reminder(**dict(stale, scheduled_for=f'{day.isoformat()}T11:00'))
+        assert sent_emails == []
+
+        # Seule la confirmation de la nouvelle réservation est envoyée
+        assert run_worker(worker_id='test', burst=True) == 2
+    assert sent_emails == [('client@test.fr', 'Votre rendez-vous chez Élégance Coiffure')]
+
+    assert client.put(f"/api/admin/appointments/{second['id']}/status", headers=admin_headers,
+                      json={'status': 'cancelled'}).status_code == 200
+    with app.app_context():
+        [cancellation] = _jobs('appointment.cancellation')
+        assert cancellation.get_payload() == {'appointment_id': second['id'], 'booked_at': second['created_at']}
@@ -0,0 +1,63 @@
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+import pytest
+
+from src import json_provider
+from src.json_provider import RawJSON
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def provider(request, app, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip('orjson non installé')
+    return app.json
+
+
+def test_dumps_dates_decimals_and_uuids(provider):
+    value = uuid.UUID('12345678-1234-5678-1234-567812345678')
+    payload = json.loads(provider.dumps({
+        'day': date(2025, 3, 14),
+        'at': datetime(2025, 3, 14, 9, 30),
+        'start': time(9, 30),
+        'price': decimal.Decimal('45.50'),
+        'id': value,
+    }))
+    assert payload['day'] == '2025-03-14'
+    assert payload['at'].startswith('2025-03-14T09:30')
+    assert payload['start'].startswith('09:30')
+    assert payload['price'] == '45.50'
+    assert payload['id'] == str(value)
+
+
+def test_dumps_bytes_is_compact_utf8(provider):
+    data = provider.dumps_bytes({'name': 'Élégance', 'tags': [1, 2]})
+    assert data == '{"name":"Élégance","tags":[1,2]}'.encode('utf-8')
+
+
+def test_raw_json_is_returned_unchanged(provider):
+    raw = RawJSON(b'{"cached":true}')
+    assert provider.dumps_bytes(raw) == b'{"cached":true}'
+    assert provider.dumps(raw) == '{"cached":true}'
+
+
+def test_unknown_type_is_rejected(provider):
+    with pytest.raises(TypeError):
+        provider.dumps({'value': object()})
+
+
+def test_kwargs_fall_back_to_stdlib(app):
+    assert app.json.dumps({'b': 1, 'a': 2}, indent=1) == '{\n "b":1,\n "a":2\n}'
+    assert app.json.dumps({'b': 1, 'a': 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+
+def test_api_response_uses_provider(client):
+    response = client.get('/api/services/')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert b'": ' not in response.data
+    assert isinstance(response.get_json(), list)
@@ -0,0 +1,104 @@
+from datetime import time
+
+import click
+import pytest
+from sqlalchemy import func, select
+
+from src.models.models import db, Appointment, ChangeLog, Job, User
+from src.utils.loadtest import (
+    InProcessTransport, LoadTest, _Response, _parse_mix, cleanup, find_double_bookings, loadtest_command
+)
+
+
+class FakeTransport:
+    """Serveur distant simulé : renvoie toujours la même réponse à /api/auth/me"""
+
+    def __init__(self, status, body):
+        self.response = _Response(status, body)
+        self.calls = []
+
+    def session(self):
+        def call(method, path, token=None, payload=None):
+            self.calls.append((method, path))
+            return self.response
+        return call
+
+
+def _count(model):
+    return db.session.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_in_process_run_reports_without_double_bookings(app):
+    with app.app_context():
+        before = {model: _count(model) for model in (Appointment, Job, ChangeLog)}
+        load_test = LoadTest(InProcessTransport(app), concurrency=6, requests_per_client=5,
+                             mix={'availability': 1, 'book': 3, 'cancel': 1}, seed=3)
+        report, marks = load_test.run()
+        assert report['requests'] == 30
+        assert report['double_bookings'] == []
+        assert report['server_errors'] == 0 and report['database_locked_errors'] == 0
+        assert set(report['operations']) <= {'availability', 'book', 'cancel'}
+        assert report['operations']['book']['statuses'].get('201', 0) > 0
+
+        cleanup(marks)
+        assert {model: _count(model) for model in (Appointment, Job, ChangeLog)} == before
+        # Clients virtuels manquants créés une fois pour toutes
+        assert User.query.filter_by(role='client').count() == 6
+
+
+def test_find_double_bookings(app, book):
+    first = book('10:00')
+    with app.app_context():
+        overlapping = Appointment(client_id=first['client_id'], employee_id=1, service_id=1,
+                                  appointment_date=db.session.get(Appointment, first['id']).appointment_date,
+                                  start_time=time(10, 30), end_time=time(11, 15), status='confirmed')
+        db.session.add(overlapping)
+        db.session.commit()
+        pairs = find_double_bookings(overlapping.appointment_date)
+        assert [(a, b, employee_id) for a, b, employee_id in pairs] == [(first['id'], overlapping.id, 1)]
+
+        overlapping.status = 'cancelled'
+        db.session.commit()
+        assert find_double_bookings(overlapping.appointment_date) == []
+
+
+def test_shared_database_check_accepts_same_database(app):
+    with app.app_context():
+        load_test = LoadTest(InProcessTransport(app), concurrency=2)
+        load_test.prepare()
+        load_test.check_shared_database()
+
+
+def test_shared_database_check_rejects_other_database(app):
+    with app.app_context():
+        load_test = LoadTest(FakeTransport(200, '{"id": 1, "email": "autre@exemple.fr"}'), concurrency=2)
+        load_test.prepare()
+        with pytest.raises(click.ClickException, match='même base de données'):
+            load_test.check_shared_database()
+
+
+def test_shared_database_check_rejects_foreign_jwt_key(app):
+    with app.app_context():
+        transport = FakeTransport(422, '{"msg": "Signature verification failed"}')
+        load_test = LoadTest(transport, concurrency=2)
+        load_test.prepare()
+        with pytest.raises(click.ClickException, match='refuse les jetons'):
+            load_test.check_shared_database()
+    assert transport.calls == [('GET', '/api/auth/me')]
+
+
+def test_parse_mix():
+    assert _parse_mix(None) is None
+    assert _parse_mix('book=3,cancel=1') == {'book': 3, 'cancel': 1}
+    with pytest.raises(click.BadParameter):
+        _parse_mix('delete=1')
+
+
+def test_loadtest_command_cleans_up(app):
+    with app.app_context():
+        appointments = _count(Appointment)
+    result = app.test_cli_runner().invoke(loadtest_command, ['--concurrency', '3', '--requests', '3', '--mix', 'book=1'])
+    assert result.exit_code == 0, result.output
+    assert 'Doubles réservations : 0' in result.output
+    with app.app_context():
+        assert _count(Appointment) == appointments
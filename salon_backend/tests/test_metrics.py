@@ -0,0 +1,101 @@
+import json
+import os
+import re
+import time
+
+from src.metrics import MetricsRegistry, MultiprocessStore, merge_snapshots, render
+
+
+def _sample(text, name, **labels):
+    """Valeur d'un échantillon de l'exposition texte (labels donnés dans l'ordre exposé)"""
+    wanted = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = re.escape(name + ('{' + wanted + '}' if labels else '')) + r' (\S+)$'
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_expose_requests_and_histograms(client):
+    before = client.get('/metrics').get_data(as_text=True)
+    client.get('/api/services/')
+    client.get('/api/services/')
+    text = client.get('/metrics').get_data(as_text=True)
+
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert '# TYPE http_requests_total counter' in text
+    labels = dict(endpoint='services.get_services', method='GET', status='200')
+    assert (_sample(text, 'http_requests_total', **labels) or 0) - (_sample(before, 'http_requests_total', **labels) or 0) == 2
+
+    histogram = dict(endpoint='services.get_services', method='GET')
+    count = _sample(text, 'http_request_duration_seconds_count', **histogram)
+    assert count >= 2
+    assert _sample(text, 'http_request_duration_seconds_bucket', **histogram, le='+Inf') == count
+    assert _sample(text, 'http_response_size_bytes_count', endpoint='services.get_services') >= 2
+
+
+def test_cache_hits_and_misses_per_route(client):
+    before = client.get('/metrics').get_data(as_text=True)
+    client.get('/api/services/')
+    client.get('/api/services/')
+    text = client.get('/metrics').get_data(as_text=True)
+
+    def delta(result):
+        labels = dict(endpoint='services.get_services', result=result)
+        return (_sample(text, 'cache_requests_total', **labels) or 0) - (_sample(before, 'cache_requests_total', **labels) or 0)
+    assert delta('miss') >= 1 and delta('hit') >= 1
+
+
+def test_availability_computation_is_timed(client, client_headers, next_monday):
+    # « Peu importe le collaborateur » : un calcul global et un par employé qualifié
+    client.get(f'/api/appointments/availability?service_id=1&employee_id=0&date={next_monday}', headers=client_headers)
+    text = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE availability_computation_seconds histogram' in text
+    assert _sample(text, 'availability_computation_seconds_count', function='get_all_employees_availability') >= 1
+    assert _sample(text, 'availability_computation_seconds_count', function='get_available_slots_for_employee') >= 1
+
+
+def test_metrics_token(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer autre'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_render_histogram_and_escaping():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latence', ['route'], buckets=(0.1, 1))
+    latency.observe(0.05, route='a"b')
+    latency.observe(0.5, route='a"b')
+    latency.observe(3, route='a"b')
+    text = render(merge_snapshots([registry.snapshot()], [True]))
+    assert 'latency_seconds_bucket{route="a\\"b",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="a\\"b",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="a\\"b",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{route="a\\"b"} 3.55' in text
+    assert 'latency_seconds_count{route="a\\"b"} 3' in text
+
+
+def test_multiprocess_merge_drops_stale_gauges(tmp_path):
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requêtes', ['status'])
+    in_flight = registry.gauge('in_flight', 'En cours')
+    requests.inc(status='200')
+    in_flight.set(1)
+    store = MultiprocessStore(registry, str(tmp_path), interval=5)
+
+    # Instantanés d'un worker vivant et d'un worker arrêté depuis longtemps
+    for pid, written_at in ((os.getpid() + 1, time.time()), (os.getpid() + 2, time.time() - 3600)):
+        other = MetricsRegistry()
+        other.counter('requests_total', 'Requêtes', ['status']).inc(2, status='200')
+        other.gauge('in_flight', 'En cours').set(4)
+        with open(tmp_path / f'metrics-{pid}.json', 'w', encoding='utf-8') as f:
+            json.dump({'pid': pid, 'written_at': written_at, 'metrics': other.snapshot()}, f)
+    (tmp_path / 'metrics-illisible.json').write_text('{', encoding='utf-8')
+
+    merged = store.collect()
+    # Compteurs conservés pour les workers arrêtés, jauges périmées ignorées
+    assert merged['requests_total']['samples'][('200',)] == 5
+    assert merged['in_flight']['samples'][()] == 5
+
+    store.flush()
+    with open(store.path, encoding='utf-8') as f:
+        assert json.load(f)['pid'] == os.getpid()
@@ -0,0 +1,84 @@
+import json
+import os
+import pstats
+
+import pytest
+
+from src.profiling import _prune, profile_path
+
+
+@pytest.fixture
+def profile_dir(app, monkeypatch, tmp_path):
+    monkeypatch.setitem(app.config, 'PROFILE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_admin_header_profiles_request(client, admin_headers, profile_dir):
+    response = client.get('/api/services/?ticket=secret&page=1',
+                          headers=dict(admin_headers, **{'X-Profile': 'cprofile'}))
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+    assert profile_id.endswith('services.get_services')
+
+    with open(profile_dir / f'{profile_id}.json', encoding='utf-8') as f:
+        metadata = json.load(f)
+    assert metadata['mode'] == 'cprofile' and metadata['status'] == 200
+    assert metadata['path'] == '/api/services/'
+    assert 'secret' not in metadata['query_string'] and 'page=1' in metadata['query_string']
+    pstats.Stats(str(profile_dir / f'{profile_id}.prof'))  # Lisible par pstats
+
+
+def test_sampling_mode_writes_collapsed_stacks(client, admin_headers, profile_dir):
+    response = client.get('/api/admin/stats', headers=dict(admin_headers, **{'X-Profile': '1'}))
+    profile_id = response.headers['X-Profile-Id']
+    assert os.path.isfile(profile_dir / f'{profile_id}.collapsed')
+
+
+def test_header_ignored_for_non_admins(client, client_headers, profile_dir):
+    for headers in ({'X-Profile': '1'}, dict(client_headers, **{'X-Profile': '1'}),
+                    {'X-Profile': '1', 'Authorization': 'Bearer invalide'}):
+        response = client.get('/api/services/', headers=headers)
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response.headers
+    assert os.listdir(profile_dir) == []
+
+
+def test_sample_rate_profiles_without_header(app, client, profile_dir, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILE_SAMPLE_RATE', 1.0)
+    assert 'X-Profile-Id' in client.get('/api/services/').headers
+
+
+def test_list_and_download_profiles(client, admin_headers, client_headers, profile_dir):
+    profiled = dict(admin_headers, **{'X-Profile': 'cprofile'})
+    first = client.get('/api/services/', headers=profiled).headers['X-Profile-Id']
+    second = client.get('/api/salon/info', headers=profiled).headers['X-Profile-Id']
+
+    profiles = client.get('/api/admin/profiles', headers=admin_headers).get_json()
+    assert [profile['id'] for profile in profiles] == [second, first]
+    filtered = client.get('/api/admin/profiles?endpoint=salon.get_salon_info', headers=admin_headers).get_json()
+    assert [profile['id'] for profile in filtered] == [second]
+
+    download = client.get(f'/api/admin/profiles/{first}', headers=admin_headers)
+    assert download.status_code == 200
+    assert f'{first}.prof' in download.headers['Content-Disposition']
+
+    assert client.get('/api/admin/profiles/inconnu', headers=admin_headers).status_code == 404
+    assert client.get('/api/admin/profiles', headers=client_headers).status_code == 403
+    assert client.get(f'/api/admin/profiles/{first}', headers=client_headers).status_code == 403
+
+
+def test_profile_path_rejects_traversal(tmp_path):
+    (tmp_path / 'a.prof').write_text('', encoding='utf-8')
+    assert profile_path(str(tmp_path), 'a') == str(tmp_path / 'a.prof')
+    assert profile_path(str(tmp_path), '../a') is None
+    assert profile_path(str(tmp_path), 'b') is None
+
+
+def test_ring_buffer_keeps_most_recent(tmp_path):
+    for profile_id in ('20250101T000000-a', '20250102T000000-b', '20250103T000000-c'):
+        (tmp_path / f'{profile_id}.json').write_text('{}', encoding='utf-8')
+        (tmp_path / f'{profile_id}.prof').write_text('', encoding='utf-8')
+    _prune(str(tmp_path), 2)
+    assert sorted(os.listdir(tmp_path)) == [
+        '20250102T000000-b.json', '20250102T000000-b.prof', '20250103T000000-c.json', '20250103T000000-c.prof'
+    ]
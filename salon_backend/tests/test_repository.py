@@ -0,0 +1,139 @@
+from datetime import time, timedelta
+from itertools import product
+
+import pytest
+
+from src.models.models import db, Appointment, EmployeeAvailability
+from src.repository import (
+    booked_slots, employee_ids_for_service, employee_unavailabilities, employee_working_hours,
+    find_conflicting_appointment, list_appointments, list_client_appointments, list_employee_appointments
+)
+
+
+def _sql_count(response):
+    return int(response.headers['Server-Timing'].split('SQL x')[1].split('"')[0])
+
+
+@pytest.fixture
+def appointments(client, admin_headers, book, next_monday):
+    """Cinq rendez-vous sur deux jours et deux employés, dont un confirmé et un annulé"""
+    tuesday = next_monday + timedelta(days=1)
+    created = {
+        'mon_sophie_9': book('09:00'),
+        'mon_sophie_14': book('14:00'),
+        'mon_marc_10': book('10:00', service_id=2, employee_id=3),
+        'tue_sophie_11': book('11:00', day=tuesday),
+        'tue_marc_9': book('09:00', day=tuesday, service_id=2, employee_id=3),
+    }
+    client.put(f"/api/admin/appointments/{created['mon_sophie_14']['id']}/status", headers=admin_headers,
+               json={'status': 'confirmed'})
+    client.put(f"/api/admin/appointments/{created['tue_marc_9']['id']}/status", headers=admin_headers,
+               json={'status': 'cancelled'})
+    return {name: appointment['id'] for name, appointment in created.items()}
+
+
+def _expected(app, day, employee_id, status):
+    with app.app_context():
+        rows = Appointment.query.all()
+        return sorted(
+            (a for a in rows
+             if (day is None or a.appointment_date == day)
+             and (employee_id is None or a.employee_id == employee_id)
+             and (status is None or a.status == status)),
+            key=lambda a: (a.appointment_date, a.start_time), reverse=True
+        )
+
+
+def test_admin_list_filter_combinations(app, client, admin_headers, appointments, next_monday):
+    for day, employee_id, status in product((None, next_monday), (None, 1, 3), (None, 'pending', 'confirmed')):
+        params = {'date': day and day.isoformat(), 'employee_id': employee_id, 'status': status}
+        query = '&'.join(f'{key}={value}' for key, value in params.items() if value)
+        response = client.get(f'/api/admin/appointments?{query}', headers=admin_headers)
+        assert response.status_code == 200
+        expected = [a.id for a in _expected(app, day, employee_id, status)]
+        assert [a['id'] for a in response.get_json()] == expected, query
+        # Relations chargées par jointure : pas de requête par rendez-vous
+        assert _sql_count(response) <= 4, query
+
+
+def test_repository_list_is_rebound_on_every_call(app, appointments, next_monday):
+    with app.app_context():
+        monday = [a.id for a in list_appointments(next_monday, 1)]
+        tuesday = [a.id for a in list_appointments(next_monday + timedelta(days=1), 1)]
+        # Même lambda mise en cache, paramètres différents
+        assert monday == [appointments['mon_sophie_14'], appointments['mon_sophie_9']]
+        assert tuesday == [appointments['tue_sophie_11']]
+        assert [a.id for a in list_appointments(status='cancelled')] == [appointments['tue_marc_9']]
+        assert list_appointments(next_monday, 2) == []
+
+
+def test_admin_list_invalid_date(client, admin_headers, client_headers):
+    assert client.get('/api/admin/appointments?date=31-12-2025', headers=admin_headers).status_code == 500
+    assert client.get('/api/admin/appointments', headers=client_headers).status_code == 403
+
+
+def test_client_appointments(app, client, client_headers, admin_headers, appointments):
+    mine = client.get('/api/appointments/my', headers=client_headers).get_json()
+    assert [a['id'] for a in mine] == [a.id for a in _expected(app, None, None, None)]
+    confirmed = client.get('/api/appointments/my?status=confirmed', headers=client_headers).get_json()
+    assert [a['id'] for a in confirmed] == [appointments['mon_sophie_14']]
+    assert client.get('/api/appointments/my', headers=admin_headers).get_json() == []
+
+    with app.app_context():
+        client_id = db.session.get(Appointment, appointments['mon_sophie_9']).client_id
+        assert [a.id for a in list_client_appointments(client_id, 'cancelled')] == [appointments['tue_marc_9']]
+
+
+def test_employee_appointments_in_chronological_order(client, admin_headers, appointments, next_monday):
+    tuesday = next_monday + timedelta(days=1)
+    response = client.get(f'/api/admin/employee-appointments/1?start_date={next_monday}&end_date={tuesday}',
+                          headers=admin_headers)
+    assert [a['id'] for a in response.get_json()] == [
+        appointments['mon_sophie_9'], appointments['mon_sophie_14'], appointments['tue_sophie_11']
+    ]
+    response = client.get(f'/api/admin/employee-appointments/3?start_date={tuesday}&end_date={tuesday}',
+                          headers=admin_headers)
+    assert [a['id'] for a in response.get_json()] == [appointments['tue_marc_9']]
+    assert client.get('/api/admin/employee-appointments/1?start_date=2025-01-01',
+                      headers=admin_headers).status_code == 400
+
+
+def test_list_employee_appointments_bounds(app, appointments, next_monday):
+    with app.app_context():
+        assert [a.id for a in list_employee_appointments(1, next_monday, next_monday)] == [
+            appointments['mon_sophie_9'], appointments['mon_sophie_14']
+        ]
+        assert list_employee_appointments(1, next_monday - timedelta(days=7), next_monday - timedelta(days=1)) == []
+
+
+def test_conflicts(app, appointments, next_monday):
+    with app.app_context():
+        # Rendez-vous de Sophie le lundi : 09:00-09:45 et 14:00-14:45
+        assert find_conflicting_appointment(1, next_monday, time(9, 30), time(10, 15)) == appointments['mon_sophie_9']
+        assert find_conflicting_appointment(1, next_monday, time(8, 30), time(9, 15)) == appointments['mon_sophie_9']
+        assert find_conflicting_appointment(1, next_monday, time(13, 0), time(15, 0)) == appointments['mon_sophie_14']
+        assert find_conflicting_appointment(1, next_monday, time(14, 10), time(14, 20)) == appointments['mon_sophie_14']
+        # Créneaux adjacents, autre employé, rendez-vous annulé : pas de conflit
+        assert find_conflicting_appointment(1, next_monday, time(9, 45), time(10, 30)) is None
+        assert find_conflicting_appointment(2, next_monday, time(9, 0), time(9, 45)) is None
+        tuesday = next_monday + timedelta(days=1)
+        assert find_conflicting_appointment(3, tuesday, time(9, 0), time(9, 30)) is None
+
+
+def test_availability_queries(app, appointments, next_monday):
+    with app.app_context():
+        # Horaires de démonstration : jours 1 à 6, pas de jour 0
+        assert employee_working_hours(1, 1) == [(time(9, 0), time(19, 0))]
+        assert employee_working_hours(1, 0) == []
+        assert sorted(booked_slots(1, next_monday)) == [(time(9, 0), time(9, 45)), (time(14, 0), time(14, 45))]
+        assert booked_slots(3, next_monday + timedelta(days=1)) == []  # Annulé
+
+        db.session.add(EmployeeAvailability(employee_id=1, date=next_monday, start_time=time(12, 0),
+                                            end_time=time(13, 0), is_available=False, reason='Pause'))
+        db.session.commit()
+        assert employee_unavailabilities(1, next_monday) == [(time(12, 0), time(13, 0))]
+        assert employee_unavailabilities(2, next_monday) == []
+
+        assert sorted(employee_ids_for_service(1)) == [1]
+        assert sorted(employee_ids_for_service(4)) == [1, 2]
+        assert sorted(employee_ids_for_service(10)) == [3]
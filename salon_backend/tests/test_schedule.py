@@ -0,0 +1,138 @@
+from datetime import time
+
+import pytest
+
+import src.schedule
+from src.models.models import db, BusinessHours, EmployeeHours
+from src.schedule import BUSINESS_SCOPE, employee_scope, schedule_version, sync_business_hours, sync_employee_hours
+
+
+def _rows(employee_id):
+    return db.session.execute(
+        db.select(EmployeeHours.id, EmployeeHours.day_of_week, EmployeeHours.start_time, EmployeeHours.end_time)
+        .where(EmployeeHours.employee_id == employee_id).order_by(EmployeeHours.day_of_week, EmployeeHours.start_time)
+    ).all()
+
+
+def _hours(day, start, end):
+    return {'day_of_week': day, 'start_time': time.fromisoformat(start), 'end_time': time.fromisoformat(end)}
+
+
+def test_sync_employee_hours_writes_only_the_difference(app):
+    with app.app_context():
+        before = {row.day_of_week: row.id for row in _rows(1)}
+        week = [_hours(day, '09:00', '19:00') for day in range(1, 6)]  # Samedi supprimé
+        week[0] = _hours(1, '10:00', '19:00')  # Lundi modifié
+        week.append(_hours(2, '20:00', '21:00'))  # Second créneau le mardi
+
+        assert sync_employee_hours({1: week}) == {1}
+        db.session.commit()
+
+        rows = _rows(1)
+        assert [(r.day_of_week, r.start_time.strftime('%H:%M')) for r in rows] == [
+            (1, '10:00'), (2, '09:00'), (2, '20:00'), (3, '09:00'), (4, '09:00'), (5, '09:00')
+        ]
+        # Lignes existantes réutilisées (mise à jour sur place), pas supprimées puis recréées
+        kept = {r.day_of_week: r.id for r in rows if r.start_time != time(20)}
+        assert kept == {day: before[day] for day in range(1, 6)}
+        assert schedule_version(employee_scope(1)) == 1
+        assert schedule_version(employee_scope(2)) == 0
+
+
+def test_sync_employee_hours_without_change(app):
+    with app.app_context():
+        week = [_hours(day, '09:00', '19:00') for day in range(1, 7)]
+        assert sync_employee_hours({1: week}) == set()
+        assert sync_employee_hours({}) == set()
+        assert schedule_version(employee_scope(1)) == 0
+
+
+def test_employee_hours_cache_follows_the_version(client, admin_headers):
+    assert len(client.get('/api/employees/1/hours').get_json()) == 6
+    week = [{'day_of_week': 1, 'start_time': '09:00', 'end_time': '12:00'}]
+    response = client.put('/api/admin/employees/1/hours', headers=admin_headers, json=week)
+    assert response.status_code == 200
+    assert [h['day_of_week'] for h in response.get_json()] == [1]
+    assert len(client.get('/api/employees/1/hours').get_json()) == 1
+
+
+def test_employee_hours_put_validation(client):
+    assert client.put('/api/employees/1/hours', json={'day_of_week': 1}).status_code == 400
+    assert client.put('/api/employees/1/hours', json=[{'day_of_week': 1, 'start_time': '9h'}]).status_code == 400
+    assert client.put('/api/employees/1/hours', json=[
+        {'day_of_week': 1, 'start_time': 'neuf', 'end_time': '19:00'}
+    ]).status_code == 400
+    assert client.put('/api/employees/999/hours', json=[]).status_code == 404
+
+
+def test_sync_business_hours_partial_update(app):
+    with app.app_context():
+        ids = dict(db.session.execute(db.select(BusinessHours.day_of_week, BusinessHours.id)).all())
+        assert sync_business_hours([{'day_of_week': 6, 'close_time': '17:00'}]) is True
+        db.session.commit()
+
+        saturday = db.session.get(BusinessHours, ids[6])
+        assert (saturday.open_time, saturday.close_time) == (time(9), time(17))
+        assert schedule_version(BUSINESS_SCOPE) == 1
+
+        assert sync_business_hours([{'day_of_week': 6, 'open_time': '09:00', 'close_time': '17:00'}]) is False
+        assert sync_business_hours([
+            {'day_of_week': 0, 'is_closed': False, 'open_time': '10:00', 'close_time': '13:00'},
+            {'day_of_week': 1, 'is_closed': True},
+        ]) is True
+        db.session.commit()
+        assert dict(db.session.execute(db.select(BusinessHours.day_of_week, BusinessHours.id)).all()) == ids
+        assert schedule_version(BUSINESS_SCOPE) == 2
+
+
+@pytest.fixture
+def version_lookups(monkeypatch):
+    """Portées dont la version est lue en base"""
+    lookups = []
+
+    def lookup(scope):
+        lookups.append(scope)
+        return schedule_version(scope)
+    monkeypatch.setattr(src.schedule, 'schedule_version', lookup)
+    return lookups
+
+
+def test_salon_hours_cache_follows_the_version(client, admin_headers, version_lookups):
+    def saturday():
+        return next(h for h in client.get('/api/salon/hours').get_json() if h['day_of_week'] == 6)
+
+    assert saturday()['close_time'] == '19:00'
+    response = client.put('/api/admin/business-hours', headers=admin_headers,
+                          json={'hours': [{'day_of_week': 6, 'close_time': '17:00'}]})
+    assert response.status_code == 200
+    assert saturday()['close_time'] == '17:00'
+    # Version relue en base une fois au premier appel, puis une fois après la modification
+    assert version_lookups == [BUSINESS_SCOPE, BUSINESS_SCOPE]
+    saturday()
+    assert len(version_lookups) == 2
+
+
+def test_employee_hours_cached_reads_skip_the_version_query(client, admin_headers, version_lookups):
+    client.get('/api/employees/1/hours')
+    client.get('/api/employees/1/hours')
+    assert version_lookups == [employee_scope(1)]
+    client.put('/api/admin/employees/1/hours', headers=admin_headers,
+               json=[{'day_of_week': 1, 'start_time': '10:00', 'end_time': '12:00'}])
+    assert len(client.get('/api/employees/1/hours').get_json()) == 1
+    assert version_lookups == [employee_scope(1), employee_scope(1)]
+
+
+def test_business_hours_repeated_day_is_rejected(app, client, admin_headers):
+    response = client.put('/api/admin/business-hours', headers=admin_headers, json={'hours': [
+        {'day_of_week': 6, 'close_time': '17:00'}, {'day_of_week': 6, 'close_time': '18:00'}
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Jour en double : 6'
+    with app.app_context():
+        with pytest.raises(ValueError):
+            sync_business_hours([{'day_of_week': 0, 'is_closed': True}, {'day_of_week': 0, 'is_closed': False}])
+        db.session.rollback()
+        assert db.session.execute(
+            db.select(db.func.count()).select_from(BusinessHours).where(BusinessHours.day_of_week.in_([0, 6]))
+        ).scalar() == 2
+        assert schedule_version(BUSINESS_SCOPE) == 0
@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import text
+
+from src.models.models import db, User
+from src.search import search_clients
+
+CLIENTS = [
+    ('Marie', 'Martin', 'marie.martin@mail.fr', '06 12 34 56 78'),
+    ('Luc', 'Lamarque', 'luc@lamarque.fr', '07.11.22.33.44'),
+    ('Anne', 'Dubois', 'anne_dubois@mail.fr', None),
+    ('Paul', 'Durand', 'pauldurand@mail.fr', '0698765432'),
+]
+
+
+@pytest.fixture
+def clients(app):
+    with app.app_context():
+        users = [User(first_name=first, last_name=last, email=email, phone=phone, role='client', password_hash='-')
+                 for first, last, email, phone in CLIENTS]
+        db.session.add_all(users)
+        db.session.commit()
+        return {user.last_name: user.id for user in users}
+
+
+def _search(app, query, **kwargs):
+    with app.app_context():
+        ids, total = search_clients(db.session, query, **kwargs)
+        names = dict(db.session.execute(db.select(User.id, User.last_name).where(User.id.in_(ids))).all())
+        return [names[i] for i in ids], total
+
+
+def test_substring_and_prefix_ranking(app, clients):
+    # Début de nom d'abord (Martin), puis sous-chaîne (Lamarque)
+    assert _search(app, 'mar') == (['Martin', 'Lamarque'], 2)
+    assert _search(app, 'bois') == (['Dubois'], 1)
+    assert _search(app, 'MAIL.FR')[1] == 3
+
+
+def test_every_word_is_required(app, clients):
+    assert _search(app, 'marie martin') == (['Martin'], 1)
+    assert _search(app, 'marie lamarque') == ([], 0)
+
+
+def test_phone_numbers_match_without_separators(app, clients):
+    assert _search(app, '06 12 34')[0] == ['Martin']
+    assert _search(app, '0711')[0] == ['Lamarque']
+    assert _search(app, '06-98-76')[0] == ['Durand']
+
+
+def test_short_queries_use_a_prefix(app, clients):
+    assert _search(app, 'Du') == (['Dubois', 'Dupont', 'Durand'], 3)
+    assert _search(app, 'an')[0] == ['Dubois']
+    # Préfixe du nom seulement : ni e-mail ni téléphone en dessous de 3 caractères
+    assert _search(app, 'pa')[0] == ['Durand']
+    assert _search(app, '06') == ([], 0)
+    assert _search(app, ', ;') == ([], 0)
+
+
+def test_short_queries_use_the_name_indexes(app):
+    with app.app_context():
+        plan = ' '.join(row[3] for row in db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM users WHERE +role = 'client'"
+            " AND (last_name LIKE :prefix ESCAPE '\\' OR first_name LIKE :prefix ESCAPE '\\')"
+        ), {'prefix': 'du%'}))
+    assert 'ix_users_last_name_nocase' in plan and 'ix_users_first_name_nocase' in plan
+    assert 'SCAN users' not in plan
+
+
+def test_like_wildcards_are_literal(app, clients):
+    assert _search(app, '_') == ([], 0)
+    assert _search(app, '%') == ([], 0)
+    assert _search(app, '%a') == ([], 0)
+    # Le tiret bas de l'adresse est bien trouvé
+    assert _search(app, 'e_')[0] == []
+    assert _search(app, 'anne_')[0] == ['Dubois']
+
+
+def test_index_follows_writes(app, clients):
+    with app.app_context():
+        user = db.session.get(User, clients['Durand'])
+        user.last_name = 'Durandal'
+        db.session.commit()
+    assert _search(app, 'durandal')[0] == ['Durandal']
+
+    with app.app_context():
+        db.session.execute(db.update(User).where(User.id == clients['Durand']).values(role='employee'))
+        db.session.delete(db.session.get(User, clients['Martin']))
+        db.session.commit()
+    assert _search(app, 'durandal') == ([], 0)
+    assert _search(app, 'mar')[0] == ['Lamarque']
+
+
+def test_search_pagination(app, clients):
+    first, total = _search(app, 'mail', per_page=2)
+    second, _ = _search(app, 'mail', page=2, per_page=2)
+    assert (len(first), len(second), total) == (2, 1, 3)
+    assert set(first + second) == {'Martin', 'Dubois', 'Durand'}
+
+
+def test_clients_endpoint(client, admin_headers, clients):
+    response = client.get('/api/admin/clients', headers=admin_headers, query_string={'q': 'mar', 'per_page': 1})
+    assert response.status_code == 200
+    assert [c['last_name'] for c in response.get_json()] == ['Martin']
+    assert response.headers['X-Total-Count'] == '2'
+    assert response.headers['X-Per-Page'] == '1'
+
+    listing = client.get('/api/admin/clients', headers=admin_headers, query_string={'page': 1})
+    assert [c['last_name'] for c in listing.get_json()] == ['Dubois', 'Dupont', 'Durand', 'Lamarque', 'Martin']
+
+
+def test_clients_endpoint_requires_admin(client, client_headers):
+    assert client.get('/api/admin/clients', headers=client_headers, query_string={'q': 'mar'}).status_code == 403
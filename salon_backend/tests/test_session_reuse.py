@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.models.models import db, Appointment, User
+from src.repository import commit_without_expiry, load_appointment
+from src.utils.benchmark import count_queries
+
+
+def _sql_count(response):
+    return int(response.headers['Server-Timing'].split('SQL x')[1].split('"')[0])
+
+
+def test_load_appointment_reuses_identity_map(app, book):
+    appointment_id = book('10:00')['id']
+    with app.app_context():
+        with count_queries(db.engine) as first:
+            appointment = load_appointment(appointment_id)
+        with count_queries(db.engine) as second:
+            assert load_appointment(appointment_id) is appointment
+        assert first['queries'] == 1 and second['queries'] == 0
+        assert load_appointment(999999) is None
+
+
+def test_details_load_everything_to_dict_reads(app, book):
+    appointment_id = book('10:00')['id']
+    with app.app_context():
+        with count_queries(db.engine) as counter:
+            data = load_appointment(appointment_id, details=True).to_dict()
+        assert counter['queries'] == 1
+        assert data['client_name'] == 'Jean Dupont' and data['service_name'] == 'Coupe Femme'
+        db.session.remove()
+
+        with count_queries(db.engine) as counter:
+            load_appointment(appointment_id).to_dict()
+        assert counter['queries'] > 1  # Relations chargées à la demande
+
+
+def test_commit_without_expiry_keeps_loaded_state(app, book):
+    appointment_id = book('10:00')['id']
+    with app.app_context():
+        appointment = load_appointment(appointment_id, details=True)
+        before = appointment.updated_at
+        appointment.notes = 'Frange courte'
+        commit_without_expiry()
+
+        assert db.session().expire_on_commit is True
+        with count_queries(db.engine) as counter:
+            data = appointment.to_dict()
+        assert counter['queries'] == 0
+        assert data['notes'] == 'Frange courte' and appointment.updated_at > before
+        db.session.remove()
+
+        assert db.session.get(Appointment, appointment_id).notes == 'Frange courte'
+
+
+def test_commit_without_expiry_restores_setting_on_failure(app):
+    with app.app_context():
+        db.session.add(User(email='admin@elegance-coiffure.fr', password_hash='x', first_name='A',
+                            last_name='B', role='client'))
+        with pytest.raises(IntegrityError):
+            commit_without_expiry()
+        db.session.rollback()
+        assert db.session().expire_on_commit is True
+
+
+def test_write_routes_answer_from_written_instances(client, client_headers, admin_headers, book):
+    appointment = book('10:00')
+    assert appointment['status'] == 'pending' and appointment['service_id'] == 1
+
+    response = client.put(f"/api/appointments/{appointment['id']}", headers=client_headers, json={'notes': 'Merci'})
+    assert response.status_code == 200
+    updated = response.get_json()['appointment']
+    assert updated['notes'] == 'Merci' and updated['updated_at'] >= appointment['updated_at']
+    assert updated['employee_name'] == appointment['employee_name']
+
+    response = client.put(f"/api/admin/appointments/{appointment['id']}/status", headers=admin_headers,
+                          json={'status': 'confirmed'})
+    assert response.get_json()['appointment']['status'] == 'confirmed'
+
+    response = client.post(f"/api/appointments/{appointment['id']}/cancel", headers=client_headers)
+    assert response.get_json()['appointment']['status'] == 'cancelled'
+    assert client.get(f"/api/appointments/{appointment['id']}", headers=client_headers).get_json()['status'] == 'cancelled'
+
+
+def test_get_appointment_single_query_and_errors(client, client_headers, admin_headers, book):
+    appointment_id = book('10:00')['id']
+    response = client.get(f'/api/appointments/{appointment_id}', headers=client_headers)
+    assert response.status_code == 200
+    assert _sql_count(response) == 1
+
+    assert client.get('/api/appointments/999999', headers=client_headers).status_code == 404
+    assert client.put('/api/appointments/999999', headers=client_headers, json={}).status_code == 404
+    assert client.post('/api/appointments/999999/cancel', headers=client_headers).status_code == 404
+    assert client.put('/api/admin/appointments/999999/status', headers=admin_headers,
+                      json={'status': 'confirmed'}).status_code == 404
+    # Rendez-vous d'un autre utilisateur
+    assert client.get(f'/api/appointments/{appointment_id}', headers=admin_headers).status_code == 403
+    assert client.post(f'/api/appointments/{appointment_id}/cancel', headers=admin_headers).status_code == 403
@@ -0,0 +1,119 @@
+import atexit
+import json
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+from src.slow_queries import (
+    PARAMETER_MAX_LENGTH, SlowQueryFileHandler, format_plan, init_slow_query_log, loggable_parameters, logger
+)
+
+
+def test_parameters_of_sensitive_tables_are_never_logged():
+    assert loggable_parameters('SELECT * FROM users WHERE email = ?', ('jean@test.fr',), False) is None
+    assert loggable_parameters('UPDATE Users SET password_hash = ?', ('pbkdf2:...',), False) is None
+    assert loggable_parameters(
+        'SELECT rowid FROM client_search WHERE client_search MATCH ?', ('"0612"',), False
+    ) is None
+
+
+def test_parameters_are_truncated_and_serializable():
+    long_value = 'x' * (PARAMETER_MAX_LENGTH + 10)
+    parameters = loggable_parameters(
+        'SELECT * FROM appointments WHERE id = ? AND notes = ? AND data = ? AND ok = ?',
+        (7, long_value, b'\x00' * 12, None), False
+    )
+    assert parameters == [7, 'x' * PARAMETER_MAX_LENGTH + '…', '<12 octets>', None]
+    assert loggable_parameters('SELECT 1', None, False) == []
+
+
+def test_executemany_parameters_are_not_logged():
+    assert loggable_parameters('INSERT INTO jobs (name) VALUES (?)', [('a',), ('b',)], True) is None
+
+
+def test_format_plan_indents_children():
+    rows = [(2, 0, 0, 'SCAN a'), (5, 2, 0, 'SEARCH b USING INDEX ix_b (id=?)'), (9, 0, 0, 'USE TEMP B-TREE FOR ORDER BY')]
+    assert format_plan(rows) == ['SCAN a', '  SEARCH b USING INDEX ix_b (id=?)', 'USE TEMP B-TREE FOR ORDER BY']
+
+
+def test_query_plan(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)'))
+    handler = SlowQueryFileHandler(str(tmp_path / 'slow.log'), engine)
+    try:
+        plan = handler.query_plan('SELECT * FROM items WHERE id = ?', (1,))
+        assert plan and 'items' in plan[0]
+        assert handler.query_plan('PRAGMA table_info(items)', ()) is None
+        assert handler.query_plan('SELECT * FROM missing', ())[0].startswith('(plan indisponible')
+    finally:
+        handler.close()
+        engine.dispose()
+
+
+def test_slow_statements_are_logged_with_plan(tmp_path):
+    app = Flask(__name__)
+    app.config.update(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG_FILE=str(tmp_path / 'slow.log'))
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)'))
+        conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)'))
+
+    handlers = list(logger.handlers)
+    listener = init_slow_query_log(app, engine)
+    try:
+        # Hors requête HTTP : rien n'est journalisé
+        with engine.connect() as conn:
+            conn.execute(text('SELECT * FROM items WHERE name = :name'), {'name': 'hors requête'})
+        with app.test_request_context('/api/items?ticket=secret'):
+            with engine.connect() as conn:
+                conn.execute(text('SELECT * FROM items WHERE name = :name'), {'name': 'shampooing'})
+                conn.execute(text('SELECT * FROM users WHERE email = :email'), {'email': 'jean@test.fr'})
+        assert init_slow_query_log(app, engine) is None  # Une seule écoute par moteur
+    finally:
+        atexit.unregister(listener.stop)
+        listener.stop()  # Vide la file : le fichier est complet
+        logger.handlers[:] = handlers
+        engine.dispose()
+
+    with open(tmp_path / 'slow.log', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry['statement'] for entry in entries] == [
+        'SELECT * FROM items WHERE name = ?', 'SELECT * FROM users WHERE email = ?'
+    ]
+    items, users = entries
+    assert items['parameters'] == ['shampooing'] and items['plan']
+    assert users['parameters'] is None
+    assert items['path'] == '/api/items'
+    assert 'secret' not in json.dumps(entries) and 'jean@test.fr' not in json.dumps(entries)
+
+
+def test_disabled_without_threshold(tmp_path):
+    app = Flask(__name__)
+    app.config.update(SLOW_QUERY_THRESHOLD_MS=None, SLOW_QUERY_LOG_FILE=str(tmp_path / 'slow.log'))
+    engine = create_engine('sqlite://')
+    assert init_slow_query_log(app, engine) is None
+    assert not (tmp_path / 'slow.log').exists()
+
+
+def test_failed_statement_leaves_no_timing_behind(tmp_path):
+    app = Flask(__name__)
+    app.config.update(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG_FILE=str(tmp_path / 'slow.log'))
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    handlers = list(logger.handlers)
+    listener = init_slow_query_log(app, engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY)'))
+            conn.execute(text('INSERT INTO items (id) VALUES (1)'))
+            for _ in range(3):
+                with pytest.raises(IntegrityError):
+                    conn.execute(text('INSERT INTO items (id) VALUES (1)'))
+            assert conn.info['slow_query_started'] == []
+    finally:
+        atexit.unregister(listener.stop)
+        listener.stop()
+        logger.handlers[:] = handlers
+        engine.dispose()
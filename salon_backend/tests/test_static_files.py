@@ -0,0 +1,116 @@
+import gzip
+import time
+
+import pytest
+from werkzeug.exceptions import NotFound
+
+from src.static_files import IMMUTABLE_MAX_AGE, StaticIndex
+
+
+@pytest.fixture
+def build(tmp_path):
+    """Dossier de build Vite minimal"""
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'uploads').mkdir()
+    (tmp_path / 'index.html').write_text('<div id="root"></div>')
+    (tmp_path / 'index.html.gz').write_bytes(gzip.compress(b'<div id="root"></div>'))
+    (tmp_path / 'assets' / 'index-CiTvSo8H.js').write_text('console.log(1)')
+    (tmp_path / 'uploads' / 'photo.jpg').write_bytes(b'\xff\xd8')
+    return tmp_path
+
+
+def test_index_lookup(build):
+    index = StaticIndex(str(build), exclude=['uploads'], check_interval=None)
+    index_html = index.lookup('index.html')
+    assert index_html.entry.data == b'<div id="root"></div>'
+    assert set(index_html.variants) == {'gzip'}
+    assert index.lookup('assets/index-CiTvSo8H.js').immutable
+    assert index.lookup('uploads/photo.jpg') is None
+    assert index.lookup('missing.js') is None
+
+
+def test_send_hashed_asset_and_conditional_request(app, build):
+    index = StaticIndex(str(build), check_interval=None)
+    with app.test_request_context():
+        response = index.send(index.lookup('assets/index-CiTvSo8H.js'))
+        assert response.status_code == 200
+        assert response.cache_control.max_age == IMMUTABLE_MAX_AGE
+        assert response.cache_control.immutable
+        etag = response.get_etag()[0]
+        response.close()
+
+    with app.test_request_context(headers={'If-None-Match': f'"{etag}"'}):
+        assert index.send(index.lookup('assets/index-CiTvSo8H.js')).status_code == 304
+
+
+def test_send_index_html_variant(app, build):
+    index = StaticIndex(str(build), check_interval=None)
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = index.send(index.lookup('index.html'))
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.cache_control.no_cache
+        assert gzip.decompress(response.get_data()) == b'<div id="root"></div>'
+
+
+def test_index_is_rebuilt_when_a_directory_changes(build):
+    index = StaticIndex(str(build), check_interval=0.01)
+    assert index.lookup('assets/new-AbCdEfGh.js') is None
+    time.sleep(0.02)
+    (build / 'assets' / 'new-AbCdEfGh.js').write_text('')
+    time.sleep(0.02)
+    assert index.lookup('assets/new-AbCdEfGh.js') is not None
+
+
+def test_spa_routes(client):
+    assert client.get('/api/unknown').status_code == 404
+    deep_link = client.get('/rendez-vous/123')
+    assert deep_link.status_code == 200
+    assert deep_link.mimetype == 'text/html'
+    assert deep_link.data == client.get('/').data
+
+
+def test_compressed_siblings_are_not_public(build):
+    (build / 'assets' / 'index-CiTvSo8H.js.br').write_bytes(b'br')
+    (build / 'data.json.gz').write_bytes(gzip.compress(b'{}'))  # Sans fichier d'origine : ressource à part entière
+    index = StaticIndex(str(build), check_interval=None)
+    assert index.lookup('index.html.gz') is None
+    assert index.lookup('assets/index-CiTvSo8H.js.br') is None
+    assert set(index.lookup('assets/index-CiTvSo8H.js').variants) == {'br'}
+    assert index.lookup('data.json.gz') is not None
+
+
+def test_file_rewritten_in_place_is_served_fresh(app, build):
+    index = StaticIndex(str(build), check_interval=None)
+    asset = build / 'assets' / 'index-CiTvSo8H.js'
+    with app.test_request_context():
+        first = index.send(index.lookup('assets/index-CiTvSo8H.js'))
+        etag = first.get_etag()[0]
+        first.close()
+
+    asset.write_text('console.log("version 2")')
+    (build / 'index.html').write_text('<div id="app"></div>')
+    with app.test_request_context():
+        response = index.send(index.lookup('assets/index-CiTvSo8H.js'))
+        response.direct_passthrough = False
+        assert response.get_data() == b'console.log("version 2")'
+        assert response.content_length == len('console.log("version 2")')
+        assert response.get_etag()[0] != etag
+        response.close()
+        assert index.send(index.lookup('index.html')).get_data() == b'<div id="app"></div>'
+
+
+def test_file_deleted_between_refreshes_is_404(app, build):
+    index = StaticIndex(str(build), check_interval=None)
+    static_file = index.lookup('assets/index-CiTvSo8H.js')
+    (build / 'assets' / 'index-CiTvSo8H.js').unlink()
+    with app.test_request_context(), pytest.raises(NotFound):
+        index.send(static_file)
+    # Index reconstruit à la consultation suivante
+    assert index.lookup('assets/index-CiTvSo8H.js') is None
+
+    # Variante supprimée : repli sur le fichier d'origine
+    (build / 'index.html.gz').unlink()
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = index.send(index.lookup('index.html'))
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_data() == b'<div id="root"></div>'
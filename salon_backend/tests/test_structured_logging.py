@@ -0,0 +1,90 @@
+import json
+import logging
+import queue
+
+from src.models.models import SalonInfo
+from src.structured_logging import JsonFormatter, StructuredQueueHandler, TextFormatter
+from src.utils.redaction import redacted_query_string
+
+
+def _access(caplog):
+    return [record for record in caplog.records if record.name == 'src.access']
+
+
+def test_redacted_query_string(app):
+    with app.test_request_context('/api/admin/events?ticket=abc&since=12&Token=x&password=&page=2'):
+        assert redacted_query_string() == (
+            'ticket=%5Bmasqu%C3%A9%5D&since=12&Token=%5Bmasqu%C3%A9%5D&password=%5Bmasqu%C3%A9%5D&page=2'
+        )
+    with app.test_request_context('/api/services/'):
+        assert redacted_query_string() == ''
+
+
+def test_access_log_line(client, caplog):
+    caplog.set_level(logging.INFO, logger='src.access')
+    response = client.get('/api/services/?ticket=secret', headers={'X-Request-ID': 'proxy-42'})
+    assert response.headers['X-Request-ID'] == 'proxy-42'
+
+    [record] = _access(caplog)
+    assert record.levelno == logging.INFO
+    assert record.getMessage() == 'GET /api/services/ 200'
+    assert record.status == 200 and record.request_id == 'proxy-42'
+    assert record.endpoint == 'services.get_services'
+    assert record.sql_queries >= 1 and record.duration_ms >= 0
+    assert not hasattr(record, 'query_string')
+
+
+def test_invalid_request_id_is_replaced(client):
+    response = client.get('/api/services/', headers={'X-Request-ID': 'pas valide; rm -rf'})
+    assert len(response.headers['X-Request-ID']) == 32
+
+
+def test_server_error_logged_with_redacted_query(client, monkeypatch, caplog):
+    def fail(self):
+        raise RuntimeError('panne')
+    monkeypatch.setattr(SalonInfo, 'to_dict', fail)
+
+    response = client.get('/api/salon/info?ticket=secret&lang=fr')
+    assert response.status_code == 500
+    [record] = _access(caplog)
+    assert record.levelno == logging.ERROR
+    assert record.getMessage() == 'GET /api/salon/info 500'
+    assert record.query_string == 'ticket=%5Bmasqu%C3%A9%5D&lang=fr'
+    # La trace de l'exception de la route porte l'identifiant de la requête
+    [error] = [r for r in caplog.records if r.exc_info and 'panne' in str(r.exc_info[1])]
+    assert error.request_id == record.request_id
+
+
+def test_successful_probes_are_not_logged(client, caplog):
+    assert client.get('/healthz').status_code == 200
+    assert _access(caplog) == []
+
+
+def test_queue_handler_formats_in_listener_thread():
+    records = queue.SimpleQueue()
+    handler = StructuredQueueHandler(records)
+    logger = logging.getLogger('tests.structured')
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception('échec %s', 'import', extra={'job_id': 7, 'payload': {'a': 1}})
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    record = records.get_nowait()
+    assert record.exc_info is None and 'ValueError: boom' in record.exc_text
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['level'] == 'ERROR' and entry['logger'] == 'tests.structured'
+    assert entry['message'] == 'échec import'
+    assert entry['job_id'] == 7 and entry['payload'] == {'a': 1}
+    assert 'ValueError: boom' in entry['exception']
+
+
+def test_text_formatter_appends_request_id():
+    record = logging.LogRecord('src', logging.INFO, __file__, 1, 'bonjour', None, None)
+    record.request_id = 'abc'
+    assert TextFormatter().format(record).endswith('INFO src: bonjour [abc]')
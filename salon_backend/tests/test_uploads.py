@@ -0,0 +1,112 @@
+import hashlib
+import io
+import os
+
+import pytest
+from PIL import Image
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from src.images import process_gallery_image
+from src.routes import admin
+from src.static_files import send_static_asset
+from src.uploads import HashingUploadFile
+
+
+@pytest.fixture
+def upload_folder(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    # Traitement des variantes dans le thread de la requête
+    monkeypatch.setattr(admin, 'schedule_gallery_processing',
+                        lambda *args, **kwargs: process_gallery_image(*args, **kwargs))
+    return tmp_path
+
+
+def _png(color=(10, 20, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 200), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _upload(client, headers, data, filename='photo.png'):
+    return client.post('/api/admin/gallery/upload', headers=headers, content_type='multipart/form-data',
+                       data={'photo': (io.BytesIO(data), filename), 'title': 'Salon'})
+
+
+def test_hashing_upload_file(tmp_path):
+    upload = HashingUploadFile(str(tmp_path / 'tmp'), max_size=10)
+    upload.write(b'abc')
+    upload.write(b'def')
+    assert upload.hexdigest() == hashlib.sha256(b'abcdef').hexdigest()
+    assert upload.commit(str(tmp_path / 'final')) is True
+    assert (tmp_path / 'final').read_bytes() == b'abcdef'
+    assert os.listdir(tmp_path / 'tmp') == []
+
+    duplicate = HashingUploadFile(str(tmp_path / 'tmp'))
+    duplicate.write(b'abcdef')
+    assert duplicate.commit(str(tmp_path / 'final')) is False
+    assert os.listdir(tmp_path / 'tmp') == []
+
+
+def test_hashing_upload_file_size_limit(tmp_path):
+    upload = HashingUploadFile(str(tmp_path), max_size=4)
+    upload.write(b'1234')
+    with pytest.raises(RequestEntityTooLarge):
+        upload.write(b'5')
+    assert os.listdir(tmp_path) == []
+
+
+def test_upload_is_stored_by_content_hash(client, admin_headers, upload_folder):
+    data = _png()
+    response = _upload(client, admin_headers, data)
+    assert response.status_code == 201
+    item = response.get_json()['gallery_item']
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    assert item['processing_status'] == 'pending'
+    assert item['image_url'] == f'/uploads/gallery/{content_hash}.png'
+    # Original remplacé par ses variantes une fois traité
+    assert not (upload_folder / 'gallery' / f'{content_hash}.png').exists()
+    assert (upload_folder / 'gallery' / 'variants' / f'{content_hash}-400.webp').exists()
+    assert os.listdir(upload_folder / 'tmp') == []
+
+
+def test_duplicate_upload_reuses_variants(client, admin_headers, upload_folder):
+    data = _png()
+    _upload(client, admin_headers, data)
+    files_before = sorted(os.listdir(upload_folder / 'gallery' / 'variants'))
+
+    response = _upload(client, admin_headers, data, filename='copie.png')
+    assert response.status_code == 201
+    item = response.get_json()['gallery_item']
+    assert item['processing_status'] == 'ready'
+    assert item['variants']['jpeg'][-1]['url'] == item['image_url']
+    assert sorted(os.listdir(upload_folder / 'gallery' / 'variants')) == files_before
+
+
+def test_upload_rejects_non_images(client, admin_headers, upload_folder):
+    response = _upload(client, admin_headers, b'<?php echo 1; ?>', filename='photo.jpg')
+    assert response.status_code == 400
+    assert os.listdir(upload_folder / 'gallery') == []
+
+
+def test_upload_size_limit(app, client, admin_headers, upload_folder, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_MAX_FILE_SIZE', 1024)
+    # Refusé sur Content-Length, avant lecture du corps
+    assert _upload(client, admin_headers, _png() + b'\0' * 200_000).status_code == 413
+    # Refusé pendant l'écriture sur disque
+    assert _upload(client, admin_headers, _png() + b'\0' * 5000).status_code == 413
+    assert os.listdir(upload_folder / 'tmp') == []
+    assert not (upload_folder / 'gallery').exists()
+
+
+def test_upload_requires_admin(client, client_headers, upload_folder):
+    assert _upload(client, client_headers, _png()).status_code == 403
+
+
+def test_content_addressed_variants_are_immutable(app, tmp_path):
+    name = 'a' * 64 + '-640.webp'
+    (tmp_path / name).write_bytes(b'RIFF')
+    with app.test_request_context():
+        response = send_static_asset(str(tmp_path), name)
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 365 * 24 * 3600